@@ -2,12 +2,16 @@
 
 import sys  # Add this import
 import os
-import urllib.request
-import urllib.error
-import json
-from datetime import datetime, timezone
-from collections import Counter
 import time
+import _thread  # threading itself pulls in functools/collections; locks are all we need at import
+
+from . import trace
+from .events import Event, as_event, ingest, parse_timestamp
+
+# Everything else (json, datetime, the HTTP client with its ssl/http/email
+# imports, sqlite3, concurrent.futures...) is imported inside the functions
+# that need it, so --help, --version and cache hits start fast. Shell prompt
+# integrations run gh-feed on every prompt; tests/test_startup.py guards this.
 
 # Cross-platform keyboard input handling
 try:
@@ -24,7 +28,19 @@ except ImportError:
 # Version information
 __version__ = "0.1.3"
 
-API_URL = "https://api.github.com/users/{}/events"
+# GH_FEED_API_URL points gh-feed at another server (GitHub Enterprise, a local mock)
+API_ROOT = os.getenv("GH_FEED_API_URL", "https://api.github.com").rstrip("/")
+API_URL = API_ROOT + "/users/{}/events"
+
+# Feeds other than a user's own events are named "<kind>:<name>", e.g.
+# "org:github" (GitHub logins cannot contain a colon, so plain names stay users)
+FEED_PATHS = {
+    "user": "/users/{}/events",
+    "received": "/users/{}/received_events",
+    "org": "/orgs/{}/events",
+    "repo": "/repos/{}/events",
+}
+FEED_NOUNS = {"user": "User", "received": "User", "org": "Organization", "repo": "Repository"}
 
 # ANSI color codes
 COLORS = {
@@ -44,6 +60,47 @@ RESET = "\033[0m"
 
 CACHE_DIR = os.path.expanduser("~/.cache/gh-feed")
 CACHE_EXPIRY = 300  # seconds (5 minutes)
+# An entry expired for less than this is still shown at once while a
+# background request revalidates it (stale-while-revalidate)
+STALE_WHILE_REVALIDATE = 3600  # seconds
+# Failures are cached too, so a typo or a forbidden feed is not retried every run
+NOT_FOUND_TTL = 3600  # seconds
+FORBIDDEN_TTL = 60  # seconds
+# Background revalidations still running once the output is done get this
+# long to finish; any that do not are retried on the next run
+REFRESH_GRACE = 2.0  # seconds
+REFRESH_WORKERS = 4
+HISTORY_DB = "events.db"
+# Unix socket `gh-feed serve` listens on, in CACHE_DIR (GH_FEED_SOCKET overrides it)
+DAEMON_SOCKET = "daemon.sock"
+DAEMON_TIMEOUT = 10.0  # seconds
+
+# Number of events shown when no --limit is given
+DISPLAY_LIMIT = 7
+# GitHub serves at most 300 events per feed, in pages of up to 100
+MAX_EVENTS = 300
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+
+# Follow mode polls no faster than GitHub's advertised X-Poll-Interval
+DEFAULT_POLL_INTERVAL = 60  # seconds
+MAX_POLL_INTERVAL = 900  # seconds
+# Below this many remaining requests, follow mode stretches its polling
+RATE_LIMIT_LOW_WATER = 50
+
+# PyPI version lookups are remembered for a day (an hour if the lookup failed)
+UPDATE_CHECK_FILE = ".update-check.json"
+UPDATE_CHECK_TTL = 86400  # seconds
+UPDATE_CHECK_RETRY = 3600  # seconds
+# How long to wait for a still-running lookup once the output is done
+UPDATE_CHECK_GRACE = 0.2  # seconds
+
+# Upper bound on concurrent API requests when fetching several users
+DEFAULT_WORKERS = 16
+
+# --profile writes its cProfile stats here and prints the top entries
+PROFILE_FILE = "gh-feed.prof"
+PROFILE_TOP = 25
 
 # Event types with descriptions for multi-select interface
 EVENT_TYPES = [
@@ -59,34 +116,364 @@ EVENT_TYPES = [
 ]
 
 
-def get_cache_path(username):
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
-    return os.path.join(CACHE_DIR, f"{username}.json")
+_http_client = None
+_http_client_lock = _thread.allocate_lock()
 
 
-def load_cache(username):
+def get_http_client():
+    """Return the HTTP client shared by every network call, creating it on first use"""
+    from . import client
+
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = client.HTTPClient(user_agent=f"gh-feed/{__version__}")
+        return _http_client
+
+
+def api_headers(token=None):
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    return headers
+
+
+_rate_limiters = {}
+_rate_limiters_lock = _thread.allocate_lock()
+
+
+def get_rate_limiter(token=None):
+    """Return the rate limiter shared by every request made with ``token``.
+
+    ``token`` may list several tokens separated by commas; requests are
+    then spread across all of them.
+    """
+    from .ratelimit import RateLimiter, split_tokens
+
+    tokens = split_tokens(token)
+    with _rate_limiters_lock:
+        if tokens not in _rate_limiters:
+            _rate_limiters[tokens] = RateLimiter(tokens)
+        return _rate_limiters[tokens]
+
+
+def api_request(url, token=None, headers=None):
+    """GET ``url`` from the API, paced and authenticated by the rate limiter.
+
+    Requests that the API rejects for rate limiting are retried once the
+    quota resets instead of failing; any other HTTP error is raised. A long
+    wait is announced on stderr straight away, not through a caller's log,
+    which may hold messages back until the fetch is done or drop notes.
+    """
+    from . import client
+    from .ratelimit import is_rate_limited
+
+    limiter = get_rate_limiter(token)
+    while True:
+        with trace.span("rate limiter"):
+            chosen = limiter.acquire(log_to_stderr)
+        request_headers = api_headers(chosen)
+        request_headers.update(headers or {})
+        try:
+            response = get_http_client().request(url, request_headers)
+        except client.HTTPError as e:
+            update_rate_limit(e.headers)
+            # Conditional requests answered with 304 cost no quota
+            limiter.update(chosen, e.headers, counted=e.code != 304)
+            if is_rate_limited(e.code, e.headers):
+                limiter.exhausted(chosen, e.headers)
+                continue
+            raise
+        update_rate_limit(response.headers)
+        limiter.update(chosen, response.headers)
+        return response
+
+
+_cache_manager = None
+_cache_manager_lock = _thread.allocate_lock()
+
+
+def get_cache_manager():
+    """Return the cache bookkeeper for CACHE_DIR, creating it on first use.
+
+    The caps come from GH_FEED_CACHE_MAX_ENTRIES and GH_FEED_CACHE_MAX_BYTES
+    (e.g. ``50M``); set either to 0 to disable that cap.
+    """
+    from .cache import CacheManager, DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, parse_size
+    import atexit
+
+    global _cache_manager
+    with _cache_manager_lock:
+        if _cache_manager is None or _cache_manager.cache_dir != CACHE_DIR:
+            try:
+                max_entries = int(os.getenv("GH_FEED_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+                max_bytes = parse_size(os.getenv("GH_FEED_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            except ValueError:
+                max_entries, max_bytes = DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+            _cache_manager = CacheManager(CACHE_DIR, max_entries, max_bytes)
+            # Counters are written once per run rather than on every lookup
+            atexit.register(_cache_manager.flush)
+        return _cache_manager
+
+
+def split_feed(feed):
+    """Split a feed name into ``(kind, name)``; plain names are user feeds"""
+    kind, sep, name = feed.partition(":")
+    return (kind, name) if sep else ("user", feed)
+
+
+def feed_url(feed):
+    kind, name = split_feed(feed)
+    return API_ROOT + FEED_PATHS[kind].format(name)
+
+
+def feed_label(feed):
+    """Human-readable feed name for messages and headers"""
+    kind, name = split_feed(feed)
+    if kind in ("org", "received"):
+        return f"{name} ({kind})"
+    return name
+
+
+def feed_has_many_actors(feed):
+    """True for feeds whose events come from more than one account"""
+    return split_feed(feed)[0] != "user"
+
+
+def get_cache_path(username, suffix=None):
+    from .cache import CACHE_SUFFIX
+
+    # exist_ok: several worker threads may create the directory at once
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # "org:github" -> "org+github.cache", "repo:owner/name" -> "repo+owner+name.cache"
+    return os.path.join(CACHE_DIR, username.replace(":", "+").replace("/", "+") + (suffix or CACHE_SUFFIX))
+
+
+def load_cache_entry(username):
+    """Return the raw cache entry for ``username`` regardless of its age.
+
+    The entry holds the cached events together with the response validators
+    (``etag``, ``last_modified``, ``poll_interval``) used to revalidate it.
+    """
+    from .cache import decode_entry
+
     path = get_cache_path(username)
-    if not os.path.exists(path):
+    try:
+        with trace.span("cache load"):
+            with open(path, "rb") as f:
+                return decode_entry(f.read())
+    except FileNotFoundError:
+        return load_legacy_cache_entry(username)
+    except OSError:
+        return None
+
+
+def load_legacy_cache_entry(username):
+    """Read a JSON cache entry written by an older gh-feed, converting it to the current format"""
+    from .cache import LEGACY_SUFFIX
+    from . import codec
+
+    legacy_path = get_cache_path(username, LEGACY_SUFFIX)
+    if not os.path.exists(legacy_path):
         return None
     try:
-        with open(path, "r") as f:
-            cached = json.load(f)
-        # Check expiry
-        if time.time() - cached.get("timestamp", 0) < CACHE_EXPIRY:
-            return cached.get("events")
+        with open(legacy_path, "rb") as f:
+            entry = codec.loads(f.read())
+        old_size = os.path.getsize(legacy_path)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or "events" not in entry:
+        return None
+    if write_cache_entry(username, entry, old_size):
+        try:
+            os.remove(legacy_path)
+        except OSError:
+            pass
+    return entry
+
+
+# Each cache lifetime can be set per source kind or feed (see TTLSpec) with
+# an environment variable; --cache-ttl and --stale-ttl replace the first two
+TTL_ENV = {
+    "fresh": "GH_FEED_CACHE_TTL",
+    "stale": "GH_FEED_STALE_TTL",
+    "not_found": "GH_FEED_NOT_FOUND_TTL",
+    "forbidden": "GH_FEED_FORBIDDEN_TTL",
+}
+# Parsed specs by lifetime kind, filled on first use
+ttl_specs = {}
+
+
+def get_ttl(feed, kind="fresh"):
+    """Return the ``kind`` cache lifetime of ``feed`` in seconds"""
+    spec = ttl_specs.get(kind)
+    if spec is None:
+        from .cache import TTLSpec
+
+        try:
+            spec = TTLSpec.parse(os.getenv(TTL_ENV[kind]))
+        except ValueError:
+            spec = TTLSpec()
+        ttl_specs[kind] = spec
+    defaults = {"fresh": CACHE_EXPIRY, "stale": STALE_WHILE_REVALIDATE,
+                "not_found": NOT_FOUND_TTL, "forbidden": FORBIDDEN_TTL}
+    return spec.lookup(feed, defaults[kind])
+
+
+def is_cache_fresh(entry, ttl=None):
+    return time.time() - entry.get("timestamp", 0) < (CACHE_EXPIRY if ttl is None else ttl)
+
+
+def cached_failure(entry, feed):
+    """Return ``(code, seconds_left)`` if ``entry`` records a failure still being remembered"""
+    code = entry.get("failure")
+    if not code:
+        return None
+    ttl = get_ttl(feed, "not_found" if code == 404 else "forbidden")
+    left = entry.get("failed_at", 0) + ttl - time.time()
+    return (code, left) if left > 0 else None
+
+
+def load_cache(username):
+    cached = load_cache_entry(username)
+    # Check expiry
+    if cached is not None and is_cache_fresh(cached, get_ttl(username)):
+        return cached.get("events")
+    return None
+
+
+_event_store = None
+_event_store_lock = _thread.allocate_lock()
+
+
+def get_event_store():
+    """Return the shared history store in CACHE_DIR, opening it on first use"""
+    from .store import EventStore
+
+    global _event_store
+    path = os.path.join(CACHE_DIR, HISTORY_DB)
+    with _event_store_lock:
+        if _event_store is None or _event_store.path != path:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _event_store = EventStore(path)
+        return _event_store
+
+
+def record_history(username, events):
+    """Merge freshly fetched events into the local history store"""
+    kind, name = split_feed(username or "")
+    try:
+        with trace.span("history write"):
+            # Only a user's own feed tells us who an actor-less event belongs to
+            get_event_store().upsert(events, user=name if kind == "user" else None)
     except Exception:
+        # History is best-effort and must never break a fetch
         pass
-    return None
 
 
-def save_cache(username, events):
+def save_cache(username, events, validators=None, raw=None):
+    entry = {"timestamp": time.time(), "events": events}
+    if validators:
+        entry.update(validators)
+    if raw is not None:
+        # ``events`` were read back from the cache: keep the full ones they came with
+        entry["raw"] = raw
+    write_cache_entry(username, entry)
+
+
+def save_failure(username, code, cached=None, reason=None):
+    """Remember a failed fetch, keeping any events cached from before.
+
+    A 404 drops them (the feed is gone); for a 403 (an SSO-protected
+    organization, a blocked repository...) they stay available to show while
+    the failure is remembered.
+    """
+    entry = {"timestamp": 0, "events": []}
+    if cached is not None and code != 404:
+        entry = dict(cached)
+    entry.update(failure=code, failure_reason=reason, failed_at=time.time())
+    write_cache_entry(username, entry)
+
+
+def write_cache_entry(username, entry, old_size=None):
+    """Store ``entry`` in the cache, returning True on success.
+
+    The file is replaced atomically, so concurrent readers never see a
+    partial entry. ``old_size`` is the size of an entry being replaced under
+    another name (a legacy JSON file), for the cache's size accounting.
+    """
+    from .cache import encode_entry
+
     path = get_cache_path(username)
     try:
-        with open(path, "w") as f:
-            json.dump({"timestamp": time.time(), "events": events}, f)
+        with trace.span("cache save"):
+            data = encode_entry(entry)
+            if old_size is None and os.path.exists(path):
+                old_size = os.path.getsize(path)
+            tmp_path = f"{path}.{os.getpid()}.{_thread.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            get_cache_manager().wrote(path, old_size)
+        return True
     except Exception:
-        pass
+        return False
+
+
+# Most recent rate-limit headers seen from the API
+rate_limit_status = {"remaining": None, "reset": None}
+
+
+def update_rate_limit(headers):
+    """Remember the X-RateLimit-Remaining/Reset values from a response"""
+    for key, header in (("remaining", "X-RateLimit-Remaining"), ("reset", "X-RateLimit-Reset")):
+        value = headers.get(header) if headers is not None else None
+        if value is not None:
+            try:
+                rate_limit_status[key] = int(value)
+            except ValueError:
+                pass
+
+
+def get_cache_validators(headers, previous=None):
+    """Extract the conditional-request validators from response headers.
+
+    The URL of the next page (from the ``Link`` header) is kept as well, since
+    it stays valid for as long as the validators do. Values missing from
+    ``headers`` (a 304 reply may omit some) are carried over from the
+    ``previous`` cache entry.
+    """
+    previous = previous or {}
+    validators = {}
+    for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified")):
+        value = headers.get(header) or previous.get(key)
+        if value:
+            validators[key] = value
+    poll_interval = headers.get("X-Poll-Interval") or previous.get("poll_interval")
+    if poll_interval:
+        try:
+            validators["poll_interval"] = int(poll_interval)
+        except ValueError:
+            pass
+    next_url = parse_next_link(headers.get("Link")) or previous.get("next_url")
+    if next_url:
+        validators["next_url"] = next_url
+    return validators
+
+
+def parse_next_link(link_header):
+    """Return the ``rel="next"`` URL from a ``Link`` header, if any"""
+    if not link_header:
+        return None
+    for link in link_header.split(","):
+        segments = link.split(";")
+        if any(param.strip() == 'rel="next"' for param in segments[1:]):
+            return segments[0].strip().strip("<>")
+    return None
+
+
+# Terminal put in cbreak mode by an active TerminalSession, if any
+_session_fd = None
 
 
 def get_key():
@@ -94,7 +481,10 @@ def get_key():
     if UNIX_LIKE is None:
         # Fallback to input() if no keyboard support
         return input("Press Enter to continue...").strip()
-    
+
+    if UNIX_LIKE and _session_fd is not None:
+        return read_session_key(_session_fd)
+
     if UNIX_LIKE:
         # Unix-like systems (Linux, macOS)
         fd = sys.stdin.fileno()
@@ -115,59 +505,539 @@ def get_key():
         return key.decode('utf-8', errors='ignore')
 
 
+def read_session_key(fd):
+    """Read one keypress from a terminal already in cbreak mode.
+
+    An arrow key's escape sequence arrives all at once, so a lone ESC
+    (nothing more to read right away) is returned as is instead of
+    waiting for two more bytes.
+    """
+    import select
+
+    key = os.read(fd, 1)
+    if key == b"\x1b" and select.select([fd], [], [], 0.05)[0]:
+        key += os.read(fd, 2)
+    return key.decode("utf-8", errors="ignore")
+
+
+class TerminalSession:
+    """Keeps the terminal in cbreak mode, with the cursor hidden, for a whole TUI session.
+
+    ``get_key`` then reads keys without switching terminal modes on every
+    read. Does nothing if stdin is not a terminal.
+    """
+
+    def __init__(self):
+        self._saved = None
+
+    def __enter__(self):
+        global _session_fd
+        if UNIX_LIKE and _session_fd is None and sys.stdin.isatty():
+            fd = sys.stdin.fileno()
+            self._saved = termios.tcgetattr(fd)
+            # cbreak rather than raw: output newlines still return the carriage
+            # and Ctrl-C still raises KeyboardInterrupt
+            tty.setcbreak(fd)
+            _session_fd = fd
+            print("\033[?25l", end="", flush=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        global _session_fd
+        if self._saved is not None:
+            print("\033[?25h", end="", flush=True)
+            termios.tcsetattr(_session_fd, termios.TCSADRAIN, self._saved)
+            _session_fd = self._saved = None
+
+
+class Screen:
+    """Draws a block of lines, then redraws only the lines that changed.
+
+    The cursor is left on the block's last line (no newline follows it, so a
+    block as tall as the terminal does not scroll it), and a redraw moves up
+    to each changed line with ANSI cursor movement, rewrites it and moves
+    back, all in a single write. Lines are cut to the terminal width so none
+    wraps.
+    """
+
+    def __init__(self):
+        self.lines = None
+
+    def draw(self, lines):
+        import shutil
+
+        width = shutil.get_terminal_size().columns - 1
+        lines = [line[:width] for line in lines]
+        if self.lines is None or len(lines) != len(self.lines):
+            clear_screen()
+            output = "\n".join(lines)
+        else:
+            last = len(lines) - 1
+            output = "".join(self._rewrite(last - i, line)
+                             for i, (old, line) in enumerate(zip(self.lines, lines)) if line != old)
+        self.lines = lines
+        if output:
+            print(output, end="", flush=True)
+
+    @staticmethod
+    def _rewrite(up, line):
+        """Rewrite the line ``up`` lines above the cursor and come back"""
+        if not up:
+            # "\033[0A" would still move one line in most terminals
+            return f"\r\033[2K{line}"
+        return f"\033[{up}A\r\033[2K{line}\033[{up}B\r"
+
+
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        print("\033[H\033[2J", end="", flush=True)
 
 
-def fetch_user_activity(username, token=None, use_cache=True):
-    # Try cache first
-    if use_cache:
-        cached_events = load_cache(username)
-        if cached_events is not None:
-            print(f"(Loaded cached activity for '{username}')")
-            return cached_events
+def fetch_user_activity(username, token=None, use_cache=True, log=print, full=False):
+    """Fetch the first page of recent public events for ``username``.
+
+    ``username`` may also name an org, repo or received-events feed (see
+    ``FEED_PATHS``); every fetch function below accepts either.
+
+    A fresh cache entry is returned as-is. An expired one is revalidated with
+    a conditional request, so an unchanged feed costs a 304 reply that does
+    not count against the rate limit.
+
+    Status and error messages are reported through ``log`` so that callers
+    fetching several users at once can keep each user's output together.
+    ``full`` returns cached events whole, for exports (see ``fetch_first_page``).
+    """
+    with trace.span("fetch_user_activity", feed=username):
+        events, _ = fetch_first_page(username, token, use_cache, log, full=full)
+    return events
+
 
-    url = API_URL.format(username)
+def fetch_first_page(username, token=None, use_cache=True, log=print, per_page=None, revalidate=False,
+                     full=False):
+    """Fetch the first page of events for ``username`` through the cache.
+
+    An entry expired for less than the stale TTL is returned at once and
+    revalidated in the background, and a recently cached 404 or rate-limit
+    rejection is reported again without a request. With ``revalidate`` the
+    cache is always checked with a conditional request instead. Cached
+    events come back projected (see ``cache.project_event``) unless ``full``
+    asks for them as the API sent them. Returns ``(events, next_url)``;
+    ``events`` is None if the request failed.
+    """
+    cached = load_cache_entry(username) if use_cache else None
+
+    def cached_events():
+        from .cache import full_events
+
+        return full_events(cached) if full else cached["events"]
+
+    # Try cache first
+    cache_manager = get_cache_manager()
+    label = feed_label(username)
+    if cached is not None and not revalidate:
+        failure = cached_failure(cached, username)
+        if failure is not None:
+            from .ratelimit import format_wait
+
+            code, left = failure
+            cache_manager.record("negative")
+            if code == 404:
+                log(f"{not_found_message(username)} (Remembered; checking again in {format_wait(left)})")
+                return None, None
+            if cached.get("timestamp"):
+                log(f"(HTTP Error {code}; showing cached activity for '{label}', retrying in {format_wait(left)})")
+                return cached_events(), cached.get("next_url")
+            reason = cached.get("failure_reason")
+            log(f"HTTP Error {code}: {reason} (Remembered; checking again in {format_wait(left)})")
+            return None, None
+
+        age = time.time() - cached.get("timestamp", 0)
+        fresh_ttl = get_ttl(username)
+        if age < fresh_ttl:
+            log(f"(Loaded cached activity for '{label}')")
+            cache_manager.record("hits")
+            cache_manager.touch(get_cache_path(username))
+            return cached_events(), cached.get("next_url")
+        if cached.get("timestamp") and age < fresh_ttl + get_ttl(username, "stale"):
+            log(f"(Loaded cached activity for '{label}'; refreshing it in the background)")
+            cache_manager.record("stale")
+            cache_manager.touch(get_cache_path(username))
+            schedule_refresh(username, token, per_page)
+            return cached_events(), cached.get("next_url")
+
+    # Only a cache miss pays for importing the HTTP stack
+    from . import client, codec
+
+    url = feed_url(username)
+    if per_page:
+        url += f"?per_page={per_page}"
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
     try:
-        request = urllib.request.Request(url)
-        if token:
-            request.add_header("Authorization", f"token {token}")
-
-        with urllib.request.urlopen(request) as response:
-            headers = response.getheaders()
-            rate_limit_remaining = dict(headers).get("X-RateLimit-Remaining")
-            if rate_limit_remaining is not None and int(rate_limit_remaining) <= 5:
-                print(
-                    f"Warning: You are nearing the GitHub API rate limit. Only {rate_limit_remaining} requests remaining.")
-            data = response.read()
-            events = json.loads(data)
-            save_cache(username, events)
-            return events
-    except urllib.error.HTTPError as e:
+        response = api_request(url, token, headers)
+        with trace.span("json parse"):
+            events = codec.loads(response.body)
+        validators = get_cache_validators(response.headers)
+        cache_manager.record("misses")
+        save_cache(username, events, validators)
+        record_history(username, events)
+        return events, validators.get("next_url")
+    except client.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            # Not modified: refresh the entry's timestamp and reuse its events
+            validators = get_cache_validators(e.headers, cached)
+            cache_manager.record("revalidated")
+            save_cache(username, cached["events"], validators, cached.get("raw"))
+            log(f"(Activity for '{label}' unchanged since last fetch)")
+            return cached_events(), validators.get("next_url")
         if e.code == 404:
-            print(f"Error: User '{username}' not found.")
-        elif e.code == 403:
-            print("Error: Rate limit exceeded. Try again later.")
+            log(not_found_message(username))
+            save_failure(username, 404)
+        elif e.code in (403, 429):
+            # Not a rate limit (api_request waits those out): access is denied
+            log(f"HTTP Error {e.code}: {e.reason}")
+            save_failure(username, e.code, cached, e.reason)
         else:
-            print(f"HTTP Error {e.code}: {e.reason}")
-    except urllib.error.URLError as e:
-        print(f"Connection error: {e.reason}")
-        # Try to load cache even if offline
-        cached_events = load_cache(username)
-        if cached_events is not None:
-            print(f"(Loaded cached activity for '{username}' - offline mode)")
-            return cached_events
-    return None
+            log(f"HTTP Error {e.code}: {e.reason}")
+    except client.RequestError as e:
+        log(f"Connection error: {e.reason}")
+        # Offline: any earlier successful fetch beats nothing, however old
+        if cached is not None and cached.get("timestamp"):
+            log(f"(Loaded cached activity for '{label}' - offline mode)")
+            return cached_events(), None
+    return None, None
+
+
+def not_found_message(feed):
+    kind, name = split_feed(feed)
+    return f"Error: {FEED_NOUNS[kind]} '{name}' not found."
+
+
+class BackgroundRefresher:
+    """Revalidates stale cache entries on a few daemon threads.
+
+    Daemon threads never hold up the exit: ``wait`` gives them a grace
+    period once the output is done, and whatever is still running after
+    that is abandoned and left for the next run to retry.
+    """
+
+    def __init__(self, max_workers=REFRESH_WORKERS):
+        import threading
+        from collections import deque
+
+        self.max_workers = max_workers
+        self._threading = threading
+        self._cond = threading.Condition()
+        self._jobs = deque()
+        self._queued = set()
+        self._pending = 0
+        self._workers = 0
+
+    def submit(self, key, func, *args):
+        """Run ``func(*args)`` in the background unless ``key`` is already queued"""
+        with self._cond:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            self._jobs.append((key, func, args))
+            self._pending += 1
+            if self._workers < self.max_workers:
+                self._workers += 1
+                self._threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                if not self._jobs:
+                    self._workers -= 1
+                    return
+                key, func, args = self._jobs.popleft()
+            try:
+                func(*args)
+            except Exception:
+                pass  # A failed refresh just leaves the stale entry for next time
+            finally:
+                with self._cond:
+                    self._queued.discard(key)
+                    self._pending -= 1
+                    self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait up to ``timeout`` seconds for all refreshes; True if they finished"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return not self._pending
+
+
+_refresher = None
+_refresher_lock = _thread.allocate_lock()
+
+
+def schedule_refresh(username, token=None, per_page=None):
+    """Revalidate ``username``'s cache entry in the background"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = BackgroundRefresher()
+    _refresher.submit(username, refresh_feed, username, token, per_page)
+
+
+def refresh_feed(username, token=None, per_page=None):
+    with trace.span("background refresh", feed=username):
+        fetch_first_page(username, token, log=lambda message: None, per_page=per_page, revalidate=True)
+
+
+def finish_refreshes(timeout=None):
+    """Give background refreshes up to ``timeout`` (default REFRESH_GRACE) seconds to finish"""
+    if _refresher is not None:
+        with trace.span("refresh wait"):
+            _refresher.wait(REFRESH_GRACE if timeout is None else timeout)
+
+
+def fetch_page(url, token=None, log=print, username=None):
+    """Fetch a follow-up page of events. Returns ``(events, next_url)``."""
+    from . import client, codec
+
+    try:
+        with trace.span("fetch page", feed=username):
+            response = api_request(url, token)
+        with trace.span("json parse"):
+            events = codec.loads(response.body)
+        record_history(username, events)
+        return events, parse_next_link(response.headers.get("Link"))
+    except client.HTTPError as e:
+        log(f"HTTP Error {e.code}: {e.reason}")
+    except client.RequestError as e:
+        log(f"Connection error: {e.reason}")
+    return None, None
+
+
+def iter_user_pages(username, token=None, limit=None, use_cache=True, log=print, full=False):
+    """Return a lazy iterator over pages of ``username``'s events.
+
+    The first page is fetched (through the cache) before returning, so
+    errors are reported up front and None is returned if it failed. Later
+    pages are fetched on demand by following ``Link: rel="next"`` and stop
+    once ``limit`` events (default: the 300-event API window) have been
+    retrieved, so pages past the limit are never requested.
+
+    A first page served from the cache may be older than the pages after
+    it, which come from the live feed: events pushed down onto a later page
+    since then are skipped rather than yielded twice.
+    """
+    limit = MAX_EVENTS if limit is None else min(limit, MAX_EVENTS)
+    per_page = min(limit, MAX_PER_PAGE) if limit > DEFAULT_PER_PAGE else None
+    events, next_url = fetch_first_page(username, token, use_cache, log, per_page, full=full)
+    if events is None:
+        return None
+
+    def pages(events, next_url):
+        seen = set()
+        fetched = 0
+        while True:
+            page = [event for event in events if event.get("id") is None or event.get("id") not in seen]
+            seen.update(event.get("id") for event in page)
+            yield page
+            fetched += len(page)
+            if not events or not next_url or fetched >= limit:
+                return
+            events, next_url = fetch_page(next_url, token, log, username)
+            if events is None:
+                return
+
+    return pages(events, next_url)
+
+
+class PageStream:
+    """Iterator over the events of ``pages`` that fetches ahead in the background.
+
+    While the caller works through one page the following page is already
+    being downloaded, and at most one page is held in reserve. ``close()``
+    (or dropping the stream) stops the background fetch.
+    """
+
+    _DONE = object()
 
+    def __init__(self, pages):
+        import queue
+        import threading
 
-def time_ago(iso_time):
-    event_time = datetime.strptime(
-        iso_time, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-    now = datetime.now(timezone.utc)
-    delta = now - event_time
+        self._queue = queue.Queue(maxsize=1)
+        self._stop = threading.Event()
+        self._page = []
+        self._index = 0
+        self._finished = False
+        thread = threading.Thread(target=self._produce, args=(pages, self._queue, self._stop), daemon=True)
+        thread.start()
 
-    seconds = delta.total_seconds()
+    @classmethod
+    def _produce(cls, pages, buffer, stop):
+        import queue
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        try:
+            for page in pages:
+                put(page)
+                if stop.is_set():
+                    return
+        finally:
+            put(cls._DONE)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self._index >= len(self._page):
+            if self._finished:
+                raise StopIteration
+            page = self._queue.get()
+            if page is self._DONE:
+                self._finished = True
+                self._stop.set()
+                raise StopIteration
+            self._page, self._index = page, 0
+        event = self._page[self._index]
+        self._index += 1
+        return event
+
+    def would_block(self):
+        """True if the next event has to wait for a page still being downloaded"""
+        return self._index >= len(self._page) and not self._finished and self._queue.empty()
+
+    def close(self):
+        self._stop.set()
+
+    def __del__(self):
+        self._stop.set()
+
+
+def prefetch_pages(pages):
+    """Flatten ``pages`` into a ``PageStream`` of events that fetches ahead"""
+    return PageStream(pages)
+
+
+def fetch_many_users(usernames, token=None, use_cache=True, max_workers=DEFAULT_WORKERS, limit=None, full=False):
+    """Fetch activity for several users concurrently.
+
+    Requests run on a bounded thread pool and results are yielded as
+    ``(username, events, messages)`` tuples in the order the users finish,
+    so output can be streamed while slower requests are still in flight.
+    ``messages`` holds whatever ``fetch_user_activity`` would have printed
+    for that user. Without a ``limit`` only the first page is fetched.
+    ``full`` returns cached events whole, for exports.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    def fetch_one(username):
+        messages = []
+        if limit is None:
+            events = fetch_user_activity(username, token, use_cache, log=messages.append, full=full)
+        else:
+            pages = iter_user_pages(username, token, limit, use_cache, log=messages.append, full=full)
+            events = None if pages is None else [event for page in pages for event in page]
+        return username, events, messages
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(fetch_one, username) for username in usernames]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def merge_timelines(streams):
+    """Merge newest-first event streams into one newest-first stream.
+
+    A heap holds one pending event per stream, so each stream is read only
+    as far as the merged output has got. Events seen before (the same event
+    in a user's feed and an organization's, say) are dropped.
+    """
+    import heapq
+
+    seen = set()
+    for event in heapq.merge(*streams, key=lambda event: event.created_at or 0, reverse=True):
+        if event.id is not None:
+            if event.id in seen:
+                continue
+            seen.add(event.id)
+        yield event
+
+
+def open_timeline(feeds, token=None, limit=None, full=False, max_workers=DEFAULT_WORKERS, log=print):
+    """Return the events of every feed in ``feeds`` as one newest-first stream.
+
+    First pages are fetched concurrently (errors are logged in feed order);
+    older pages are fetched only when the merge reaches them, and no feed is
+    paged past ``limit`` events (default: its first page), since the merged
+    output never shows more than that from any one feed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    limit = limit or DISPLAY_LIMIT
+    # Messages are held back while first pages load, then passed straight on
+    buffered = {}
+
+    def open_feed(feed):
+        buffered[feed] = []
+
+        def feed_log(message):
+            messages = buffered.get(feed)
+            if messages is None:
+                log(message)
+            else:
+                messages.append(message)
+
+        return iter_user_pages(feed, token, limit, log=feed_log, full=full)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        opened = list(executor.map(open_feed, feeds))
+
+    streams = []
+    for feed, pages in zip(feeds, opened):
+        for message in buffered.pop(feed):
+            log(message)
+        if pages is not None:
+            streams.append(event for page in pages for event in ingest(page, full))
+    return merge_timelines(streams)
+
+
+def read_users_file(path):
+    """Read usernames from a file, one per line. Blank lines and # comments are ignored."""
+    usernames = []
+    with open(path, "r") as f:
+        for line in f:
+            name = line.split("#", 1)[0].strip()
+            if name:
+                usernames.append(name)
+    return usernames
+
+
+def time_ago(iso_time, now=None):
+    """Describe how long ago ``iso_time`` was, e.g. "3h ago".
+
+    Pass ``now`` (epoch seconds) to reuse one clock reading across a render.
+    """
+    return describe_age((time.time() if now is None else now) - parse_timestamp(iso_time))
+
+
+def describe_age(seconds):
     if seconds < 60:
         return f"{int(seconds)}s ago"
     elif seconds < 3600:
@@ -183,108 +1053,389 @@ def colorize(text, event_type):
     return f"{color}{text}{RESET}"
 
 
-def display_activity(events, filter_types=None):
-    if not events:
-        print("No recent public activity found.")
+def color_enabled():
+    """ANSI colors are only worth producing for a terminal (and not with NO_COLOR)"""
+    return "NO_COLOR" not in os.environ and sys.stdout.isatty()
+
+
+def get_pager():
+    """Return the pager command for long output, or None if paging is off"""
+    if "GH_FEED_NO_PAGER" in os.environ or not sys.stdout.isatty():
+        return None
+    pager = os.environ.get("PAGER")
+    if pager is not None:
+        return pager.strip() or None
+    import shutil
+
+    return "less -FRX" if shutil.which("less") else None
+
+
+def write_lines(lines, use_pager=False):
+    """Write ``lines`` in one go, through the pager if they overflow the terminal"""
+    if not lines:
         return
+    started = trace.now()
+    text = "\n".join(lines)
+    pager = get_pager() if use_pager else None
+    if pager:
+        import shutil
+
+        if text.count("\n") + 1 >= shutil.get_terminal_size().lines:
+            import subprocess
+
+            try:
+                process = subprocess.Popen(pager, shell=True, stdin=subprocess.PIPE, universal_newlines=True)
+            except OSError:
+                pass
+            else:
+                try:
+                    process.stdin.write(text + "\n")
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass  # The user quit the pager early
+                process.wait()
+                trace.record("output (pager)", started)
+                return
+    print(text)
+    trace.record("output", started)
+
+
+def compile_filter(filter_types):
+    """Turn --filter value(s) into a predicate on event types, or None for no filter.
+
+    Matching is a case-insensitive substring test, as before, but the filter
+    strings are lowered once and each event type's verdict is memoized, so
+    the per-event cost is a dict lookup.
+    """
+    if not filter_types:
+        return None
+    if isinstance(filter_types, str):
+        # Single filter type (backward compatibility)
+        filter_types = [filter_types]
+    needles = tuple(ft.lower() for ft in filter_types)
+    verdicts = {}
+
+    def matches(event_type):
+        try:
+            return verdicts[event_type]
+        except KeyError:
+            lowered = event_type.lower()
+            verdict = verdicts[event_type] = any(needle in lowered for needle in needles)
+            return verdict
+
+    return matches
+
+
+# Registry of event type -> (formatter, summary label). A formatter gets the
+# event, its repo name and the "(2h ago)" text and returns the feed line.
+# New event types plug in with @register_formatter.
+EVENT_FORMATTERS = {}
+
+
+def register_formatter(event_type, label=None):
+    """Decorator registering the feed-line formatter and summary label for ``event_type``"""
+    def decorator(formatter):
+        EVENT_FORMATTERS[event_type] = (formatter, label or event_type)
+        return formatter
+    return decorator
+
+
+@register_formatter("PushEvent", "push commit")
+def format_push_event(event, repo, timestamp):
+    commit_count = len(event.payload["commits"])
+    return f"- Pushed {commit_count} commit{'s' if commit_count > 1 else ''} to {repo} {timestamp}"
+
+
+@register_formatter("IssuesEvent", "issue opened")
+def format_issues_event(event, repo, timestamp):
+    action = event.payload["action"]
+    return f"- {action.capitalize()} an issue in {repo} {timestamp}"
+
+
+@register_formatter("WatchEvent", "repo starred")
+def format_watch_event(event, repo, timestamp):
+    return f"- Starred {repo} {timestamp}"
+
+
+@register_formatter("CreateEvent", "repo created")
+def format_create_event(event, repo, timestamp):
+    ref_type = event.payload["ref_type"]
+    return f"- Created a new {ref_type} in {repo} {timestamp}"
+
+
+@register_formatter("ForkEvent", "repo forked")
+def format_fork_event(event, repo, timestamp):
+    forkee = event.payload["forkee"]["full_name"]
+    return f"- Forked {repo} to {forkee} {timestamp}"
+
+
+@register_formatter("PullRequestEvent", "pull request sent")
+def format_pull_request_event(event, repo, timestamp):
+    action = event.payload["action"]
+    return f"- {action.capitalize()} a pull request in {repo} {timestamp}"
+
+
+@register_formatter("PullRequestReviewCommentEvent", "PR comment")
+def format_review_comment_event(event, repo, timestamp):
+    return f"- Commented on a pull request in {repo} {timestamp}"
+
+
+@register_formatter("DeleteEvent", "item deleted")
+def format_delete_event(event, repo, timestamp):
+    payload = event.payload
+    ref_type = payload["ref_type"]
+    ref = payload["ref"]
+    return f"- Deleted {ref_type} '{ref}' in {repo} {timestamp}"
+
+
+@register_formatter("ReleaseEvent", "release published")
+def format_release_event(event, repo, timestamp):
+    payload = event.payload
+    action = payload["action"]
+    release_name = payload["release"]["name"]
+    return f"- {action.capitalize()} release '{release_name}' in {repo} {timestamp}"
+
+
+def format_event(event, now=None):
+    """Return the one-line description of ``event`` (an ``Event`` or API dict) shown in the feed"""
+    event = as_event(event)
+    event_type = event.type
+    repo = event.repo
+    if event.created_at is None:
+        timestamp = ""
+    else:
+        timestamp = f"({describe_age((time.time() if now is None else now) - event.created_at)})"
+
+    registered = EVENT_FORMATTERS.get(event_type)
+    if registered is None:
+        return f"- {event_type} in {repo} {timestamp}"
+    return registered[0](event, repo, timestamp)
+
+
+def event_label(event_type):
+    """Return the summary label for ``event_type``"""
+    registered = EVENT_FORMATTERS.get(event_type)
+    return registered[1] if registered is not None else event_type
+
+
+def display_activity(events, filter_types=None, limit=DISPLAY_LIMIT, pager=True, show_actor=False):
+    """Print up to ``limit`` events (all of them if None) and a summary.
+
+    ``events`` may be any iterable, including a lazy page stream; it is
+    consumed only as far as needed to show ``limit`` events. Output is built
+    in one buffer and written once (through $PAGER if it is longer than the
+    terminal), except that a ``PageStream`` about to wait on the network has
+    its lines so far written first. ``show_actor`` prefixes each event with
+    who did it, for feeds that mix several accounts.
+    """
+    started = trace.now()
+    flushed = []
+
+    def flush(lines):
+        write_lines(lines)
+        flushed.append(True)
+
+    lines = render_activity(events, filter_types, limit, show_actor, color_enabled(), flush)
+    # Includes waiting on a lazy page stream and any early flushes
+    trace.record("render", started)
+    # Paging only makes sense if nothing has been written yet
+    write_lines(lines, use_pager=pager and not flushed)
+
+
+def render_activity(events, filter_types=None, limit=DISPLAY_LIMIT, show_actor=False, use_color=False,
+                    flush=None):
+    """Return the lines ``display_activity`` prints: one per event shown, then a summary.
+
+    If ``flush`` is given and ``events`` is a ``PageStream`` about to wait
+    on the network, ``flush`` is called with the lines so far, which are
+    then left out of the result.
+    """
+    from collections import Counter
 
     count = 0
     type_counter = Counter()
     repos = set()
+    matcher = compile_filter(filter_types)
+    now = time.time()
+    would_block = getattr(events, "would_block", None) if flush is not None else None
+    lines = []
 
+    seen_any = False
     for event in events:
-        if count >= 7:
-            break
+        seen_any = True
 
-        event_type = event["type"]
-        
+        if not isinstance(event, Event):
+            event = as_event(event)
+        event_type = event.type
         # Handle filtering by multiple types
-        if filter_types:
-            if isinstance(filter_types, str):
-                # Single filter type (backward compatibility)
-                if filter_types.lower() not in event_type.lower():
-                    continue
-            elif isinstance(filter_types, list):
-                # Multiple filter types
-                if not any(ft.lower() in event_type.lower() for ft in filter_types):
-                    continue
+        if matcher is not None and not matcher(event_type):
+            continue
 
         type_counter[event_type] += 1
-        repos.add(event["repo"]["name"])
-
-        repo = event["repo"]["name"]
-        created_at = event.get("created_at", "")
-        timestamp = f"({time_ago(created_at)})" if created_at else ""
-
-        if event_type == "PushEvent":
-            commit_count = len(event["payload"]["commits"])
-            message = f"- Pushed {commit_count} commit{'s' if commit_count > 1 else ''} to {repo} {timestamp}"
-        elif event_type == "IssuesEvent":
-            action = event["payload"]["action"]
-            message = f"- {action.capitalize()} an issue in {repo} {timestamp}"
-        elif event_type == "WatchEvent":
-            message = f"- Starred {repo} {timestamp}"
-        elif event_type == "CreateEvent":
-            ref_type = event["payload"]["ref_type"]
-            message = f"- Created a new {ref_type} in {repo} {timestamp}"
-        elif event_type == "ForkEvent":
-            forkee = event["payload"]["forkee"]["full_name"]
-            message = f"- Forked {repo} to {forkee} {timestamp}"
-        elif event_type == "PullRequestEvent":
-            action = event["payload"]["action"]
-            message = f"- {action.capitalize()} a pull request in {repo} {timestamp}"
-        elif event_type == "PullRequestReviewCommentEvent":
-            message = f"- Commented on a pull request in {repo} {timestamp}"
-        elif event_type == "DeleteEvent":
-            ref_type = event["payload"]["ref_type"]
-            ref = event["payload"]["ref"]
-            message = f"- Deleted {ref_type} '{ref}' in {repo} {timestamp}"
-        elif event_type == "ReleaseEvent":
-            action = event["payload"]["action"]
-            release_name = event["payload"]["release"]["name"]
-            message = f"- {action.capitalize()} release '{release_name}' in {repo} {timestamp}"
-        else:
-            message = f"- {event_type} in {repo} {timestamp}"
+        repos.add(event.repo)
 
-        print(colorize(message, event_type))
+        line = format_event(event, now)
+        if show_actor:
+            line = f"[{event.actor or '?'}] {line}"
+        lines.append(colorize(line, event_type) if use_color else line)
         count += 1
+        # Stop before pulling another event from a lazy stream
+        if limit is not None and count >= limit:
+            break
+        # Show what we have rather than wait silently for the next page
+        if would_block is not None and lines and would_block():
+            flush(lines)
+            lines = []
 
     if count > 0:
-        print("\nSummary:")
+        lines.append("\nSummary:")
         for etype, num in type_counter.items():
-            if etype == "PushEvent":
-                label = "push commit"
-            elif etype == "IssuesEvent":
-                label = "issue opened"
-            elif etype == "PullRequestEvent":
-                label = "pull request sent"
-            elif etype == "WatchEvent":
-                label = "repo starred"
-            elif etype == "ForkEvent":
-                label = "repo forked"
-            elif etype == "CreateEvent":
-                label = "repo created"
-            elif etype == "DeleteEvent":
-                label = "item deleted"
-            elif etype == "ReleaseEvent":
-                label = "release published"
-            elif etype == "PullRequestReviewCommentEvent":
-                label = "PR comment"
-            else:
-                label = etype
+            lines.append(f"- {event_label(etype)}: {num}")
+
+        lines.append(f"- Activity in {len(repos)} repos")
+    elif not seen_any:
+        lines.append("No recent public activity found.")
+    return lines
 
-            print(f"- {label}: {num}")
 
-        print(f"- Activity in {len(repos)} repos")
+def event_id(event):
+    try:
+        return int(event.id if isinstance(event, Event) else event.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def next_poll_delay(poll_interval, failures, num_users, now=None):
+    """Seconds to wait before polling a followed user again.
+
+    Starts from the server's X-Poll-Interval, doubles after consecutive
+    failures and, when the rate limit runs low, spreads the remaining
+    requests evenly over the time left until the limit resets.
+    """
+    delay = min(poll_interval * (2 ** min(failures, 4)), MAX_POLL_INTERVAL)
+    remaining = rate_limit_status["remaining"]
+    reset = rate_limit_status["reset"]
+    if remaining is not None and remaining <= RATE_LIMIT_LOW_WATER and reset:
+        now = time.time() if now is None else now
+        until_reset = max(0, reset - now) + 1
+        if remaining <= 0:
+            return max(delay, until_reset)
+        delay = max(delay, min(until_reset, until_reset * num_users / remaining))
+    return delay
+
+
+def follow_users(usernames, token=None, filter_types=None, min_interval=None):
+    """Poll ``usernames`` and print new events as they appear, like ``tail -f``.
+
+    A single scheduler keeps a heap of when each user is next due, so any
+    number of users is followed from one thread. Polls are conditional
+    requests, so quiet feeds cost a 304 that does not count against the
+    rate limit. Runs until interrupted.
+    """
+    import heapq
+
+    last_seen = {}
+    failures = dict.fromkeys(usernames, 0)
+    schedule = [(0, i, username) for i, username in enumerate(usernames)]
+    heapq.heapify(schedule)
+    show_user = len(usernames) > 1
+    matcher = compile_filter(filter_types) or (lambda event_type: True)
+    use_color = color_enabled()
+
+    try:
+        while schedule:
+            due, order, username = heapq.heappop(schedule)
+            wait = due - time.time()
+            if wait > 0:
+                time.sleep(wait)
+
+            messages = []
+            events, _ = fetch_first_page(username, token, log=messages.append, revalidate=True)
+            for message in messages:
+                # Parenthesized notes (cache hits, 304s) would only be noise here
+                if not message.startswith("("):
+                    print(message)
+
+            if events is None:
+                failures[username] += 1
+            else:
+                failures[username] = 0
+                events = ingest(events)
+                seen = last_seen.get(username)
+                if seen is None:
+                    # First poll: show the latest few events, like tail does
+                    new_events = [e for e in events if matcher(e.type)]
+                    new_events = new_events[:DISPLAY_LIMIT]
+                else:
+                    new_events = [e for e in events
+                                  if (event_id(e) or 0) > seen and matcher(e.type)]
+                ids = [event_id(e) for e in events if event_id(e) is not None]
+                if ids:
+                    last_seen[username] = max(ids + [seen or 0])
+                # The API lists newest first; print oldest first
+                now = time.time()
+                for event in reversed(new_events):
+                    line = format_event(event, now)
+                    if feed_has_many_actors(username):
+                        line = f"[{event.actor or '?'}] {line}"
+                    if show_user:
+                        line = f"[{feed_label(username)}] {line}"
+                    print(colorize(line, event.type) if use_color else line)
+                if new_events:
+                    sys.stdout.flush()
+
+            entry = load_cache_entry(username) or {}
+            poll_interval = max(entry.get("poll_interval") or DEFAULT_POLL_INTERVAL, min_interval or 0)
+            delay = next_poll_delay(poll_interval, failures[username], len(usernames))
+            heapq.heappush(schedule, (time.time() + delay, order, username))
+    except KeyboardInterrupt:
+        print("\nStopped following.")
 
 
 def export_to_json(events, filename="activity.json"):
+    from .export import Exporter
+
+    try:
+        with Exporter(filename, "json") as exporter:
+            exporter.write_all(events)
+        print(f"Exported {exporter.count} events to {filename}")
+    except IOError as e:
+        print(f"Error saving file: {e}")
+
+
+def log_to_stderr(message):
+    print(message, file=sys.stderr)
+
+
+def open_exporter(args):
+    """Open the export requested by --format/--output/--json, or return None.
+
+    ``--output -`` writes to stdout and a ``.gz`` path is compressed. Without
+    --output the export goes to ``activity.<format>``.
+    """
+    fmt = get_flag_value(args, "--format", "json, ndjson or csv")
+    output = get_flag_value(args, "--output", "a file path (or - for stdout)")
+    if fmt is None and output is None and "--json" not in args:
+        return None
+
+    from .export import FORMATS, Exporter
+
+    if fmt is not None and fmt not in FORMATS:
+        print(f"Error: --format must be one of {', '.join(FORMATS)}")
+        sys.exit(1)
+    if output is None:
+        output = f"activity.{fmt or 'json'}"
     try:
-        with open(filename, "w") as f:
-            json.dump(events[:7], f, indent=2)
-        print(f"Exported events to {filename}")
+        return Exporter(output, fmt)
     except IOError as e:
         print(f"Error saving file: {e}")
+        sys.exit(1)
+
+
+def finish_export(exporter):
+    exporter.close()
+    if exporter.path != "-":
+        print(f"Exported {exporter.count} events to {exporter.path}")
 
 
 def multi_select_event_types():
@@ -297,32 +1448,37 @@ def multi_select_event_types():
             return None
         return [t.strip() for t in filter_input.split(",")]
     
+    with TerminalSession():
+        return run_multi_select()
+
+
+def run_multi_select():
+    """The key loop of ``multi_select_event_types``, once the terminal is set up"""
     # Initialize state
     options = EVENT_TYPES + [("Select All", "Show all event types")]
     selected = [False] * len(options)
     cursor = 0
     select_all_idx = len(options) - 1
-    
+    # Only the lines a keypress changes are redrawn
+    screen = Screen()
+
     while True:
-        clear_screen()
-        print("Available Event Types:")
-        print("Use ↑↓ or j/k to navigate, SPACE to toggle, ENTER to confirm, ESC to cancel")
-        print()
-        
+        lines = ["Available Event Types:",
+                 "Use ↑↓ or j/k to navigate, SPACE to toggle, ENTER to confirm, ESC to cancel",
+                 ""]
         for i, (event_type, description) in enumerate(options):
             cursor_marker = ">" if i == cursor else " "
             selected_marker = "[X]" if selected[i] else "[ ]"
-            print(f"  {cursor_marker} {selected_marker} {event_type:<25} - {description}")
-        
+            lines.append(f"  {cursor_marker} {selected_marker} {event_type:<25} - {description}")
+
         # Show current selection
         selected_types = [options[i][0] for i in range(len(options) - 1) if selected[i]]
         if selected[select_all_idx]:
             selected_types = ["All event types"]
-        
-        print()
-        print(f"Selected: {', '.join(selected_types) if selected_types else 'None'}")
-        print()
-        
+
+        lines += ["", f"Selected: {', '.join(selected_types) if selected_types else 'None'}", ""]
+        screen.draw(lines)
+
         try:
             key = get_key()
             
@@ -345,9 +1501,9 @@ def multi_select_event_types():
                     return None  # Return None for "all events"
                 selected_events = [options[i][0] for i in range(len(options) - 1) if selected[i]]
                 return selected_events if selected_events else None
-            elif key == '\x1b':  # ESC to cancel
+            elif key in ['\x1b', '\x03']:  # ESC (or Ctrl-C) to cancel
                 return None
-                
+
         except KeyboardInterrupt:
             return None
 
@@ -392,10 +1548,17 @@ def interactive_mode(username=None):
         filter_types = multi_select_event_types()
         clear_screen()
         print(f"Selected event types: {', '.join(filter_types) if filter_types else 'All'}")
-    
+
+    if input("Browse the full history (scroll through every event)? (y/n): ").strip().lower() == 'y':
+        from .browser import browse_history
+
+        browse_history(username, token, filter_types)
+        return
+
     export = input("Export results to JSON? (y/n): ").strip().lower() == 'y'
 
-    events = fetch_user_activity(username, token)
+    # An export gets the API's full events, even from the cache
+    events = fetch_user_activity(username, token, full=export)
     if events is not None:
         display_activity(events, filter_types)
         if export:
@@ -408,30 +1571,133 @@ gh-feed - GitHub User Activity CLI Tool
 
 USAGE:
     gh-feed <username> [OPTIONS]
+    gh-feed <username> <username>... [OPTIONS]
+    gh-feed --users-file <path> [OPTIONS]
+    gh-feed --org <org> [--repo <owner/name>] [OPTIONS]
     gh-feed --interactive
     gh-feed <username> --interactive
+    gh-feed history [<username>...] [QUERY OPTIONS]
+    gh-feed search <words>... [SEARCH OPTIONS]
+    gh-feed stats [<username>...] [STATS OPTIONS]
+    gh-feed cache stats|prune|clear [PRUNE OPTIONS]
+    gh-feed serve [--token <token>] | gh-feed serve --stop
     gh-feed --help
 
 ARGUMENTS:
-    <username>          GitHub username to fetch activity for
+    <username>          GitHub username to fetch activity for (several may be given)
 
 OPTIONS:
     --filter <type>     Filter events by type (e.g., PushEvent, IssuesEvent)
-    --json              Export results to activity.json file
+    --json              Export fetched events to activity.json
+    --format <fmt>      Export format: json, ndjson or csv
+    --output <path>     Export to this file (.gz to compress, - for stdout)
     --token <token>     Use GitHub personal access token for authentication
+                        (several comma-separated tokens are used in rotation)
+    --users-file <path> Read usernames from a file (one per line)
+    --org <org>         Show an organization's public events (repeatable)
+    --repo <owner/name> Show a repository's events (repeatable)
+    --received          Show the events each user receives instead of their own
+    --timeline          Merge every feed into one chronological list
+    --workers <n>       Number of users fetched concurrently (default: 16)
+    --limit <n>         Show up to n events, fetching further pages as needed
+    --all               Show every event GitHub keeps (up to 300 per user)
+    --follow            Keep running and print new events as they happen
+    --interval <secs>   Minimum seconds between polls in --follow mode
+    --cache-ttl <ttl>   How long responses stay fresh (default: 5m); per source
+                        or feed too, e.g. 10m,org=1h,octocat=1m
+    --stale-ttl <ttl>   How long after that an entry is still shown while it is
+                        refreshed in the background (default: 1h; 0 = never)
+    --no-update-check   Don't check PyPI for a newer gh-feed version
+    --no-pager          Don't send output longer than the terminal to $PAGER
+    --timings           Print how long each phase of the run took (to stderr)
+    --profile           Run under cProfile and save the stats to gh-feed.prof
     --interactive       Start interactive mode with guided prompts
     --version, -v       Show version information
     --help, -h          Show this help message
 
+HISTORY QUERY OPTIONS:
+    Every fetched event is kept in a local history database, so queries
+    reach back beyond the 300 events GitHub serves and need no network.
+    --type <type>       Only events of this exact type (e.g. PushEvent)
+    --repo <owner/name> Only events in this repository
+    --since <when>      Events at or after a date (YYYY-MM-DD) or age (30d, 12h)
+    --until <when>      Events up to a date (YYYY-MM-DD) or age
+    --limit <n>, --all  Number of events to show (default: 7; exports: all)
+    --format, --output  Export the matching events instead of showing them
+
+SEARCH OPTIONS:
+    Finds events in the local history whose repo name, commit messages,
+    issue/PR titles, release names or refs contain every word given,
+    best matches first.
+    --user <username>   Only events by this user (repeatable)
+    --type, --repo, --since, --until
+                        Restrict the events searched, as for history
+    --limit <n>, --all  Number of hits to show (default: 7; exports: all)
+    --format, --output  Export the hits instead of showing them
+
+STATS OPTIONS:
+    Counts by repo, type, weekday, hour and day, commit volume and
+    activity streaks over the local history.
+    --type, --repo, --since, --until
+                        Restrict the events counted, as for history
+    --top <n>           Rows shown per ranking (default: 10)
+    --json              Print the statistics as JSON
+
+CACHE COMMANDS:
+    stats               Show entry count, size, hit/miss counters and entry ages
+    prune               Evict least-recently-used entries down to the limits
+      --max-entries <n>   Keep at most n entries (default: 2000)
+      --max-bytes <size>  Keep at most this much data, e.g. 50M (default: 50M)
+      --older-than <age>  Also remove entries unused for this long, e.g. 7d
+    clear               Remove all cached responses (history is kept)
+
+SERVE:
+    Runs in the foreground, keeping every feed asked for warm in memory and
+    refreshing it in the background. While it runs, showing (or exporting
+    to stdout as json/ndjson) one feed's first page is answered by it over
+    a Unix socket (GH_FEED_SOCKET, default ~/.cache/gh-feed/daemon.sock).
+    --token <token>     Token the daemon fetches with
+    --stop              Stop a running daemon
+    --no-daemon         (For queries) always fetch in-process
+
 EXAMPLES:
     gh-feed octocat
     gh-feed octocat --filter PushEvent
     gh-feed octocat --json --token your_token_here
+    gh-feed octocat torvalds gvanrossum
+    gh-feed --org github --repo python/cpython --filter PullRequestEvent
+    gh-feed octocat --received
+    gh-feed --users-file team.txt --timeline --limit 50
+    gh-feed --users-file team.txt --workers 32
+    gh-feed octocat --limit 50
+    gh-feed --users-file team.txt --cache-ttl 15m,org=1h
+    gh-feed octocat torvalds --follow
+    gh-feed history octocat --type PushEvent --repo octocat/Hello-World --since 30d
+    gh-feed octocat --all --format ndjson --output -
+    gh-feed history octocat --format csv --output history.csv.gz
+    gh-feed search flaky-test --since 30d --limit 20
+    gh-feed stats octocat torvalds --since 2024-01-01
     gh-feed --interactive
     gh-feed octocat --interactive
 
 ENVIRONMENT VARIABLES:
     GITHUB_TOKEN        GitHub personal access token (alternative to --token)
+    GITHUB_TOKENS       Comma-separated tokens to rotate between for bulk runs
+    GH_FEED_API_URL     API root to use instead of https://api.github.com
+    GH_FEED_TRACE       Write a Chrome trace of the run's phases to this file
+    PAGER               Pager for long output (default: less -FRX)
+    NO_COLOR            Disable colored output
+    GH_FEED_NO_UPDATE_CHECK
+                        Set to 1 to disable the daily PyPI version check
+    GH_FEED_CACHE_MAX_ENTRIES
+                        Maximum number of cached responses (0 = unlimited)
+    GH_FEED_CACHE_MAX_BYTES
+                        Maximum cache size, e.g. 50M (0 = unlimited)
+    GH_FEED_CACHE_TTL, GH_FEED_STALE_TTL
+                        Defaults for --cache-ttl and --stale-ttl
+    GH_FEED_NOT_FOUND_TTL, GH_FEED_FORBIDDEN_TTL
+                        How long a 404 (default: 1h) or a 403 (default: 1m)
+                        is remembered instead of retried
 
 SUPPORTED EVENT TYPES:
     PushEvent, IssuesEvent, PullRequestEvent, WatchEvent, ForkEvent,
@@ -446,38 +1712,476 @@ def print_version():
     print(f"gh-feed version {__version__}")
 
 
-def check_for_updates():
-    """Check PyPI for newer version and notify user"""
+def get_latest_version():
+    """Return the latest released version, asking PyPI at most once a day.
+
+    The answer (or a failed lookup, for a shorter time) is remembered in
+    CACHE_DIR so most runs make no PyPI request at all.
+    """
+    import json
+    from . import client
+
+    path = os.path.join(CACHE_DIR, UPDATE_CHECK_FILE)
+    try:
+        with open(path, "r") as f:
+            cached = json.load(f)
+        ttl = UPDATE_CHECK_TTL if cached.get("latest") else UPDATE_CHECK_RETRY
+        if time.time() - cached.get("timestamp", 0) < ttl:
+            return cached.get("latest")
+    except Exception:
+        pass
+
+    latest_version = None
     try:
         # Try main PyPI first, then fallback to TestPyPI
         urls = [
             "https://pypi.org/pypi/gh-feed/json",
             "https://test.pypi.org/pypi/gh-feed/json"
         ]
-        
+
         for url in urls:
             try:
-                request = urllib.request.Request(url)
-                request.add_header('User-Agent', f'gh-feed/{__version__}')
-                
-                with urllib.request.urlopen(request, timeout=3) as response:
-                    data = json.loads(response.read())
-                    latest_version = data["info"]["version"]
-                    
-                    if latest_version != __version__:
-                        print(f"📦 New version available: {latest_version} (current: {__version__})")
-                        print("💡 Run 'pip install --upgrade gh-feed' to update")
-                        print()
-                    return  # Success, no need to try other URLs
-            except urllib.error.HTTPError:
+                response = get_http_client().request(url, timeout=3)
+                data = json.loads(response.body)
+                latest_version = data["info"]["version"]
+                break  # Success, no need to try other URLs
+            except client.HTTPError:
                 continue  # Try next URL
-                
     except Exception:
         # Silently fail if no internet or PyPI unavailable
         pass
 
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"timestamp": time.time(), "latest": latest_version}, f)
+    except Exception:
+        pass
+    return latest_version
+
+
+def print_update_notice(latest_version):
+    print(f"📦 New version available: {latest_version} (current: {__version__})")
+    print("💡 Run 'pip install --upgrade gh-feed' to update")
+    print()
+
+
+def check_for_updates():
+    """Check PyPI for newer version and notify user"""
+    latest_version = get_latest_version()
+    if latest_version and latest_version != __version__:
+        print_update_notice(latest_version)
+
+
+def update_check_enabled(argv):
+    """Update checks are skipped with --no-update-check, GH_FEED_NO_UPDATE_CHECK or non-terminal output"""
+    if "--no-update-check" in argv or os.getenv("GH_FEED_NO_UPDATE_CHECK", "").lower() in ("1", "true", "yes"):
+        return False
+    # Cron jobs and pipelines have nobody to read the notice
+    return sys.stdout.isatty()
+
+
+def start_update_check():
+    """Look up the latest version on a background thread.
+
+    Returns a function that prints the update notice once the main work is
+    done. If the lookup is still running by then it is abandoned rather
+    than delaying the exit.
+    """
+    import threading
+
+    result = {}
+
+    def lookup():
+        with trace.span("update check"):
+            result["latest"] = get_latest_version()
+
+    thread = threading.Thread(target=lookup, daemon=True)
+    thread.start()
+
+    def finish(timeout=UPDATE_CHECK_GRACE):
+        with trace.span("update check wait"):
+            thread.join(timeout)
+        latest_version = result.get("latest")
+        if latest_version and latest_version != __version__:
+            print()
+            print_update_notice(latest_version)
+
+    return finish
+
+
+# Flags that consume the following argument as their value
+VALUE_FLAGS = ["--filter", "--token", "--users-file", "--workers", "--limit",
+               "--type", "--repo", "--since", "--until",
+               "--max-entries", "--max-bytes", "--older-than", "--interval",
+               "--format", "--output", "--top", "--org", "--cache-ttl", "--stale-ttl", "--user"]
+
+
+def get_positional_args(argv):
+    """Return the non-flag arguments in ``argv``, skipping flag values"""
+    positional = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("-"):
+            # Skip flag and its potential value
+            i += 2 if arg in VALUE_FLAGS else 1
+            continue
+        positional.append(arg)
+        i += 1
+    return positional
+
+
+def get_flag_value(argv, flag, description):
+    """Return the value following ``flag`` in ``argv``, or None if the flag is absent"""
+    if flag not in argv:
+        return None
+    try:
+        return argv[argv.index(flag) + 1]
+    except IndexError:
+        print(f"Error: {flag} flag must be followed by {description}")
+        sys.exit(1)
+
+
+def get_flag_values(argv, flag, description):
+    """Return every value given for a repeatable ``flag``, in order"""
+    values = []
+    for i, arg in enumerate(argv):
+        if arg == flag:
+            if i + 1 >= len(argv):
+                print(f"Error: {flag} flag must be followed by {description}")
+                sys.exit(1)
+            values.append(argv[i + 1])
+    return values
+
+
+def get_int_flag_value(argv, flag, default=None):
+    """Like ``get_flag_value`` but the value must be an integer"""
+    value = get_flag_value(argv, flag, "a number")
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Error: {flag} flag must be followed by a number")
+        sys.exit(1)
+
+
+def get_date_range(args):
+    """Return the (since, until) bounds given by --since/--until, normalized for the store"""
+    from .store import parse_date_bound
+
+    try:
+        since = get_flag_value(args, "--since", "a date")
+        since = parse_date_bound(since) if since else None
+        until = get_flag_value(args, "--until", "a date")
+        until = parse_date_bound(until, end_of_day=True) if until else None
+    except ValueError:
+        print("Error: dates must be YYYY-MM-DD, YYYY-MM-DDTHH:MM:SSZ or an age such as 30d")
+        sys.exit(1)
+    return since, until
+
+
+def history_command(args):
+    """gh-feed history [<username>...] - query the local event history"""
+    usernames = get_positional_args(args)
+    event_type = get_flag_value(args, "--type", "an event type")
+    repo = get_flag_value(args, "--repo", "a repository (owner/name)")
+    filter_type = get_flag_value(args, "--filter", "an event type")
+    since, until = get_date_range(args)
+    exporter = open_exporter(args)
+    # An export covers the whole matching history unless a limit is given
+    default_limit = None if exporter is not None else DISPLAY_LIMIT
+    limit = None if "--all" in args else get_int_flag_value(args, "--limit", default_limit)
+
+    # A display filter can drop rows, so only push the limit into SQL without one
+    store = get_event_store()
+    if exporter is None:
+        events = store.query(usernames, event_type, repo, since, until, None if filter_type else limit)
+        display_activity(events, filter_type, limit)
+        return
+
+    # Stream straight from the database so exports of any size use constant memory
+    events = store.iter_query(usernames, event_type, repo, since, until, None if filter_type else limit)
+    matcher = compile_filter(filter_type)
+    if matcher is not None:
+        from itertools import islice
+
+        events = islice((event for event in events if matcher(event["type"])), limit)
+    exporter.write_all(events)
+    finish_export(exporter)
+
+
+def search_command(args):
+    """gh-feed search <words>... - full-text search over the local event history"""
+    query = " ".join(get_positional_args(args))
+    if not query.strip():
+        print("Usage: gh-feed search <words>... [--user <username>] [--type <type>] [--repo <owner/name>] "
+              "[--since <when>] [--until <when>] [--limit <n>]")
+        sys.exit(1)
+    users = get_flag_values(args, "--user", "a username")
+    event_type = get_flag_value(args, "--type", "an event type")
+    repo = get_flag_value(args, "--repo", "a repository (owner/name)")
+    since, until = get_date_range(args)
+    exporter = open_exporter(args)
+    default_limit = None if exporter is not None else DISPLAY_LIMIT
+    limit = None if "--all" in args else get_int_flag_value(args, "--limit", default_limit)
+
+    with trace.span("search"):
+        events = get_event_store().search(query, users, event_type, repo, since, until, limit)
+    if exporter is not None:
+        exporter.write_all(events)
+        finish_export(exporter)
+    elif events:
+        display_activity(events, limit=None, show_actor=True)
+    else:
+        print(f"No events in the local history match '{query}'.")
+
+
+def stats_command(args):
+    """gh-feed stats [<username>...] - activity statistics over the local event history"""
+    from .stats import ActivityColumns, format_stats, summarize
+
+    usernames = get_positional_args(args)
+    event_type = get_flag_value(args, "--type", "an event type")
+    repo = get_flag_value(args, "--repo", "a repository (owner/name)")
+    since, until = get_date_range(args)
+    top = get_int_flag_value(args, "--top", 10)
+
+    batches = get_event_store().iter_activity(usernames, event_type, repo, since, until)
+    stats = summarize(ActivityColumns.from_batches(batches))
+    if "--json" in args:
+        import json
+
+        print(json.dumps(stats, indent=2))
+    else:
+        write_lines(format_stats(stats, top), use_pager="--no-pager" not in args)
+
+
+def cache_command(args):
+    """gh-feed cache stats|prune|clear - inspect and manage the response cache"""
+    from .cache import format_age, format_size, parse_age, parse_size
+
+    action = args[0] if args else "stats"
+    manager = get_cache_manager()
+
+    if action == "stats":
+        stats = manager.stats()
+        lookups = stats["hits"] + stats["stale"] + stats["revalidated"] + stats["misses"]
+        print(f"Cache directory: {CACHE_DIR}")
+        print(f"- Entries: {stats['entries']} (limit {stats['max_entries'] or 'none'})")
+        print(f"- Size: {format_size(stats['bytes'])}"
+              f" (limit {format_size(stats['max_bytes']) if stats['max_bytes'] else 'none'})")
+        print(f"- Hits: {stats['hits']}, stale: {stats['stale']}, revalidated: {stats['revalidated']}, "
+              f"misses: {stats['misses']}"
+              + (f" ({100 * (stats['hits'] + stats['stale']) / lookups:.0f}% hit rate)" if lookups else ""))
+        print(f"- Cached failures served: {stats['negative']}")
+        print(f"- Evictions: {stats['evictions']}")
+        if stats["entries"]:
+            print(f"- Entry ages: newest {format_age(stats['newest_age'])}, oldest {format_age(stats['oldest_age'])}")
+        history_path = os.path.join(CACHE_DIR, HISTORY_DB)
+        if os.path.exists(history_path):
+            print(f"- History database: {format_size(os.path.getsize(history_path))}")
+    elif action == "prune":
+        max_entries = get_int_flag_value(args, "--max-entries", manager.max_entries)
+        max_bytes = get_flag_value(args, "--max-bytes", "a size (e.g. 50M)")
+        older_than = get_flag_value(args, "--older-than", "an age (e.g. 7d)")
+        try:
+            max_bytes = parse_size(max_bytes) if max_bytes else manager.max_bytes
+            older_than = parse_age(older_than) if older_than else None
+        except ValueError:
+            print("Error: invalid --max-bytes or --older-than value")
+            sys.exit(1)
+        removed, freed = manager.prune(max_entries or None, max_bytes or None, older_than)
+        print(f"Pruned {removed} cache entries ({format_size(freed)} freed)")
+    elif action == "clear":
+        removed, freed = manager.clear()
+        print(f"Cleared {removed} cache entries ({format_size(freed)} freed)")
+        print("The event history database was kept.")
+    else:
+        print(f"Error: unknown cache command '{action}' (expected stats, prune or clear)")
+        sys.exit(1)
+
+
+def daemon_socket_path():
+    return os.getenv("GH_FEED_SOCKET") or os.path.join(CACHE_DIR, DAEMON_SOCKET)
+
+
+def token_fingerprint(token):
+    """A digest of ``token`` (None without one), so the daemon can tell whose token a query carries"""
+    if not token:
+        return None
+    import hashlib
+
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def query_daemon(request, path=None, timeout=DAEMON_TIMEOUT):
+    """Send ``request`` to a running ``gh-feed serve``.
+
+    Returns ``(header, body)``, or None if no daemon answered.
+    """
+    import socket
+
+    from . import codec
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path or daemon_socket_path())
+            sock.sendall(codec.dumps(request).encode("utf-8") + b"\n")
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (OSError, AttributeError):  # AttributeError: no AF_UNIX on this platform
+        return None
+    header, _, body = b"".join(chunks).partition(b"\n")
+    try:
+        header = codec.loads(header)
+    except ValueError:
+        return None
+    return (header, body.decode("utf-8")) if isinstance(header, dict) else None
+
+
+def daemon_output_format(args):
+    """The daemon output format a command line asks for, or None if only an in-process run will do.
+
+    The daemon prints feeds, and exports them as JSON or NDJSON to stdout;
+    exports to files and CSV are left to the CLI.
+    """
+    fmt = get_flag_value(args, "--format", "json, ndjson or csv")
+    output = get_flag_value(args, "--output", "a file path (or - for stdout)")
+    if output is None:
+        return "text" if fmt is None and "--json" not in args else None
+    if output == "-" and (fmt or "json") in ("json", "ndjson"):
+        return fmt or "json"
+    return None
+
+
+def show_from_daemon(feed, token=None, filter_type=None, limit=None, fmt="text", pager=True):
+    """Show ``feed`` as answered by a running ``gh-feed serve``.
+
+    Returns False, having printed nothing, if no daemon is running, it did
+    not answer, or it fetches with a token other than ``token`` (which
+    could see other events), so the caller can fetch in-process instead.
+    """
+    path = daemon_socket_path()
+    # Without a socket there is no daemon, and nothing more to import
+    if not os.path.exists(path):
+        return False
+    request = {"feed": feed, "token": token_fingerprint(token), "filter": filter_type, "limit": limit,
+               "format": fmt, "color": fmt == "text" and color_enabled()}
+    with trace.span("daemon query"):
+        answer = query_daemon(request, path)
+    if answer is None:
+        return False
+    header, body = answer
+    if header.get("status") == "wrong_token":
+        return False
+    log = print if fmt == "text" else log_to_stderr
+    for message in header.get("messages") or ():
+        log(message)
+    if fmt == "text":
+        if body:
+            write_lines(body.split("\n"), use_pager=pager)
+    else:
+        sys.stdout.write(body)
+    return True
+
+
+def serve_command(args):
+    """gh-feed serve [--stop] - keep feeds warm for other gh-feed runs"""
+    path = daemon_socket_path()
+    if "--stop" in args:
+        if query_daemon({"command": "stop"}, path) is None:
+            print("No gh-feed daemon is running.")
+            sys.exit(1)
+        print("Stopped the gh-feed daemon.")
+        return
+
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: gh-feed serve needs Unix domain sockets, which this platform lacks")
+        sys.exit(1)
+    from . import daemon
+
+    token = (get_flag_value(args, "--token", "a token") or os.getenv("GITHUB_TOKENS")
+             or os.getenv("GITHUB_TOKEN"))
+    if not daemon.serve(path, token):
+        sys.exit(1)
+
 
 def main():
+    """Entry point: run the command, stopping quietly if the reader of stdout goes away.
+
+    ``gh-feed org:x --format ndjson --output - | head -1`` closes the pipe
+    while the export is still being written.
+    """
+    try:
+        run_instrumented()
+        # Flush here, where a closed pipe is still handled
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Point stdout at devnull so the interpreter's flush at exit does not
+        # fail again (the recipe from the Python docs on SIGPIPE)
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def run_instrumented():
+    """Run the command, instrumented if asked to by --timings, --profile or GH_FEED_TRACE"""
+    trace_path = os.getenv("GH_FEED_TRACE")
+    timings = "--timings" in sys.argv
+    profile = "--profile" in sys.argv
+    if not (trace_path or timings or profile):
+        run()
+        return
+
+    if trace_path or timings:
+        trace.enable()
+    try:
+        with trace.span("main"):
+            if profile:
+                run_profiled(run)
+            else:
+                run()
+    finally:
+        tracer = trace.disable()
+        if tracer is not None:
+            # stderr, so the report never mixes with an export written to stdout
+            if timings:
+                print("\n".join(tracer.format_summary()), file=sys.stderr)
+            if trace_path:
+                try:
+                    tracer.write(trace_path)
+                    print(f"Trace written to {trace_path}", file=sys.stderr)
+                except OSError as e:
+                    print(f"Error writing trace: {e}", file=sys.stderr)
+
+
+def run_profiled(func, path=None):
+    """Run ``func`` under cProfile, save the stats to ``path`` and print the top entries"""
+    import cProfile
+    import pstats
+
+    path = path or PROFILE_FILE
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func)
+    finally:
+        profiler.dump_stats(path)
+        print(file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"Profile written to {path} (explore it with: python -m pstats {path})", file=sys.stderr)
+
+
+def run():
+    """Parse sys.argv and run the requested command"""
     # Check for help flag first - BEFORE any other processing
     if "--help" in sys.argv or "-h" in sys.argv:
         print_help()
@@ -488,69 +2192,188 @@ def main():
         print_version()
         return
 
+    if sys.argv[1:2] == ["history"]:
+        history_command(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ["serve"]:
+        serve_command(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ["search"]:
+        search_command(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ["stats"]:
+        stats_command(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ["cache"]:
+        cache_command(sys.argv[2:])
+        return
+
     # Check for interactive flag (can be combined with username)
     if "--interactive" in sys.argv:
-        username = None
-        # If there are more than 2 arguments and one is --interactive,
-        # try to extract username from the other arguments (skip flags)
-        if len(sys.argv) > 2:
-            i = 1
-            while i < len(sys.argv):
-                arg = sys.argv[i]
-                if arg == "--interactive":
-                    i += 1
-                    continue
-                elif arg.startswith("--"):
-                    # Skip flag and its potential value
-                    if arg in ["--filter", "--token"]:
-                        i += 2  # Skip flag and its value
-                    else:
-                        i += 1  # Skip flag only
-                    continue
-                else:
-                    # This should be the username
-                    username = arg
-                    break
-        interactive_mode(username)
+        positional = get_positional_args(sys.argv[1:])
+        interactive_mode(positional[0] if positional else None)
         return
 
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    usernames = get_positional_args(args)
+
+    users_file = get_flag_value(args, "--users-file", "a file path")
+    if users_file:
+        try:
+            usernames += read_users_file(users_file)
+        except IOError as e:
+            print(f"Error reading users file: {e}")
+            sys.exit(1)
+
+    # --received swaps each user's own events for the events they receive
+    if "--received" in args:
+        usernames = [f"received:{username}" for username in usernames]
+    feeds = usernames + [f"org:{org}" for org in get_flag_values(args, "--org", "an organization")]
+    for repo in get_flag_values(args, "--repo", "a repository (owner/name)"):
+        if repo.count("/") != 1:
+            print(f"Error: --repo must be given as owner/name, not '{repo}'")
+            sys.exit(1)
+        feeds.append(f"repo:{repo}")
+
+    if not feeds:
         print(
-            "Usage: gh-feed <github_username> [--filter <event_type>] [--json] [--token <token>] | --interactive")
+            "Usage: gh-feed <github_username>... [--org <org>] [--repo <owner/name>] [--users-file <path>] "
+            "[--filter <event_type>] [--json] [--token <token>] | --interactive")
         print("Run 'gh-feed --help' for more information.")
         sys.exit(1)
 
-    # Check for updates (non-blocking)
-    check_for_updates()
+    # Drop duplicate feeds but keep the order they were given in
+    feeds = list(dict.fromkeys(feeds))
+    # Several tokens (comma-separated) are rotated to multiply the rate limit
+    token = (get_flag_value(args, "--token", "a token") or os.getenv("GITHUB_TOKENS")
+             or os.getenv("GITHUB_TOKEN"))
+    filter_type = get_flag_value(args, "--filter", "an event type")
 
-    # Only assign username AFTER checking for help and interactive flags
-    username = sys.argv[1]
-    filter_type = None
-    export_json = "--json" in sys.argv
-    token = os.getenv("GITHUB_TOKEN")
+    workers = get_int_flag_value(args, "--workers", DEFAULT_WORKERS)
 
-    if "--token" in sys.argv:
-        try:
-            token_index = sys.argv.index("--token")
-            token = sys.argv[token_index + 1]
-        except IndexError:
-            print("Error: --token flag must be followed by a token")
-            sys.exit(1)
+    for flag, kind in (("--cache-ttl", "fresh"), ("--stale-ttl", "stale")):
+        value = get_flag_value(args, flag, "an age (e.g. 10m, or 10m,org=1h,octocat=1m)")
+        if value:
+            from .cache import TTLSpec
 
-    if "--filter" in sys.argv:
-        try:
-            filter_index = sys.argv.index("--filter")
-            filter_type = sys.argv[filter_index + 1]
-        except IndexError:
-            print("Error: --filter flag must be followed by an event type")
-            sys.exit(1)
+            try:
+                ttl_specs[kind] = TTLSpec.parse(value)
+            except ValueError:
+                print(f"Error: invalid {flag} value '{value}'")
+                sys.exit(1)
+
+    # --limit/--all page through the feed; otherwise only the first page is used
+    limit = get_int_flag_value(args, "--limit")
+    if "--all" in args:
+        limit = MAX_EVENTS
+
+    if "--follow" in args:
+        follow_users(feeds, token, filter_type, get_int_flag_value(args, "--interval"))
+        return
 
-    events = fetch_user_activity(username, token)
+    # A running `gh-feed serve` answers single-page queries for one feed from memory
+    if (len(feeds) == 1 and (limit is None or 0 <= limit <= DEFAULT_PER_PAGE)
+            and not any(flag in args for flag in ("--timeline", "--cache-ttl", "--stale-ttl", "--no-daemon"))):
+        fmt = daemon_output_format(args)
+        # Exports cover every fetched event, however few are shown
+        if fmt is not None and show_from_daemon(feeds[0], token, filter_type, limit if fmt == "text" else None,
+                                                fmt, pager="--no-pager" not in args):
+            return
 
-    if events is not None:
-        display_activity(events, filter_type)
-        if export_json:
-            export_to_json(events)
+    exporter = open_exporter(args)
+    # Exporting to stdout leaves stdout to the export alone
+    display = exporter is None or exporter.path != "-"
+
+    # Check for updates in the background while the feed is fetched
+    finish_update_check = start_update_check() if display and update_check_enabled(args) else None
+
+    try:
+        if "--timeline" in args:
+            show_timeline(feeds, token, filter_type, limit, exporter, workers, pager="--no-pager" not in args,
+                          display=display)
+        else:
+            show_feeds(feeds, token, filter_type, limit, exporter, workers, pager="--no-pager" not in args,
+                       display=display)
+    finally:
+        if exporter is not None:
+            finish_export(exporter)
+    finish_refreshes()
+
+    if finish_update_check is not None:
+        finish_update_check()
+
+
+def show_feeds(usernames, token=None, filter_type=None, limit=None, exporter=None, workers=DEFAULT_WORKERS,
+               pager=True, display=True):
+    """Fetch and print every user or feed in ``usernames``.
+
+    Every fetched event matching ``filter_type`` is written to ``exporter``
+    (if given) as it arrives, not just the ones shown. With ``display``
+    False nothing but the export goes to stdout and status messages are
+    written to stderr.
+    """
+    display_limit = limit or DISPLAY_LIMIT
+    log = print if display else log_to_stderr
+    matcher = compile_filter(filter_type) if exporter is not None else None
+    # Exports keep each event's full API data; the display only needs the slim form
+    full = exporter is not None
+
+    if len(usernames) == 1:
+        if limit is None:
+            events = fetch_user_activity(usernames[0], token, log=log, full=full)
+            events = None if events is None else ingest(events, full)
+        else:
+            pages = iter_user_pages(usernames[0], token, limit, log=log, full=full)
+            # Render the first page while later pages are still downloading
+            events = None if pages is None else prefetch_pages(ingest(page, full) for page in pages)
+
+        if events is not None:
+            if exporter is not None:
+                events = exporter.tee(events, matcher)
+            if display:
+                display_activity(events, filter_type, display_limit, pager, feed_has_many_actors(usernames[0]))
+            if exporter is not None:
+                # Export the events the display stopped short of
+                events.drain()
+        return
+
+    # Several users: fetch concurrently and print each user as soon as it is ready
+    fetched = fetch_many_users(usernames, token, max_workers=workers, limit=limit, full=full)
+    for username, events, messages in fetched:
+        if display:
+            print(f"\n==> {feed_label(username)} <==")
+        for message in messages:
+            log(message)
+        if events is not None:
+            events = ingest(events, full)
+            if display:
+                # Users are printed as they arrive, so never hold one back in a pager
+                display_activity(events, filter_type, display_limit, pager=False,
+                                 show_actor=feed_has_many_actors(username))
+            if exporter is not None:
+                exporter.write_all(events, matcher)
+
+
+def show_timeline(feeds, token=None, filter_type=None, limit=None, exporter=None, workers=DEFAULT_WORKERS,
+                  pager=True, display=True):
+    """Print the events of every feed in ``feeds`` merged into one chronological list.
+
+    Takes the same options as ``show_feeds``; every event is shown with its
+    actor.
+    """
+    log = print if display else log_to_stderr
+    matcher = compile_filter(filter_type) if exporter is not None else None
+    events = open_timeline(feeds, token, limit, exporter is not None, workers, log)
+    if exporter is not None:
+        events = exporter.tee(events, matcher)
+    if display:
+        display_activity(events, filter_type, limit or DISPLAY_LIMIT, pager, show_actor=True)
+    if exporter is not None:
+        events.drain()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+"""Full-screen, scrollable browser over a user's whole event history.
+
+Events come from the API (through the cache) for as far back as GitHub
+keeps them, then from the local history store. Pages are loaded only as the
+view nears the end of what is already loaded, on a background thread, so
+the next page is usually there before it is scrolled into view. Changing
+the type filter re-filters the loaded events in place, without fetching.
+"""
+
+import shutil
+import threading
+import time
+
+from . import app
+from .events import format_timestamp, ingest
+
+# Rows read from the history store per page once the API's window is used up
+HISTORY_PAGE_SIZE = 100
+# Lines above and below the event rows (header, blank lines, status line)
+CHROME_LINES = 4
+HELP = "j/k or ↑↓ scroll, SPACE/b page down/up, g/G top/bottom, f filter, q quit"
+
+
+def history_pages(username, token=None, log=print):
+    """Yield pages of ``username``'s events (``Event`` records), newest first.
+
+    The API's 300-event window comes first; older events, and everything if
+    the API cannot be reached, are then read from the local history store.
+    Events are never yielded twice, and empty pages are skipped.
+    """
+    seen = set()
+    oldest = None
+
+    def unseen(events):
+        nonlocal oldest
+        page = []
+        for event in events:
+            if event.id is not None:
+                if event.id in seen:
+                    continue
+                seen.add(event.id)
+            if event.created_at is not None:
+                oldest = event.created_at if oldest is None else min(oldest, event.created_at)
+            page.append(event)
+        return page
+
+    for page in app.iter_user_pages(username, token, app.MAX_EVENTS, log=log) or ():
+        page = unseen(ingest(page))
+        if page:
+            yield page
+
+    until = None if oldest is None else format_timestamp(oldest)
+    rows = app.get_event_store().iter_query(users=[username], until=until, batch_size=HISTORY_PAGE_SIZE)
+    batch = []
+    for data in rows:
+        batch.append(data)
+        if len(batch) >= HISTORY_PAGE_SIZE:
+            page = unseen(ingest(batch))
+            batch = []
+            if page:
+                yield page
+    page = unseen(ingest(batch))
+    if page:
+        yield page
+
+
+class PageLoader:
+    """Fetches the pages of an iterator one at a time on a background thread.
+
+    ``request`` starts fetching the next page and returns right away;
+    ``take`` hands it over once it has arrived. At most one page is in
+    flight, so nothing is fetched that was not asked for.
+    """
+
+    def __init__(self, pages):
+        self._pages = iter(pages)
+        self._thread = None
+        self._page = None
+        self.exhausted = False
+
+    def _fetch(self):
+        self._page = next(self._pages, None)
+
+    def request(self):
+        """Start fetching the next page, unless one is already on its way"""
+        if self._thread is None and not self.exhausted:
+            self._thread = threading.Thread(target=self._fetch, daemon=True)
+            self._thread.start()
+
+    @property
+    def loading(self):
+        return self._thread is not None
+
+    def wait(self, timeout=None):
+        """Block until the page in flight (if any) has arrived"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def take(self, wait=False):
+        """Return the fetched page, or None if it has not arrived (and ``wait`` is False)"""
+        if self._thread is None or (not wait and self._thread.is_alive()):
+            return None
+        self._thread.join()
+        page, self._page, self._thread = self._page, None, None
+        if page is None:
+            self.exhausted = True
+        return page
+
+
+class HistoryBrowser:
+    """The browser's state and key loop; ``run()`` starts it"""
+
+    def __init__(self, username, token=None, filter_types=None, log=print):
+        self.username = username
+        self.filter_types = filter_types
+        self._matcher = app.compile_filter(filter_types)
+        self.events = []
+        # Indexes into ``events`` of the ones the filter lets through
+        self.visible = []
+        self.top = 0
+        self.loader = PageLoader(history_pages(username, token, log))
+        self.screen = app.Screen()
+
+    @property
+    def height(self):
+        return max(1, shutil.get_terminal_size().lines - CHROME_LINES)
+
+    def add(self, page):
+        start = len(self.events)
+        self.events.extend(page)
+        matcher = self._matcher
+        self.visible.extend(i for i, event in enumerate(page, start) if matcher is None or matcher(event.type))
+
+    def set_filter(self, filter_types):
+        """Re-filter the loaded events in place"""
+        self.filter_types = filter_types
+        self._matcher = matcher = app.compile_filter(filter_types)
+        self.visible = [i for i, event in enumerate(self.events) if matcher is None or matcher(event.type)]
+        self.top = 0
+
+    def fill(self):
+        """Load pages until the view is full, keeping a screen's worth of events ahead of it.
+
+        The page after that is only requested; it loads while the user reads.
+        """
+        height = self.height
+        while not self.loader.exhausted:
+            page = self.loader.take()
+            if page is not None:
+                self.add(page)
+                continue
+            if len(self.visible) >= self.top + 2 * height:
+                break
+            self.loader.request()
+            if len(self.visible) >= self.top + height:
+                break
+            # The view would show blank rows: wait for the page
+            self.draw("Loading...")
+            page = self.loader.take(wait=True)
+            if page is not None:
+                self.add(page)
+        last_top = len(self.visible) - height
+        self.top = max(0, min(self.top, last_top)) if self.loader.exhausted else max(0, self.top)
+
+    def draw(self, status=None):
+        height = self.height
+        now = time.time()
+        shown = self.visible[self.top:self.top + height]
+        rows = [app.format_event(self.events[i], now) for i in shown]
+        rows += [""] * (height - len(rows))
+        total = f"{len(self.visible)}" if self.loader.exhausted else f"{len(self.visible)}+"
+        position = f"{self.top + 1}-{self.top + len(shown)} of {total}" if shown else f"0 of {total}"
+        if isinstance(self.filter_types, list):
+            label = ", ".join(self.filter_types)
+        else:
+            label = self.filter_types or "all events"
+        if status is None:
+            status = "Loading older events..." if self.loader.loading else HELP
+        self.screen.draw([f"{self.username}: {position} ({label})", ""] + rows + ["", status])
+
+    def handle(self, key):
+        """Act on a keypress; returns False to quit"""
+        height = self.height
+        if key in ['\x1b[A', 'k']:
+            self.top -= 1
+        elif key in ['\x1b[B', 'j']:
+            self.top += 1
+        elif key == ' ':
+            self.top += height
+        elif key == 'b':
+            self.top -= height
+        elif key == 'g':
+            self.top = 0
+        elif key == 'G':
+            # The end of what is loaded so far; more loads from there
+            self.top = len(self.visible) - height
+        elif key == 'f':
+            self.set_filter(app.multi_select_event_types())
+            # The menu drew over the browser
+            self.screen = app.Screen()
+        elif key in ['q', '\x1b', '\x03']:
+            return False
+        self.top = max(0, self.top)
+        return True
+
+    def run(self):
+        with app.TerminalSession():
+            try:
+                while True:
+                    self.fill()
+                    self.draw()
+                    if not self.handle(app.get_key()):
+                        return
+            except KeyboardInterrupt:
+                return
+
+
+def browse_history(username, token=None, filter_types=None):
+    """Open the history browser for ``username``"""
+    messages = []
+    HistoryBrowser(username, token, filter_types, log=messages.append).run()
+    app.clear_screen()
+    for message in messages:
+        if not message.startswith("("):
+            print(message)
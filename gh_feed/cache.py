@@ -0,0 +1,363 @@
+"""Size-bounded bookkeeping for the per-user response cache.
+
+Totals (entry count and bytes) and hit/miss counters are kept in a small
+stats file next to the cache entries, so enforcing the caps on write never
+needs a directory scan. Only when a cap is exceeded is the directory
+scanned, and entries are then evicted least-recently-used first (by mtime,
+which is bumped on every cache hit) down to a low-water mark, leaving
+headroom so the next scan is many writes away.
+
+Entries are stored in a compact binary format: a short versioned header
+followed by the entry ``marshal``-ed, with each event projected down to the
+fields gh-feed reads. Loading one is a single ``marshal.loads`` instead of
+a JSON parse of the full API response. The response's events are kept whole
+as well, compressed in an opaque ``raw`` blob that only exports decode, so
+an export holds the same records whether or not it was served from cache. Entries written by older versions
+(``.json`` files) are still read, and converted on first use.
+"""
+
+import json
+import marshal
+import os
+import threading
+import time
+
+from .events import EVENT_FIELDS, PAYLOAD_FIELDS, project
+
+STATS_FILE = ".stats.json"
+CACHE_SUFFIX = ".cache"
+LEGACY_SUFFIX = ".json"
+# Bump FORMAT_VERSION whenever the entry layout or the projection changes;
+# entries in any other version (or from another marshal version) are misses
+FORMAT_MAGIC = b"GHFC"
+FORMAT_VERSION = 2
+FORMAT_HEADER = FORMAT_MAGIC + bytes([FORMAT_VERSION, marshal.version])
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Evict down to this fraction of the caps once they are exceeded
+LOW_WATER = 0.9
+COUNTERS = ("hits", "stale", "negative", "revalidated", "misses", "evictions")
+
+
+def parse_size(value):
+    """Parse a byte count such as ``5000``, ``512K``, ``50M`` or ``1G``"""
+    value = str(value).strip().upper().rstrip("B")
+    multiplier = 1
+    if value[-1:] in ("K", "M", "G"):
+        multiplier = 1024 ** ("KMG".index(value[-1]) + 1)
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+def format_size(num_bytes):
+    for unit in ("B", "KiB", "MiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+
+def parse_age(value):
+    """Parse an age such as ``90s``, ``30m``, ``12h`` or ``7d`` into seconds"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    value = value.strip().lower()
+    if value[-1:] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
+
+
+def format_age(seconds):
+    seconds = max(0, int(seconds))
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    if seconds < 86400:
+        return f"{seconds // 3600}h"
+    return f"{seconds // 86400}d"
+
+
+class TTLSpec:
+    """A cache lifetime with per-source and per-feed overrides.
+
+    Parsed from specs like ``10m`` or ``10m,org=1h,octocat=30s,repo:a/b=1d``:
+    a bare age is the default, ``user``/``org``/``repo``/``received`` set it
+    for every feed of that kind, and anything else names a single feed.
+    Lookups without a match fall back to the caller's default.
+    """
+
+    KINDS = ("user", "org", "repo", "received")
+
+    def __init__(self, default=None, overrides=None):
+        self.default = default
+        self.overrides = overrides or {}
+
+    @classmethod
+    def parse(cls, value):
+        """Parse a spec, raising ValueError if it is malformed"""
+        spec = cls()
+        for part in (value or "").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            key, sep, age = part.rpartition("=")
+            if sep and not key.strip():
+                raise ValueError(f"missing feed name in {part!r}")
+            age = parse_age(age)
+            if age < 0:
+                raise ValueError(f"negative age in {part!r}")
+            if sep:
+                spec.overrides[key.strip()] = age
+            else:
+                spec.default = age
+        return spec
+
+    def lookup(self, feed, default):
+        """The lifetime for ``feed`` (e.g. ``octocat`` or ``org:github``)"""
+        if feed in self.overrides:
+            return self.overrides[feed]
+        kind, sep, _ = feed.partition(":")
+        kind = kind if sep else "user"
+        if kind in self.overrides:
+            return self.overrides[kind]
+        return default if self.default is None else self.default
+
+
+def project_event(event):
+    """Return the cached form of ``event``; payloads of unknown types are kept whole"""
+    if not isinstance(event, dict):
+        return event
+    projected = project(event, EVENT_FIELDS)
+    if "payload" in event:
+        fields = PAYLOAD_FIELDS.get(event.get("type"))
+        payload = event["payload"]
+        projected["payload"] = payload if fields is None else project(payload, fields)
+    return projected
+
+
+def encode_entry(entry):
+    """Serialize a cache entry (``timestamp``, ``events`` and validators).
+
+    An entry read back from the cache keeps its ``raw`` blob; otherwise
+    ``events`` are the API's and are stored whole in a new one.
+    """
+    events = entry.get("events") or ()
+    raw = entry.get("raw")
+    if raw is None:
+        import zlib
+
+        raw = zlib.compress(marshal.dumps(list(events)), 1)
+    entry = dict(entry, events=[project_event(event) for event in events], raw=raw)
+    return FORMAT_HEADER + marshal.dumps(entry)
+
+
+def full_events(entry):
+    """The events of a cache entry as the API sent them"""
+    raw = entry.get("raw")
+    if raw is None:
+        # A legacy JSON entry: its events were never projected
+        return entry["events"]
+    import zlib
+
+    return marshal.loads(zlib.decompress(raw))
+
+
+def decode_entry(data):
+    """Parse an encoded entry, or return None if it is corrupt or in another format"""
+    if not data.startswith(FORMAT_HEADER):
+        return None
+    try:
+        entry = marshal.loads(memoryview(data)[len(FORMAT_HEADER):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return entry if isinstance(entry, dict) and "events" in entry else None
+
+
+def is_cache_file(name):
+    return name.endswith((CACHE_SUFFIX, LEGACY_SUFFIX)) and not name.startswith(".")
+
+
+class CacheManager:
+    """Tracks cache totals and enforces entry-count and size caps"""
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._totals = None
+        # Changes made by this process that are not yet in the stats file
+        self._pending = dict.fromkeys(("entries", "bytes") + COUNTERS, 0)
+
+    @property
+    def stats_path(self):
+        return os.path.join(self.cache_dir, STATS_FILE)
+
+    def _read_stats(self):
+        try:
+            with open(self.stats_path, "r") as f:
+                stats = json.load(f)
+            if isinstance(stats, dict):
+                return stats
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _write_stats(self, stats):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, self.stats_path)
+
+    def _ensure_totals(self):
+        """Load the totals, returning True if they had to be counted from scratch"""
+        if self._totals is not None:
+            return False
+        stats = self._read_stats() or {}
+        scanned = "entries" not in stats
+        if scanned:
+            # No totals yet (first run or after an upgrade): count once
+            entries = self.scan()
+            stats.update(entries=len(entries), bytes=sum(size for _, size, _ in entries))
+            self._write_stats(stats)
+        self._totals = stats
+        return scanned
+
+    def scan(self):
+        """List cache entries as ``(path, size, last_used)`` tuples"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and is_cache_file(entry.name):
+                        st = entry.stat()
+                        entries.append((entry.path, st.st_size, st.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def record(self, outcome):
+        """Count a cache lookup outcome (one of COUNTERS)"""
+        with self._lock:
+            self._pending[outcome] += 1
+
+    def touch(self, path):
+        """Mark an entry as recently used"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def wrote(self, path, old_size):
+        """Account for a cache write, evicting old entries if a cap is exceeded.
+
+        ``old_size`` is the entry's size before the write, or None if it is new.
+        """
+        try:
+            new_size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            # A first-time count already includes this write
+            if not self._ensure_totals():
+                self._pending["bytes"] += new_size - (old_size or 0)
+                if old_size is None:
+                    self._pending["entries"] += 1
+            entries = self._totals.get("entries", 0) + self._pending["entries"]
+            size = self._totals.get("bytes", 0) + self._pending["bytes"]
+            over = ((self.max_entries and entries > self.max_entries)
+                    or (self.max_bytes and size > self.max_bytes))
+        if over:
+            self.prune(int(self.max_entries * LOW_WATER) if self.max_entries else None,
+                       int(self.max_bytes * LOW_WATER) if self.max_bytes else None,
+                       keep=path)
+
+    def prune(self, max_entries=None, max_bytes=None, older_than=None, keep=None):
+        """Evict least-recently-used entries until within the given limits.
+
+        Entries unused for more than ``older_than`` seconds are removed
+        regardless of the caps; ``keep`` is never removed. Returns
+        ``(removed, freed_bytes)`` and resets the totals to the exact values.
+        """
+        entries = sorted(self.scan(), key=lambda entry: entry[2])
+        count = len(entries)
+        size = sum(entry[1] for entry in entries)
+        now = time.time()
+        removed = freed = 0
+        for path, entry_size, last_used in entries:
+            too_old = older_than is not None and now - last_used > older_than
+            too_many = max_entries is not None and count > max_entries
+            too_big = max_bytes is not None and size > max_bytes
+            if not (too_old or too_many or too_big):
+                # Entries are oldest first, so nothing after this needs evicting
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            size -= entry_size
+            removed += 1
+            freed += entry_size
+        with self._lock:
+            self._pending["evictions"] += removed
+            stats = self._read_stats() or {}
+            stats.update(entries=count, bytes=size)
+            self._write_stats(stats)
+            self._totals = stats
+            self._pending["entries"] = self._pending["bytes"] = 0
+        return removed, freed
+
+    def clear(self):
+        """Remove every cache entry and reset the counters"""
+        removed = freed = 0
+        for path, size, _ in self.scan():
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        with self._lock:
+            self._pending = dict.fromkeys(self._pending, 0)
+            self._totals = {"entries": 0, "bytes": 0}
+            self._write_stats(self._totals)
+        return removed, freed
+
+    def flush(self):
+        """Merge this process's pending changes into the stats file"""
+        with self._lock:
+            if not any(self._pending.values()) or not os.path.isdir(self.cache_dir):
+                return
+            stats = self._read_stats() or {}
+            pending = self._pending
+            if "entries" not in stats:
+                # Totals are unknown: leave them for the next writer to count
+                pending = {key: self._pending[key] for key in COUNTERS}
+            for key, delta in pending.items():
+                stats[key] = stats.get(key, 0) + delta
+            try:
+                self._write_stats(stats)
+            except OSError:
+                return
+            self._totals = stats
+            self._pending = dict.fromkeys(self._pending, 0)
+
+    def stats(self):
+        """Return counters, totals and entry ages from an exact scan"""
+        self.flush()
+        entries = self.scan()
+        stats = self._read_stats() or {}
+        now = time.time()
+        ages = [now - last_used for _, _, last_used in entries]
+        result = {key: stats.get(key, 0) for key in COUNTERS}
+        result.update(
+            entries=len(entries),
+            bytes=sum(size for _, size, _ in entries),
+            oldest_age=max(ages) if ages else None,
+            newest_age=min(ages) if ages else None,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+        )
+        return result
@@ -0,0 +1,210 @@
+"""Minimal keep-alive HTTP client used for every network call in gh-feed.
+
+Connections are pooled per host and reused across users and pages, and
+responses are requested gzip-compressed. Only the standard library is used.
+"""
+
+import gzip
+import http.client
+import socket
+import threading
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+from . import trace
+
+DEFAULT_TIMEOUT = 30  # seconds
+MAX_IDLE_PER_HOST = 16
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Errors that mean a pooled connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class RequestError(Exception):
+    """The request could not be completed (DNS, connection, TLS or timeout)"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class HTTPError(RequestError):
+    """The server answered with a non-2xx status code"""
+
+    def __init__(self, url, code, reason, headers, body=b""):
+        super().__init__(reason)
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.body = body
+
+    def __str__(self):
+        return f"HTTP Error {self.code}: {self.reason}"
+
+
+class Response:
+    """A fully read HTTP response with its body already decompressed"""
+
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+def decode_body(body, encoding):
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+def connect_traced(conn, scheme):
+    """Open ``conn`` now, recording DNS, TCP and TLS as separate trace phases"""
+    create_connection = conn._create_connection
+    tcp_done = []
+
+    def traced_create_connection(address, *args, **kwargs):
+        host, port = address
+        with trace.span("dns", host=host):
+            addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        error = None
+        with trace.span("tcp connect", host=host):
+            # Try each resolved address in turn, as socket.create_connection does
+            for address_info in addresses:
+                try:
+                    sock = create_connection((address_info[4][0], port), *args, **kwargs)
+                    break
+                except OSError as e:
+                    error = e
+            else:
+                raise error or OSError(f"no addresses for {host}")
+        tcp_done.append(trace.now())
+        return sock
+
+    conn._create_connection = traced_create_connection
+    conn.connect()
+    if scheme == "https" and tcp_done:
+        trace.record("tls handshake", tcp_done[0], host=conn.host)
+
+
+class HTTPClient:
+    """Thread-safe HTTP client that keeps idle connections open per host"""
+
+    def __init__(self, user_agent=None, timeout=DEFAULT_TIMEOUT, max_idle_per_host=MAX_IDLE_PER_HOST):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+    def _send(self, method, url, headers, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise RequestError(f"unsupported URL scheme: {parts.scheme!r}")
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        request_headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        if self.user_agent:
+            request_headers["User-Agent"] = self.user_agent
+        request_headers.update(headers or {})
+
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                if not reused and trace.enabled():
+                    connect_traced(conn, parts.scheme)
+                with trace.span("http wait", url=url):
+                    conn.request(method, path, headers=request_headers)
+                    response = conn.getresponse()
+                with trace.span("http read"):
+                    body = response.read()
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused:
+                    # The server dropped an idle connection; retry on a new one
+                    continue
+                raise RequestError(str(e) or type(e).__name__)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise RequestError(str(e) or type(e).__name__)
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            try:
+                with trace.span("decompress"):
+                    body = decode_body(body, response.getheader("Content-Encoding"))
+            except (OSError, zlib.error) as e:
+                raise RequestError(f"invalid compressed response: {e}")
+            return Response(url, response.status, response.reason, response.msg, body)
+
+    def request(self, url, headers=None, method="GET", timeout=None):
+        """Perform a request and return a ``Response``.
+
+        Redirects are followed. Raises ``HTTPError`` for any other non-2xx
+        status (including 304) and ``RequestError`` if no response arrived.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        headers = dict(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(method, url, headers, timeout)
+            location = response.headers.get("Location")
+            if response.status in REDIRECT_CODES and location:
+                next_url = urljoin(url, location)
+                if urlsplit(next_url).netloc != urlsplit(url).netloc:
+                    # Never forward credentials to another host
+                    headers.pop("Authorization", None)
+                url = next_url
+                if response.status == 303:
+                    method = "GET"
+                continue
+            if not 200 <= response.status < 300:
+                raise HTTPError(url, response.status, response.reason, response.headers, response.body)
+            return response
+        raise RequestError("too many redirects")
@@ -0,0 +1,33 @@
+"""JSON decoding and encoding, through orjson when it is installed.
+
+orjson parses API responses several times faster than the standard library
+(``pip install gh-feed[fast]``). Without it everything falls back to
+``json``. Both backends accept ``str`` or ``bytes`` and produce the same
+compact, UTF-8 (not ASCII-escaped) text, so the output does not depend on
+which one is installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    NAME = "orjson"
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    NAME = "json"
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
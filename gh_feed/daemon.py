@@ -0,0 +1,224 @@
+"""``gh-feed serve``: a local daemon that keeps feeds warm in memory.
+
+Shell prompts and status bars run gh-feed on every render. While the daemon
+runs, the CLI sends its query (feed, filter, limit, output format) over a
+Unix domain socket and prints the answer, skipping the cache file and any
+request. The daemon revalidates each feed in the background, with the same
+fetch logic as the CLI, whenever its cache lifetime runs out. These are
+conditional requests, so an unchanged feed costs nothing against the rate
+limit. Feeds nobody has asked for in a while are dropped.
+
+Each connection carries one request: a JSON object on one line (see
+``FeedDaemon.answer``). The reply is a JSON header line followed by the
+output.
+"""
+
+import os
+import socketserver
+import threading
+import time
+
+from . import app, codec
+from .events import ingest
+
+# Feeds not queried for this long are no longer kept or refreshed
+IDLE_TIMEOUT = 3600  # seconds
+# How often the daemon looks for feeds due a refresh
+REFRESH_CHECK = 1.0  # seconds
+MAX_REQUEST = 64 * 1024  # bytes
+FORMATS = ("text", "json", "ndjson")
+
+
+class Feed:
+    """A warm feed: its latest events and any error from loading it"""
+
+    def __init__(self, name):
+        self.name = name
+        self.events = None
+        self.messages = []
+        self.fetched_at = None
+        self.last_used = time.time()
+        # Held while loading, so concurrent queries for a new feed fetch it once
+        self.lock = threading.Lock()
+
+
+def render_json(events, fmt):
+    """Events as ``gh-feed --format json|ndjson --output -`` writes them"""
+    records = [codec.dumps(event.to_dict()) for event in events]
+    if fmt == "ndjson":
+        return "".join(record + "\n" for record in records)
+    return "[\n" + ",\n".join(records) + "\n]\n" if records else "[]\n"
+
+
+class FeedDaemon:
+    """The feeds the daemon keeps warm, and the answers to queries about them"""
+
+    def __init__(self, token=None):
+        self.token = token
+        self.fingerprint = app.token_fingerprint(token)
+        self._feeds = {}
+        self._lock = threading.Lock()
+        self._refresher = app.BackgroundRefresher()
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start refreshing feeds in the background"""
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(REFRESH_CHECK):
+            self.refresh_due()
+
+    def refresh_due(self):
+        """Drop idle feeds and queue a refresh of every feed past its cache lifetime"""
+        now = time.time()
+        with self._lock:
+            for name, feed in list(self._feeds.items()):
+                if now - feed.last_used > IDLE_TIMEOUT:
+                    del self._feeds[name]
+                elif feed.fetched_at is not None and now - feed.fetched_at >= app.get_ttl(name):
+                    self._refresher.submit(name, self._load, feed)
+
+    def wait(self, timeout=None):
+        """Wait for queued refreshes to finish; True if they did"""
+        return self._refresher.wait(timeout)
+
+    @property
+    def feeds(self):
+        with self._lock:
+            return list(self._feeds)
+
+    def get(self, name):
+        """Return the feed ``name``, loading it first if it is new"""
+        with self._lock:
+            feed = self._feeds.get(name)
+            if feed is None:
+                feed = self._feeds[name] = Feed(name)
+        feed.last_used = time.time()
+        if feed.fetched_at is None:
+            self._load(feed, initial=True)
+        return feed
+
+    def _load(self, feed, initial=False):
+        messages = []
+        with feed.lock:
+            if initial and feed.fetched_at is not None:
+                return  # Another query loaded it meanwhile
+            # A loaded feed is revalidated; a failed one goes through the
+            # cache again, which remembers 404s and rate limits for a while
+            events, _ = app.fetch_first_page(feed.name, self.token, log=messages.append,
+                                             revalidate=feed.events is not None, full=True)
+            if events is not None:
+                # Whole events, so json/ndjson answers match an in-process export
+                feed.events = ingest(events, full=True)
+                feed.messages = []
+            elif feed.events is None:
+                feed.messages = [message for message in messages if not message.startswith("(")]
+            feed.fetched_at = time.time()
+
+    def answer(self, request):
+        """Answer one request, returning ``(header, body)``.
+
+        Requests are ``{"feed": name, "token": fingerprint, "filter": types,
+        "limit": n, "format": "text"|"json"|"ndjson", "color": bool}`` (all
+        but ``feed`` optional; ``token`` is ``app.token_fingerprint`` of the
+        client's token), ``{"command": "ping"}`` or ``{"command": "stop"}``.
+        The header holds ``status`` ("ok", "error", or "wrong_token" if the
+        client's token is not the daemon's) and ``messages`` to show the user.
+        A ``limit`` of 0 means the default, as ``--limit 0`` does in-process.
+        """
+        command = request.get("command")
+        if command == "ping":
+            return {"status": "ok", "feeds": len(self.feeds)}, ""
+        if command is not None:
+            return {"status": "error", "messages": [f"Error: unknown command '{command}'"]}, ""
+
+        name = request.get("feed")
+        fmt = request.get("format") or "text"
+        limit = request.get("limit")
+        valid_limit = limit is None or (isinstance(limit, int) and limit >= 0)
+        if not isinstance(name, str) or not name or fmt not in FORMATS or not valid_limit:
+            return {"status": "error", "messages": ["Error: malformed request"]}, ""
+        if request.get("token") != self.fingerprint:
+            # Another token may see other events (private ones, a --received feed)
+            return {"status": "wrong_token"}, ""
+
+        feed = self.get(name)
+        events = feed.events
+        if events is None:
+            return {"status": "error", "messages": feed.messages}, ""
+        header = {"status": "ok", "messages": feed.messages, "age": round(time.time() - feed.fetched_at, 1)}
+        filter_types = request.get("filter")
+        if fmt == "text":
+            lines = app.render_activity(events, filter_types, limit or app.DISPLAY_LIMIT,
+                                        app.feed_has_many_actors(name), bool(request.get("color")))
+            return header, "\n".join(lines)
+
+        matcher = app.compile_filter(filter_types)
+        if matcher is not None:
+            events = [event for event in events if matcher(event.type)]
+        return header, render_json(events[:limit] if limit else events, fmt)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = codec.loads(self.rfile.readline(MAX_REQUEST))
+            if not isinstance(request, dict):
+                raise ValueError("request is not an object")
+        except ValueError:
+            header, body = {"status": "error", "messages": ["Error: malformed request"]}, ""
+        else:
+            if request.get("command") == "stop":
+                header, body = {"status": "ok"}, ""
+                # Reply first: shutdown() blocks until the serve loop notices
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                try:
+                    header, body = self.server.feeds.answer(request)
+                except Exception as e:
+                    header, body = {"status": "error", "messages": [f"Error: {e}"]}, ""
+        self.wfile.write(codec.dumps(header).encode("utf-8") + b"\n" + body.encode("utf-8"))
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, feeds):
+        self.feeds = feeds
+        super().__init__(path, RequestHandler)
+
+
+def serve(path, token=None, log=print):
+    """Serve feeds on the Unix socket at ``path`` until stopped; False if it could not start"""
+    if app.query_daemon({"command": "ping"}, path) is not None:
+        log(f"Error: a gh-feed daemon is already running on {path}")
+        return False
+    # Left behind by a daemon that did not shut down cleanly
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    feeds = FeedDaemon(token)
+    server = DaemonServer(path, feeds)
+    try:
+        # Feeds may be fetched with a private token: only this user may ask
+        os.chmod(path, 0o600)
+        feeds.start()
+        log(f"gh-feed daemon listening on {path} (Ctrl-C or 'gh-feed serve --stop' to stop)")
+        server.serve_forever(poll_interval=0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feeds.stop()
+        server.server_close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return True
@@ -0,0 +1,205 @@
+"""Slim in-memory event records.
+
+The API sends every event as a nested dict with URLs, avatars and full
+user, repo and payload objects. The CLI turns each fetched page into
+``Event`` records once, right away (see ``ingest``): the actor and repo are
+kept as plain (interned) names, ``created_at`` as epoch seconds, and the
+payload is cut down to the fields gh-feed reads and kept marshal-encoded
+until something reads it. An ``Event`` takes a fraction of the memory of
+the dict it came from, which matters once follow mode or a long
+``--limit`` holds tens of thousands of them.
+
+Exports want the original data, so ``ingest(page, full=True)`` also keeps
+the API dict on each event and ``to_dict()`` returns it unchanged.
+"""
+
+import marshal
+import sys
+import time
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# The parts of each event gh-feed reads (formatters, exports, stats and
+# history); the cache and ``Event`` keep only these. A dict keeps only the
+# listed keys (None keeps a value whole, a nested dict projects it, and
+# applies to each item of a list); URLs, avatars, full user/repo objects
+# and bodies are dropped.
+EVENT_FIELDS = {
+    "id": None,
+    "type": None,
+    "actor": {"login": None},
+    "repo": {"name": None},
+    "org": {"login": None},
+    "created_at": None,
+    "public": None,
+}
+PAYLOAD_FIELDS = {
+    "PushEvent": {"ref": None, "size": None, "distinct_size": None, "head": None, "before": None,
+                  "commits": {"sha": None, "message": None, "distinct": None}},
+    "CreateEvent": {"ref": None, "ref_type": None, "master_branch": None, "description": None},
+    "DeleteEvent": {"ref": None, "ref_type": None},
+    "ForkEvent": {"forkee": {"full_name": None}},
+    "IssuesEvent": {"action": None, "issue": {"number": None, "title": None, "state": None}},
+    "IssueCommentEvent": {"action": None, "issue": {"number": None, "title": None}},
+    "PullRequestEvent": {"action": None, "number": None,
+                         "pull_request": {"number": None, "title": None, "state": None, "merged": None}},
+    "PullRequestReviewEvent": {"action": None, "review": {"state": None},
+                               "pull_request": {"number": None, "title": None}},
+    "PullRequestReviewCommentEvent": {"action": None, "comment": {"id": None},
+                                      "pull_request": {"number": None, "title": None}},
+    "ReleaseEvent": {"action": None, "release": {"name": None, "tag_name": None}},
+    "WatchEvent": {"action": None},
+    "MemberEvent": {"action": None, "member": {"login": None}},
+    "GollumEvent": {"pages": {"page_name": None, "action": None}},
+    "CommitCommentEvent": {"comment": {"commit_id": None}},
+    "PublicEvent": {},
+}
+
+
+def project(value, fields):
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, subfields in fields.items():
+        if key in value:
+            item = value[key]
+            projected[key] = item if subfields is None else project(item, subfields)
+    return projected
+
+
+def parse_timestamp(iso_time):
+    """Convert a GitHub ``YYYY-MM-DDTHH:MM:SSZ`` timestamp to epoch seconds.
+
+    Every API timestamp has this fixed layout, so the fields are sliced out
+    directly instead of going through ``datetime.strptime``.
+    """
+    if len(iso_time) != 20 or iso_time[10] != "T" or iso_time[19] != "Z":
+        raise ValueError(f"unexpected timestamp format: {iso_time!r}")
+    year, month, day = int(iso_time[0:4]), int(iso_time[5:7]), int(iso_time[8:10])
+    hour, minute, second = int(iso_time[11:13]), int(iso_time[14:16]), int(iso_time[17:19])
+    # Days since 1970-01-01 in the proleptic Gregorian calendar
+    y = year - (month <= 2)
+    era = y // 400
+    year_of_era = y - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+    return days * 86400 + hour * 3600 + minute * 60 + second
+
+
+def format_timestamp(epoch):
+    """The inverse of ``parse_timestamp``"""
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+
+class Event:
+    """One event: ``id``, ``type``, ``actor`` and ``repo`` names, ``created_at``
+    (epoch seconds, or None if unknown), the ``payload`` fields gh-feed uses
+    and, in full mode, the ``raw`` API dict.
+
+    ``payload`` is decoded on every access, so read it once per use and
+    treat it as read-only. Read-only ``event["..."]`` and ``event.get(...)``
+    lookups answer with the API's shapes (``event["repo"]["name"]``), so
+    event formatters written against the raw dicts keep working.
+    """
+
+    __slots__ = ("id", "type", "actor", "repo", "created_at", "_payload", "raw")
+
+    def __init__(self, id, type, actor="", repo="", created_at=None, payload=None, raw=None):
+        self.id = id
+        # Types, actors and repos repeat across events; share one string each
+        self.type = sys.intern(type)
+        self.actor = sys.intern(actor)
+        self.repo = sys.intern(repo)
+        self.created_at = created_at
+        self.raw = raw
+        # Full mode reads the payload from ``raw`` instead
+        self._payload = marshal.dumps(payload) if payload and raw is None else None
+
+    @property
+    def payload(self):
+        if self.raw is not None:
+            return self.raw.get("payload") or {}
+        return {} if self._payload is None else marshal.loads(self._payload)
+
+    @classmethod
+    def from_api(cls, data, full=False, payload_fields=None):
+        """Build an event from an API dict.
+
+        ``payload_fields`` maps event types to the payload projection to
+        apply (normally ``PAYLOAD_FIELDS``); without it, or in full mode,
+        the payload is kept as is.
+        """
+        created_at = data.get("created_at")
+        try:
+            created_at = parse_timestamp(created_at) if created_at else None
+        except ValueError:
+            created_at = None
+        event_type = data.get("type") or ""
+        payload = data.get("payload") or {}
+        if payload_fields is not None and not full:
+            fields = payload_fields.get(event_type)
+            if fields is not None:
+                payload = project(payload, fields)
+        event_id = data.get("id")
+        return cls(
+            None if event_id is None else str(event_id),
+            event_type,
+            (data.get("actor") or {}).get("login") or "",
+            (data.get("repo") or {}).get("name") or "",
+            created_at,
+            payload,
+            data if full else None,
+        )
+
+    @property
+    def iso_created_at(self):
+        return "" if self.created_at is None else format_timestamp(self.created_at)
+
+    def to_dict(self):
+        """The event in the API's shape: the original dict in full mode, else a rebuilt one"""
+        if self.raw is not None:
+            return self.raw
+        data = {"id": self.id, "type": self.type, "actor": {"login": self.actor}, "repo": {"name": self.repo},
+                "created_at": self.iso_created_at, "payload": self.payload}
+        if self.id is None:
+            del data["id"]
+        return data
+
+    def __getitem__(self, key):
+        if key == "type":
+            return self.type
+        if key == "payload":
+            return self.payload
+        if key == "repo":
+            return {"name": self.repo}
+        if key == "actor":
+            return {"login": self.actor}
+        if key == "created_at":
+            return self.iso_created_at
+        if key == "id" and self.id is not None:
+            return self.id
+        if self.raw is not None:
+            return self.raw[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Event({self.id!r}, {self.type!r}, actor={self.actor!r}, repo={self.repo!r})"
+
+
+def as_event(event):
+    """Return ``event`` as an ``Event``, wrapping an API dict (kept whole) if needed"""
+    return event if isinstance(event, Event) else Event.from_api(event, full=True)
+
+
+def ingest(page, full=False):
+    """Convert a page of API dicts to ``Event`` records"""
+    return [Event.from_api(event, full, PAYLOAD_FIELDS) for event in page]
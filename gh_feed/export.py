@@ -0,0 +1,141 @@
+"""Streaming event export as JSON, NDJSON or CSV.
+
+Events are written one at a time as they come out of the fetch pipeline, so
+exports of any size use constant memory and a downstream consumer reading
+from stdout can start before the export finishes. Paths ending in ``.gz``
+are gzip-compressed.
+"""
+
+import csv
+import gzip
+import sys
+
+from . import codec
+
+FORMATS = ("json", "ndjson", "csv")
+CSV_FIELDS = ["id", "type", "actor", "repo", "created_at", "action", "ref", "commits", "payload"]
+
+
+def guess_format(path):
+    """Infer the export format from a file name, defaulting to json"""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+def open_output(path):
+    """Open ``path`` for text output; ``-`` is stdout and ``.gz`` is compressed"""
+    if path == "-":
+        return sys.stdout, False
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline=""), True
+    return open(path, "w", encoding="utf-8", newline=""), True
+
+
+def csv_row(event):
+    payload = event.get("payload") or {}
+    commits = payload.get("commits")
+    return {
+        "id": event.get("id", ""),
+        "type": event.get("type", ""),
+        "actor": (event.get("actor") or {}).get("login", ""),
+        "repo": (event.get("repo") or {}).get("name", ""),
+        "created_at": event.get("created_at", ""),
+        "action": payload.get("action", ""),
+        "ref": payload.get("ref") or "",
+        "commits": len(commits) if isinstance(commits, list) else payload.get("size", ""),
+        "payload": codec.dumps(payload),
+    }
+
+
+class Exporter:
+    """Writes events to ``path`` one by one in the given format"""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.format = fmt or guess_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"unknown export format: {self.format}")
+        self.count = 0
+        self._stream, self._owned = open_output(path)
+        self._csv = None
+        if self.format == "json":
+            self._stream.write("[")
+        elif self.format == "csv":
+            self._csv = csv.DictWriter(self._stream, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, event):
+        """Write one event, given as an API dict or an ``Event``"""
+        if not isinstance(event, dict):
+            event = event.to_dict()
+        if self.format == "csv":
+            self._csv.writerow(csv_row(event))
+        elif self.format == "ndjson":
+            self._stream.write(codec.dumps(event))
+            self._stream.write("\n")
+        else:
+            self._stream.write(",\n" if self.count else "\n")
+            self._stream.write(codec.dumps(event))
+        self.count += 1
+        if self.format == "ndjson" and not self._owned:
+            # Let a consumer reading from a pipe see each record as it is written
+            self._stream.flush()
+
+    def write_all(self, events, matcher=None):
+        for event in events:
+            if matcher is None or matcher(event["type"]):
+                self.write(event)
+
+    def tee(self, events, matcher=None):
+        """Wrap ``events`` so every event is exported as it is consumed"""
+        return ExportStream(events, self, matcher)
+
+    def close(self):
+        if self.format == "json":
+            self._stream.write("\n]\n" if self.count else "]\n")
+        if self._owned:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ExportStream:
+    """Iterator that passes events through unchanged, exporting each one.
+
+    The display can stop early once it has shown enough events; ``drain()``
+    then exports whatever it did not consume. A source's ``would_block`` is
+    passed through so streaming display keeps working.
+    """
+
+    def __init__(self, events, exporter, matcher=None):
+        self._events = iter(events)
+        self._exporter = exporter
+        self._matcher = matcher
+        would_block = getattr(events, "would_block", None)
+        if would_block is not None:
+            self.would_block = would_block
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        event = next(self._events)
+        if self._matcher is None or self._matcher(event["type"]):
+            self._exporter.write(event)
+        return event
+
+    def drain(self):
+        for _ in self:
+            pass
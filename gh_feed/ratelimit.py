@@ -0,0 +1,173 @@
+"""Client-side pacing of GitHub API requests across one or more tokens.
+
+Every API response reports how much quota the token that made it has left
+and when that quota resets. ``RateLimiter`` keeps that state per token,
+sends each request with the token that has the most quota left, and spaces
+requests with a token bucket refilled at ``remaining / time to reset``:
+short runs go at full speed out of the bucket, long runs settle at the
+rate the quota can sustain, so the quota is not used up before it resets.
+If the API rejects a request for rate limiting anyway, the token is
+marked exhausted and requests wait for the earliest reset.
+"""
+
+import threading
+import time
+
+# A token's bucket holds up to this fraction of its remaining quota
+BURST_FRACTION = 0.5
+# Window assumed when a response carries no reset time
+DEFAULT_WINDOW = 3600  # seconds
+# Wait assumed after a rate-limit rejection that says nothing about when to retry
+DEFAULT_RETRY_AFTER = 60  # seconds
+# Waits at least this long are announced through the caller's log
+NOTICE_AFTER = 5  # seconds
+
+
+def split_tokens(token):
+    """Turn None, ``"a"``, ``"a,b,c"`` or a sequence of tokens into a tuple.
+
+    No token at all becomes ``(None,)``: unauthenticated requests have a
+    (small) quota of their own that is tracked the same way.
+    """
+    if not token:
+        return (None,)
+    if isinstance(token, str):
+        token = token.split(",")
+    tokens = tuple(dict.fromkeys(t.strip() for t in token if t and t.strip()))
+    return tokens or (None,)
+
+
+def header_int(headers, name):
+    value = headers.get(name) if headers is not None else None
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limited(code, headers):
+    """True if an error response is a rate-limit rejection rather than a real 403"""
+    if code not in (403, 429):
+        return False
+    return header_int(headers, "X-RateLimit-Remaining") == 0 or header_int(headers, "Retry-After") is not None
+
+
+def format_wait(seconds):
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.0f}m"
+
+
+class TokenState:
+    """Quota and bucket state of one token"""
+
+    __slots__ = ("token", "remaining", "reset", "allowance", "refilled")
+
+    def __init__(self, token):
+        self.token = token
+        self.remaining = None  # unknown until the first response
+        self.reset = None
+        self.allowance = 0.0
+        self.refilled = None
+
+
+class RateLimiter:
+    """Chooses a token for each request and blocks until it may be sent"""
+
+    def __init__(self, tokens=None, clock=None, sleep=None):
+        self.tokens = split_tokens(tokens)
+        self._states = {token: TokenState(token) for token in self.tokens}
+        self._lock = threading.Lock()
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+
+    def _rate(self, state, now):
+        window = state.reset - now if state.reset is not None else DEFAULT_WINDOW
+        return state.remaining / max(window, 1)
+
+    def _refill(self, state, now):
+        capacity = max(1.0, state.remaining * BURST_FRACTION)
+        if state.refilled is not None:
+            state.allowance += (now - state.refilled) * self._rate(state, now)
+        state.allowance = min(state.allowance, capacity)
+        state.refilled = now
+
+    def _available_at(self, state, now):
+        """Earliest time ``state`` may send a request (``now`` if it may right away)"""
+        if state.reset is not None and now >= state.reset:
+            # A new window: the quota is back, and the next response says how much
+            state.remaining = state.reset = state.refilled = None
+        if state.remaining is None:
+            return now
+        if state.remaining <= 0:
+            return state.reset if state.reset is not None else now + DEFAULT_RETRY_AFTER
+        self._refill(state, now)
+        if state.allowance >= 1:
+            return now
+        return now + (1 - state.allowance) / self._rate(state, now)
+
+    def acquire(self, log=None):
+        """Block until a request may be sent and return the token to send it with"""
+        announced = False
+        while True:
+            with self._lock:
+                now = self._clock()
+                # Soonest available first; among those, the most quota left
+                best = None
+                for order, candidate in enumerate(self._states.values()):
+                    available = self._available_at(candidate, now)
+                    left = float("inf") if candidate.remaining is None else candidate.remaining
+                    key = (available, -left, order)
+                    if best is None or key < best[0]:
+                        best = (key, candidate)
+                (at, _, _), state = best
+                if at <= now:
+                    if state.remaining is not None:
+                        # Reserve the request so concurrent callers see it
+                        state.remaining -= 1
+                        state.allowance -= 1
+                    return state.token
+            wait = at - now
+            if log is not None and wait >= NOTICE_AFTER and not announced:
+                log(f"(Rate limit reached; waiting {format_wait(wait)} for it to reset)")
+                announced = True
+            self._sleep(wait)
+
+    def update(self, token, headers, counted=True):
+        """Record the quota reported by a response made with ``token``.
+
+        ``counted`` is False for responses that cost no quota (304 Not
+        Modified), which returns the request reserved by ``acquire``.
+        """
+        remaining = header_int(headers, "X-RateLimit-Remaining")
+        reset = header_int(headers, "X-RateLimit-Reset")
+        with self._lock:
+            state = self._states[token]
+            if not counted and state.remaining is not None:
+                state.remaining += 1
+                state.allowance += 1
+            if remaining is None:
+                return
+            if state.remaining is None or reset != state.reset:
+                # First response in this window: start with a full bucket
+                state.remaining, state.reset = remaining, reset
+                state.allowance, state.refilled = max(1.0, remaining * BURST_FRACTION), self._clock()
+            else:
+                # Responses can arrive out of order; never count quota twice
+                state.remaining = min(state.remaining, remaining)
+
+    def exhausted(self, token, headers):
+        """Mark ``token`` out of quota after the API rejected a request"""
+        retry_after = header_int(headers, "Retry-After")
+        reset = header_int(headers, "X-RateLimit-Reset")
+        with self._lock:
+            state = self._states[token]
+            now = self._clock()
+            state.remaining = 0
+            state.allowance = 0.0
+            if retry_after is not None:
+                state.reset = now + retry_after
+            elif reset is not None and reset > now:
+                state.reset = reset
+            else:
+                state.reset = now + DEFAULT_RETRY_AFTER
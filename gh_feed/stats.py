@@ -0,0 +1,205 @@
+"""Activity statistics over the local event history.
+
+Rows are loaded from the history database into typed arrays, one per
+column, with repeated strings (users, types, repos, hours) interned to small
+integer codes. Every histogram is then a count over one of those arrays,
+which ``Counter`` does in C, so millions of events are summarized in seconds
+without decoding any event JSON.
+"""
+
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import compress
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+BAR_WIDTH = 30
+
+
+class Interner(dict):
+    """Maps each distinct value to an integer code assigned on first sight"""
+
+    def __missing__(self, key):
+        code = self[key] = len(self)
+        return code
+
+
+class HourSlots(dict):
+    """Maps ``YYYY-MM-DDTHH`` strings to ``day_ordinal * 24 + hour`` (0 if invalid)"""
+
+    def __missing__(self, key):
+        try:
+            slot = date.fromisoformat(key[:10]).toordinal() * 24 + int(key[11:13])
+        except (TypeError, ValueError):
+            slot = 0
+        self[key] = slot
+        return slot
+
+
+class ActivityColumns:
+    """Column-oriented copy of the rows yielded by ``EventStore.iter_activity``.
+
+    Time is kept as one hour slot per event (proleptic Gregorian day ordinal
+    times 24 plus the UTC hour), so day, weekday and hour histograms all
+    derive from a single count over the distinct slots.
+    """
+
+    def __init__(self):
+        self.user_codes = Interner()
+        self.type_codes = Interner()
+        self.repo_codes = Interner()
+        self._hour_slots = HourSlots()
+        self.users = array("I")
+        self.types = array("I")
+        self.repos = array("I")
+        self.slots = array("I")
+        self.commits = array("I")
+
+    def __len__(self):
+        return len(self.types)
+
+    def extend(self, rows):
+        """Append a batch of ``(user, type, repo, hour, commits)`` rows"""
+        if not rows:
+            return
+        users, types, repos, hours, commits = zip(*rows)
+        self.users.extend(map(self.user_codes.__getitem__, users))
+        self.types.extend(map(self.type_codes.__getitem__, types))
+        self.repos.extend(map(self.repo_codes.__getitem__, repos))
+        self.slots.extend(map(self._hour_slots.__getitem__, hours))
+        self.commits.extend(commits)
+
+    @classmethod
+    def from_batches(cls, batches):
+        columns = cls()
+        for rows in batches:
+            columns.extend(rows)
+        return columns
+
+
+def decode_counts(counts, codes):
+    """Turn a Counter of codes into a ``{name: count}`` dict, largest first"""
+    names = list(codes)  # codes are assigned in insertion order
+    return {names[code]: num for code, num in counts.most_common()}
+
+
+def day_name(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+def find_streaks(active_days, today):
+    """Return ``(current, longest, longest_start, longest_end)`` in days.
+
+    A streak still counts as current if its last active day is yesterday,
+    since today may simply not have had activity yet.
+    """
+    longest = 0
+    longest_start = longest_end = None
+    run_start = previous = None
+    for day in sorted(active_days):
+        if previous is None or day != previous + 1:
+            run_start = day
+        if day - run_start + 1 > longest:
+            longest = day - run_start + 1
+            longest_start, longest_end = run_start, day
+        previous = day
+    current = previous - run_start + 1 if previous is not None and previous >= today - 1 else 0
+    return current, longest, longest_start, longest_end
+
+
+def summarize(columns, today=None):
+    """Compute every statistic over ``columns`` as a JSON-serializable dict"""
+    today = (today or date.today()).toordinal()
+
+    slot_counts = Counter(columns.slots)
+    slot_counts.pop(0, None)  # events without a valid timestamp
+    day_counts = Counter()
+    hours = [0] * 24
+    for slot, num in slot_counts.items():
+        day_counts[slot // 24] += num
+        hours[slot % 24] += num
+    weekdays = [0] * 7
+    for ordinal, num in day_counts.items():
+        weekdays[(ordinal - 1) % 7] += num
+
+    # Only pushes carry commits, so select them once and count over the subset
+    pushed = columns.commits
+    push_repos = Counter()
+    for repo, num in zip(compress(columns.repos, pushed), compress(pushed, pushed)):
+        push_repos[repo] += num
+    push_days = Counter()
+    for slot, num in zip(compress(columns.slots, pushed), compress(pushed, pushed)):
+        push_days[slot // 24] += num
+    push_days.pop(0, None)
+
+    current, longest, longest_start, longest_end = find_streaks(day_counts, today)
+    active = sorted(day_counts)
+    return {
+        "events": len(columns),
+        "active_days": len(active),
+        "first_day": day_name(active[0]) if active else None,
+        "last_day": day_name(active[-1]) if active else None,
+        "by_user": decode_counts(Counter(columns.users), columns.user_codes),
+        "by_type": decode_counts(Counter(columns.types), columns.type_codes),
+        "by_repo": decode_counts(Counter(columns.repos), columns.repo_codes),
+        "by_weekday": dict(zip(WEEKDAYS, weekdays)),
+        "by_hour": hours,
+        "by_day": {day_name(day): day_counts[day] for day in active},
+        "commits": {
+            "total": sum(pushed),
+            "pushes": len(pushed) - pushed.count(0),
+            "by_repo": decode_counts(push_repos, columns.repo_codes),
+            "by_day": {day_name(day): push_days[day] for day in sorted(push_days)},
+        },
+        "streaks": {
+            "current": current,
+            "longest": longest,
+            "longest_start": day_name(longest_start) if longest else None,
+            "longest_end": day_name(longest_end) if longest else None,
+        },
+    }
+
+
+def bar(num, peak):
+    return "#" * (round(BAR_WIDTH * num / peak) if peak else 0)
+
+
+def format_stats(stats, top=10):
+    """Render ``summarize`` output as text lines, showing ``top`` rows per ranking"""
+    if not stats["events"]:
+        return ["No stored activity matches. Fetch some feeds first."]
+
+    commits = stats["commits"]
+    streaks = stats["streaks"]
+    lines = [
+        f"Events: {stats['events']} on {stats['active_days']} days"
+        f" ({stats['first_day']} to {stats['last_day']})",
+        f"Commits: {commits['total']} in {commits['pushes']} pushes",
+        f"Streaks: current {streaks['current']} days, longest {streaks['longest']} days"
+        + (f" ({streaks['longest_start']} to {streaks['longest_end']})" if streaks["longest"] else ""),
+    ]
+
+    if len(stats["by_user"]) > 1:
+        lines.append("\nBy user:")
+        lines.extend(f"- {user}: {num}" for user, num in list(stats["by_user"].items())[:top])
+
+    lines.append("\nBy type:")
+    lines.extend(f"- {event_type}: {num}" for event_type, num in stats["by_type"].items())
+
+    lines.append("\nTop repositories:")
+    for repo, num in list(stats["by_repo"].items())[:top]:
+        repo_commits = commits["by_repo"].get(repo)
+        lines.append(f"- {repo or '(none)'}: {num}" + (f" ({repo_commits} commits)" if repo_commits else ""))
+
+    peak = max(stats["by_weekday"].values())
+    lines.append("\nBy weekday:")
+    lines.extend(f"- {name} {num:>6} {bar(num, peak)}" for name, num in stats["by_weekday"].items())
+
+    peak = max(stats["by_hour"])
+    lines.append("\nBy hour (UTC):")
+    lines.extend(f"- {hour:02d} {num:>6} {bar(num, peak)}" for hour, num in enumerate(stats["by_hour"]))
+
+    busiest = sorted(stats["by_day"].items(), key=lambda item: item[1], reverse=True)[:top]
+    lines.append("\nBusiest days:")
+    lines.extend(f"- {day}: {num}" for day, num in busiest)
+    return lines
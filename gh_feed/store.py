@@ -0,0 +1,310 @@
+"""Local SQLite store that accumulates event history across fetches.
+
+Every event fetched from the API is upserted by its GitHub event id, so the
+history keeps growing past the API's 300-event / 90-day window and can be
+queried by user, type, repo and date without touching the network.
+
+Each event's text (repo name, commit messages, issue/PR titles, release
+names, refs) is also indexed for ``gh-feed search`` as it is stored: in an
+FTS5 table when SQLite has FTS5, otherwise in a plain inverted index table.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from . import codec
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    type TEXT NOT NULL,
+    repo TEXT,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    commits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS events_user ON events (user, created_at);
+CREATE INDEX IF NOT EXISTS events_type ON events (type, created_at);
+CREATE INDEX IF NOT EXISTS events_repo ON events (repo, created_at);
+CREATE INDEX IF NOT EXISTS events_created_at ON events (created_at);
+"""
+# Bumped whenever an existing database needs migrating (see EventStore._migrate)
+SCHEMA_VERSION = 1
+FTS_SCHEMA = "CREATE VIRTUAL TABLE events_fts USING fts5(text)"
+# Without FTS5: one row per distinct word of each event's text
+TERMS_SCHEMA = """
+CREATE TABLE search_terms (term TEXT NOT NULL, event INTEGER NOT NULL);
+CREATE INDEX search_terms_term ON search_terms (term, event);
+CREATE INDEX search_terms_event ON search_terms (event);
+"""
+# SQLite's default limit on ? parameters in one statement is 999
+MAX_PARAMS = 500
+WORD = re.compile(r"\w+")
+
+
+def push_commits(event):
+    """Number of commits in a PushEvent (0 for any other event)"""
+    if event.get("type") != "PushEvent":
+        return 0
+    payload = event.get("payload") or {}
+    size = payload.get("size")
+    if isinstance(size, int):
+        return size
+    return len(payload.get("commits") or ())
+
+
+def search_text(event):
+    """The text ``gh-feed search`` matches an event against"""
+    payload = event.get("payload") or {}
+    parts = [(event.get("repo") or {}).get("name"), payload.get("ref"), payload.get("description"),
+             (payload.get("forkee") or {}).get("full_name")]
+    parts += [commit.get("message") for commit in payload.get("commits") or () if isinstance(commit, dict)]
+    for key in ("issue", "pull_request", "release"):
+        item = payload.get(key)
+        if isinstance(item, dict):
+            parts += [item.get("title"), item.get("name"), item.get("tag_name")]
+    parts += [page.get("page_name") for page in payload.get("pages") or () if isinstance(page, dict)]
+    return "\n".join(part for part in parts if isinstance(part, str) and part)
+
+
+def search_terms(text):
+    """The distinct lowercase words of ``text``, for the fallback index"""
+    return set(WORD.findall(text.lower()))
+
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(text)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def parse_date_bound(value, end_of_day=False):
+    """Normalize a --since/--until value to an ISO 8601 UTC string.
+
+    Accepts a full timestamp, a ``YYYY-MM-DD`` date or a relative age such
+    as ``30d`` or ``12h``. Date-only upper bounds include the whole day.
+    """
+    value = value.strip()
+    if value[-1:] in ("d", "h") and value[:-1].isdigit():
+        amount = int(value[:-1])
+        delta = timedelta(days=amount) if value[-1] == "d" else timedelta(hours=amount)
+        return (datetime.now(timezone.utc) - delta).strftime("%Y-%m-%dT%H:%M:%SZ")
+    if len(value) == 10:
+        datetime.strptime(value, "%Y-%m-%d")  # validate
+        return value + ("T23:59:59Z" if end_of_day else "T00:00:00Z")
+    datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")  # validate
+    return value
+
+
+class EventStore:
+    """SQLite-backed event history, safe to share between threads"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self.fts = fts5_available(self._conn)
+        self._create_search_index()
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(events)")}
+            if "commits" not in columns:
+                # Version 1: commit counts get their own column so stats never parse JSON
+                self._conn.execute("ALTER TABLE events ADD COLUMN commits INTEGER NOT NULL DEFAULT 0")
+                rows = self._conn.execute("SELECT id, data FROM events WHERE type = 'PushEvent'").fetchall()
+                self._conn.executemany("UPDATE events SET commits = ? WHERE id = ?",
+                                       [(push_commits(codec.loads(data)), event_id) for event_id, data in rows])
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _create_search_index(self):
+        """Create the search index on first use, indexing the events already stored"""
+        table = "events_fts" if self.fts else "search_terms"
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+        if exists:
+            return
+        with self._conn:
+            if self.fts:
+                self._conn.execute(FTS_SCHEMA)
+            else:
+                self._conn.executescript(TERMS_SCHEMA)
+            cursor = self._conn.execute("SELECT rowid, data FROM events")
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                self._index([(rowid, search_text(codec.loads(data))) for rowid, data in rows])
+
+    def _index(self, rows):
+        """Add ``(rowid, text)`` rows to the search index"""
+        if self.fts:
+            self._conn.executemany("INSERT INTO events_fts (rowid, text) VALUES (?, ?)", rows)
+        else:
+            self._conn.executemany("INSERT INTO search_terms (term, event) VALUES (?, ?)",
+                                   [(term, rowid) for rowid, text in rows for term in search_terms(text)])
+
+    def _rowids(self, event_ids):
+        """Map the stored events among ``event_ids`` to their rowids"""
+        rowids = {}
+        for start in range(0, len(event_ids), MAX_PARAMS):
+            chunk = event_ids[start:start + MAX_PARAMS]
+            rowids.update((event_id, rowid) for rowid, event_id in self._conn.execute(
+                f"SELECT rowid, id FROM events WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        return rowids
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, events, user=None):
+        """Insert or update ``events``, returning how many were stored.
+
+        Events without an id are skipped. ``user`` is used when an event has
+        no actor.
+        """
+        rows = []
+        texts = {}
+        for event in events:
+            event_id = event.get("id")
+            if not event_id:
+                continue
+            actor = (event.get("actor") or {}).get("login") or user or ""
+            repo = (event.get("repo") or {}).get("name")
+            rows.append((str(event_id), actor, event.get("type", ""), repo,
+                         event.get("created_at", ""), codec.dumps(event), push_commits(event)))
+            texts[str(event_id)] = search_text(event)
+        if not rows:
+            return 0
+        event_ids = list(texts)
+        with self._lock, self._conn:
+            # A replaced row gets a new rowid, so its old index entries go first
+            replaced = [(rowid,) for rowid in self._rowids(event_ids).values()]
+            if self.fts:
+                self._conn.executemany("DELETE FROM events_fts WHERE rowid = ?", replaced)
+            else:
+                self._conn.executemany("DELETE FROM search_terms WHERE event = ?", replaced)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events (id, user, type, repo, created_at, data, commits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._index([(rowid, texts[event_id]) for event_id, rowid in self._rowids(event_ids).items()])
+        return len(rows)
+
+    def query(self, users=None, event_type=None, repo=None, since=None, until=None, limit=None):
+        """Return matching events as API-shaped dicts, newest first"""
+        return list(self.iter_query(users, event_type, repo, since, until, limit))
+
+    def iter_query(self, users=None, event_type=None, repo=None, since=None, until=None, limit=None,
+                   batch_size=500):
+        """Like ``query`` but yields events lazily, ``batch_size`` rows at a time"""
+        where, params = self._where(users, event_type, repo, since, until)
+        sql = f"SELECT data FROM events{where} ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for (data,) in self._iter_rows(sql, params, batch_size):
+            yield codec.loads(data)
+
+    def search(self, query, users=None, event_type=None, repo=None, since=None, until=None, limit=None):
+        """Return events whose text contains every word of ``query``, best matches first.
+
+        With FTS5, hits are ranked by BM25 (a word given with punctuation,
+        like ``flaky-test``, must appear as written); without it, every word
+        must appear anywhere and hits are ordered newest first.
+        """
+        clauses, params = self._clauses(users, event_type, repo, since, until)
+        if self.fts:
+            words = query.split()
+            if not words:
+                return []
+            match = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+            sql = ("SELECT events.data FROM events_fts JOIN events ON events.rowid = events_fts.rowid "
+                   f"WHERE {' AND '.join(['events_fts MATCH ?'] + clauses)} "
+                   "ORDER BY bm25(events_fts), events.created_at DESC")
+            params.insert(0, match)
+        else:
+            terms = sorted(search_terms(query))
+            if not terms:
+                return []
+            matching = " INTERSECT ".join(["SELECT event FROM search_terms WHERE term = ?"] * len(terms))
+            sql = (f"SELECT data FROM events WHERE {' AND '.join([f'rowid IN ({matching})'] + clauses)} "
+                   "ORDER BY created_at DESC, id DESC")
+            params[:0] = terms
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [codec.loads(data) for (data,) in rows]
+
+    def iter_activity(self, users=None, event_type=None, repo=None, since=None, until=None, batch_size=5000):
+        """Yield batches of ``(user, type, repo, hour, commits)`` rows for analytics.
+
+        Only scalar columns are read, so no event JSON is decoded. ``hour``
+        is the UTC hour the event happened in, as ``YYYY-MM-DDTHH``.
+        """
+        where, params = self._where(users, event_type, repo, since, until)
+        sql = f"SELECT user, type, COALESCE(repo, ''), substr(created_at, 1, 13), commits FROM events{where}"
+        return self._iter_batches(sql, params, batch_size)
+
+    @classmethod
+    def _where(cls, users, event_type, repo, since, until):
+        clauses, params = cls._clauses(users, event_type, repo, since, until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _clauses(users, event_type, repo, since, until):
+        clauses = []
+        params = []
+        if users:
+            clauses.append(f"user IN ({', '.join('?' * len(users))})")
+            params.extend(users)
+        if event_type:
+            clauses.append("type = ?")
+            params.append(event_type)
+        if repo:
+            clauses.append("repo = ?")
+            params.append(repo)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at <= ?")
+            params.append(until)
+        return clauses, params
+
+    def _iter_rows(self, sql, params, batch_size):
+        for rows in self._iter_batches(sql, params, batch_size):
+            yield from rows
+
+    def _iter_batches(self, sql, params, batch_size):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            with self._lock:
+                try:
+                    cursor.close()
+                except sqlite3.ProgrammingError:
+                    pass  # the store was closed first
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
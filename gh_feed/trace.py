@@ -0,0 +1,129 @@
+"""Phase timing behind --timings and GH_FEED_TRACE.
+
+Code marks its phases with ``with trace.span("name"):``. Until ``enable()``
+is called that returns a shared no-op object, so instrumented code costs a
+function call per span in normal runs. Once enabled, every span is recorded
+with its thread, and the result can be summarized per phase or written as a
+Chrome trace (``chrome://tracing``, Perfetto, speedscope...).
+"""
+
+import os
+import time
+import _thread
+
+_tracer = None
+
+
+class Tracer:
+    """Collects finished spans as ``(name, start, end, thread_id, args)``"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.main_thread = _thread.get_ident()
+        self.spans = []
+
+    def record(self, name, start, end, args=None):
+        # list.append is atomic, so worker threads need no lock here
+        self.spans.append((name, start, end, _thread.get_ident(), args))
+
+    def summary(self):
+        """Return ``(name, calls, total_seconds)`` per phase, in order of first appearance"""
+        phases = {}
+        for name, start, end, _, _ in sorted(self.spans, key=lambda span: span[1]):
+            calls, total = phases.get(name, (0, 0.0))
+            phases[name] = (calls + 1, total + end - start)
+        return [(name, calls, total) for name, (calls, total) in phases.items()]
+
+    def format_summary(self):
+        lines = ["", "Timings (inclusive; phases on worker threads overlap):",
+                 f"  {'phase':<24} {'calls':>6} {'total ms':>10}"]
+        for name, calls, total in self.summary():
+            lines.append(f"  {name:<24} {calls:>6} {total * 1000:>10.1f}")
+        return lines
+
+    def chrome_trace(self):
+        """The spans in Chrome's Trace Event format"""
+        pid = os.getpid()
+        thread_names = {self.main_thread: "main"}
+        events = []
+        for name, start, end, tid, args in self.spans:
+            thread_names.setdefault(tid, f"worker {len(thread_names)}")
+            event = {"name": name, "cat": "gh-feed", "ph": "X", "pid": pid, "tid": tid,
+                     "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+            if args:
+                event["args"] = args
+            events.append(event)
+        for tid, thread_name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        import json
+
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        tracer = _tracer
+        if tracer is not None:
+            tracer.record(self.name, self.start, time.perf_counter(), self.args)
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def span(name, **args):
+    """Context manager timing the enclosed block as phase ``name``"""
+    if _tracer is None:
+        return NOOP_SPAN
+    return Span(name, args or None)
+
+
+def record(name, start, end=None, **args):
+    """Record a phase measured by hand with ``now()``"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.record(name, start, time.perf_counter() if end is None else end, args or None)
+
+
+def now():
+    return time.perf_counter()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def enable():
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    """Stop tracing and return the tracer with everything recorded so far"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
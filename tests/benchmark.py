@@ -0,0 +1,221 @@
+"""Throughput benchmarks for the fetch, parse, cache, search and render paths.
+
+Runs entirely offline against ``tests.mock_github`` and writes the results
+to a JSON file, so numbers can be compared from release to release::
+
+    python -m tests.benchmark --users 1,100,1000 --output bench_results.json
+
+Each scenario is run ``--repeat`` times and the fastest run is reported.
+``--latency`` adds a per-request delay to the mock server, to see how well
+concurrent fetching hides round trips.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.events import ingest
+from gh_feed.ratelimit import RateLimiter
+
+from .mock_github import MockGitHub, make_events
+
+DEFAULT_USER_COUNTS = [1, 100, 1000]
+DEFAULT_LARGE_PAYLOAD = 16 * 1024  # bytes of filler per event
+
+
+class Isolated:
+    """Run gh-feed against ``server`` with a private cache directory and rate limiter"""
+
+    def __init__(self, server=None):
+        self.server = server
+
+    def __enter__(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patchers = [patch("gh_feed.app.CACHE_DIR", self.tmpdir.name),
+                         patch("gh_feed.app.get_rate_limiter", return_value=RateLimiter())]
+        if self.server is not None:
+            self.patchers.append(patch("gh_feed.app.API_ROOT", self.server.url))
+        for patcher in self.patchers:
+            patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        app.get_event_store().close()
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        self.tmpdir.cleanup()
+
+
+def best_of(repeat, scenario):
+    """Run ``scenario`` (which returns ``(seconds, details)``) and keep the fastest run"""
+    runs = [scenario() for _ in range(repeat)]
+    return min(runs, key=lambda run: run[0])
+
+
+def result(name, seconds, events=0, **details):
+    entry = {"name": name, "seconds": round(seconds, 6), "events": events,
+             "events_per_sec": round(events / seconds, 1) if seconds > 0 else None}
+    entry.update(details)
+    return entry
+
+
+def bench_fetch(server, usernames, revalidate=False):
+    """Fetch every user once (cold), or twice with an expired cache (revalidate)"""
+    with Isolated(server):
+        if revalidate:
+            list(app.fetch_many_users(usernames))
+        before = dict(server.counters)
+        expiry = 0 if revalidate else app.CACHE_EXPIRY
+        with patch("gh_feed.app.CACHE_EXPIRY", expiry), patch("gh_feed.app.STALE_WHILE_REVALIDATE", 0):
+            started = time.perf_counter()
+            events = sum(len(events or ()) for _, events, _ in app.fetch_many_users(usernames))
+            seconds = time.perf_counter() - started
+    requests = server.counters["requests"] - before["requests"]
+    return seconds, {"events": events, "requests": requests}
+
+
+def bench_fetch_all_pages(server, usernames):
+    """Page through the full 300-event window of each user"""
+    with Isolated(server):
+        before = server.counters["requests"]
+        started = time.perf_counter()
+        events = sum(len(events or ()) for _, events, _ in app.fetch_many_users(usernames, limit=app.MAX_EVENTS))
+        seconds = time.perf_counter() - started
+    return seconds, {"events": events, "requests": server.counters["requests"] - before}
+
+
+def bench_cache(usernames, pages):
+    with Isolated():
+        started = time.perf_counter()
+        for username, events in zip(usernames, pages):
+            app.save_cache(username, events)
+        save_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = sum(len(app.load_cache(username)) for username in usernames)
+        load_seconds = time.perf_counter() - started
+    return save_seconds, load_seconds, loaded
+
+
+def bench_search(events, queries=("update", "feature", "repo3 update")):
+    """Index ``events`` into the history store, then run each search query"""
+    with Isolated():
+        store = app.get_event_store()
+        started = time.perf_counter()
+        store.upsert(events)
+        index_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        hits = sum(len(store.search(query, limit=app.DISPLAY_LIMIT)) for query in queries)
+        search_seconds = time.perf_counter() - started
+    return index_seconds, search_seconds / len(queries), {"fts": store.fts, "hits": hits}
+
+
+def bench_parse(bodies):
+    started = time.perf_counter()
+    events = sum(len(json.loads(body)) for body in bodies)
+    return time.perf_counter() - started, {"events": events, "bytes": sum(map(len, bodies))}
+
+
+def bench_ingest(events):
+    started = time.perf_counter()
+    ingest(events)
+    return time.perf_counter() - started, {"events": len(events)}
+
+
+def bench_render(events):
+    with open(os.devnull, "w") as devnull, patch.object(sys, "stdout", devnull):
+        started = time.perf_counter()
+        app.display_activity(events, limit=None, pager=False)
+        seconds = time.perf_counter() - started
+    return seconds, {"events": len(events)}
+
+
+def run_benchmarks(user_counts=None, latency=0.0, large_payload_bytes=DEFAULT_LARGE_PAYLOAD, repeat=3,
+                   output=None, log=print):
+    """Run every scenario and return (and optionally write) the results document"""
+    user_counts = user_counts or DEFAULT_USER_COUNTS
+    results = []
+
+    def record(entry):
+        results.append(entry)
+        rate = f"{entry['events_per_sec']:,.0f} events/s" if entry["events_per_sec"] else "-"
+        scale = f"{entry['users']} users" if "users" in entry else ""
+        log(f"{entry['name']:<16} {scale:<12} {entry['seconds'] * 1000:10.1f} ms  {rate}")
+
+    with MockGitHub(events_per_feed=300, latency=latency, rate_limit=10 ** 9) as server:
+        for count in user_counts:
+            usernames = [f"user{i}" for i in range(count)]
+            seconds, details = best_of(repeat, lambda: bench_fetch(server, usernames))
+            record(result("fetch", seconds, users=count, **details))
+            seconds, details = best_of(repeat, lambda: bench_fetch(server, usernames, revalidate=True))
+            record(result("revalidate", seconds, users=count, **details))
+
+            pages = [make_events(f"/users/{username}/events", app.DEFAULT_PER_PAGE) for username in usernames]
+            save, load, loaded = min((bench_cache(usernames, pages) for _ in range(repeat)), key=lambda run: run[0])
+            record(result("cache_save", save, loaded, users=count))
+            record(result("cache_load", load, loaded, users=count))
+
+            events = [event for page in pages for event in page]
+            index, search, details = min((bench_search(events) for _ in range(repeat)), key=lambda run: run[0])
+            record(result("history_index", index, len(events), users=count))
+            record(result("search", search, len(events), users=count, **details))
+
+            seconds, details = best_of(repeat, lambda: bench_ingest(events))
+            record(result("ingest", seconds, users=count, **details))
+            ingested = ingest(events)
+            seconds, details = best_of(repeat, lambda: bench_render(ingested))
+            record(result("render", seconds, users=count, **details))
+
+    # Large payloads: every event carries ``large_payload_bytes`` of filler
+    with MockGitHub(events_per_feed=300, payload_bytes=large_payload_bytes, latency=latency,
+                    rate_limit=10 ** 9) as server:
+        usernames = [f"user{i}" for i in range(min(user_counts[-1], 10))]
+        seconds, details = best_of(repeat, lambda: bench_fetch_all_pages(server, usernames))
+        record(result("fetch_large", seconds, users=len(usernames), payload_bytes=large_payload_bytes, **details))
+
+    for payload_bytes in (0, large_payload_bytes):
+        bodies = [json.dumps(make_events(f"/users/user{i}/events", app.MAX_PER_PAGE, payload_bytes)).encode()
+                  for i in range(10)]
+        seconds, details = best_of(repeat, lambda: bench_parse(bodies))
+        record(result("parse", seconds, payload_bytes=payload_bytes, **details))
+
+    document = {
+        "gh_feed_version": app.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {"user_counts": user_counts, "latency": latency,
+                   "large_payload_bytes": large_payload_bytes, "repeat": repeat},
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(document, f, indent=2)
+        log(f"Results written to {output}")
+    return document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="gh-feed throughput benchmarks (offline)")
+    parser.add_argument("--users", default=",".join(map(str, DEFAULT_USER_COUNTS)),
+                        help="comma-separated user counts (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server latency per request, in seconds")
+    parser.add_argument("--payload-bytes", type=int, default=DEFAULT_LARGE_PAYLOAD,
+                        help="filler bytes per event in the large-payload scenarios (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the fastest is kept")
+    parser.add_argument("--output", default="bench_results.json", help="results file (default: %(default)s)")
+    args = parser.parse_args(argv)
+    run_benchmarks([int(count) for count in args.users.split(",")], args.latency, args.payload_bytes,
+                   max(1, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Local stand-in for the parts of the GitHub REST API that gh-feed uses.
+
+``MockGitHub`` serves ``/users/{u}/events``, ``/users/{u}/received_events``,
+``/orgs/{o}/events`` and ``/repos/{o}/{r}/events`` from 127.0.0.1 with
+deterministic synthetic events, and emulates what gh-feed relies on:
+
+- ``per_page``/``page`` pagination with ``Link: rel="next"`` headers, capped
+  at the API's 300-event window;
+- weak ETags, answered with 304 when ``If-None-Match`` matches;
+- per-token ``X-RateLimit-*`` headers, with 403s once a token's quota is
+  spent (304s are free, as on GitHub);
+- gzip bodies, ``X-Poll-Interval`` and optional per-request latency.
+
+Point gh-feed at it by patching ``gh_feed.app.API_ROOT`` (in-process) or
+setting ``GH_FEED_API_URL`` (subprocesses) to ``server.url``.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_EVENTS = 300
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+# Newest synthetic event time; older events are an hour apart
+NEWEST_EVENT = 1719748800  # 2024-06-30T12:00:00Z
+
+EVENT_PAYLOADS = [
+    ("PushEvent", lambda n: {"size": 1 + n % 3, "commits": [{"sha": f"{n:040x}", "message": "Update"}] * (1 + n % 3)}),
+    ("IssuesEvent", lambda n: {"action": "opened", "issue": {"number": n}}),
+    ("WatchEvent", lambda n: {"action": "started"}),
+    ("PullRequestEvent", lambda n: {"action": "opened", "pull_request": {"number": n}}),
+    ("CreateEvent", lambda n: {"ref_type": "branch", "ref": f"feature-{n}"}),
+    ("ForkEvent", lambda n: {"forkee": {"full_name": f"fork/repo{n}"}}),
+    ("DeleteEvent", lambda n: {"ref_type": "branch", "ref": f"feature-{n}"}),
+    ("ReleaseEvent", lambda n: {"action": "published", "release": {"name": f"v{n}"}}),
+    ("PullRequestReviewCommentEvent", lambda n: {"action": "created", "comment": {"id": n}}),
+]
+
+
+def iso(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def make_events(path, count, payload_bytes=0, first_id=None):
+    """Deterministic newest-first events for the feed at ``path``"""
+    parts = path.strip("/").split("/")
+    # /users/{u}/events is one actor; org, repo and received feeds mix several
+    own_feed = parts[0] == "users" and parts[-1] == "events"
+    name = "/".join(parts[1:-1])
+    seed = int(hashlib.sha1(path.encode()).hexdigest()[:6], 16)
+    first_id = seed * 1000 + count if first_id is None else first_id
+    events = []
+    for i in range(count):
+        n = seed + i
+        event_type, payload = EVENT_PAYLOADS[n % len(EVENT_PAYLOADS)]
+        payload = payload(n)
+        if payload_bytes:
+            payload["body"] = "x" * payload_bytes
+        actor = name if own_feed else f"member{n % 7}"
+        events.append({
+            "id": str(first_id - i),
+            "type": event_type,
+            "actor": {"login": actor},
+            "repo": {"name": name if parts[0] == "repos" else f"{actor}/repo{n % 5}"},
+            "payload": payload,
+            "public": True,
+            "created_at": iso(NEWEST_EVENT - i * 3600),
+        })
+    return events
+
+
+class MockGitHub:
+    """A threaded mock API server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, events_per_feed=90, payload_bytes=0, latency=0.0, rate_limit=5000,
+                 rate_window=3600, poll_interval=60, missing=()):
+        self.events_per_feed = events_per_feed
+        self.payload_bytes = payload_bytes
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.poll_interval = poll_interval
+        self.missing = set(missing)
+        self.url = None
+        self.counters = dict.fromkeys(("requests", "ok", "not_modified", "rate_limited", "not_found"), 0)
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._bodies = {}
+        self._quota = {}
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        mock = self
+
+        class Handler(MockHandler):
+            server_mock = mock
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def events(self, path):
+        with self._lock:
+            if path not in self._feeds:
+                self._feeds[path] = make_events(path, self.events_per_feed, self.payload_bytes)
+            return self._feeds[path]
+
+    def add_events(self, path, count=1):
+        """Publish ``count`` new events at the head of a feed, changing its ETag"""
+        events = self.events(path)
+        new = make_events(path, count, self.payload_bytes, first_id=int(events[0]["id"]) + count)
+        with self._lock:
+            self._feeds[path] = (new + events)[:MAX_EVENTS]
+            self._bodies = {key: body for key, body in self._bodies.items() if key[0] != path}
+        return new
+
+    def page(self, path, page, per_page):
+        """Return ``(body, gzipped_body, etag, has_next)`` for one page of a feed"""
+        key = (path, page, per_page)
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is None:
+            events = self.events(path)[:MAX_EVENTS]
+            chunk = events[(page - 1) * per_page:page * per_page]
+            body = json.dumps(chunk).encode()
+            etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+            cached = (body, gzip.compress(body, compresslevel=1), etag, page * per_page < len(events))
+            with self._lock:
+                self._bodies[key] = cached
+        return cached
+
+    def spend(self, token, counted):
+        """Charge one request to ``token``, returning ``(allowed, remaining, reset)``"""
+        now = time.time()
+        with self._lock:
+            remaining, reset = self._quota.get(token, (self.rate_limit, now + self.rate_window))
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.rate_window
+            allowed = remaining > 0
+            if allowed and counted:
+                remaining -= 1
+            self._quota[token] = (remaining, reset)
+        return allowed, remaining, math.ceil(reset)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_mock = None
+
+    def do_GET(self):
+        mock = self.server_mock
+        mock.count("requests")
+        if mock.latency:
+            time.sleep(mock.latency)
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        known = (len(parts) == 3 and parts[0] in ("users", "orgs") and parts[2] in ("events", "received_events")
+                 or len(parts) == 4 and parts[0] == "repos" and parts[3] == "events")
+        if not known or "/".join(parts[1:-1]) in mock.missing:
+            mock.count("not_found")
+            return self.reply(404, json.dumps({"message": "Not Found"}).encode())
+
+        per_page = min(int(query.get("per_page", [DEFAULT_PER_PAGE])[0]), MAX_PER_PAGE)
+        page = max(1, int(query.get("page", ["1"])[0]))
+        body, gzipped, etag, has_next = mock.page(url.path, page, per_page)
+        not_modified = self.headers.get("If-None-Match") == etag
+
+        token = self.headers.get("Authorization") or "anonymous"
+        allowed, remaining, reset = mock.spend(token, counted=not not_modified)
+        headers = {"X-RateLimit-Limit": mock.rate_limit, "X-RateLimit-Remaining": remaining,
+                   "X-RateLimit-Reset": reset}
+        if not allowed:
+            mock.count("rate_limited")
+            return self.reply(403, json.dumps({"message": "API rate limit exceeded"}).encode(), headers)
+
+        headers.update({"ETag": etag, "X-Poll-Interval": mock.poll_interval})
+        if has_next:
+            next_url = f"{mock.url}{url.path}?per_page={per_page}&page={page + 1}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        if not_modified:
+            mock.count("not_modified")
+            return self.reply(304, b"", headers)
+        mock.count("ok")
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            headers["Content-Encoding"] = "gzip"
+            body = gzipped
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        self.reply(200, body, headers)
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
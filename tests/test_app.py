@@ -1,7 +1,12 @@
 import unittest
 import os
 import json
-from gh_feed import app
+import sys
+import tempfile
+import time
+from email.message import Message
+from unittest.mock import patch, MagicMock
+from gh_feed import app, client
 
 
 class TestCache(unittest.TestCase):
@@ -24,6 +29,280 @@ class TestCache(unittest.TestCase):
         self.assertEqual(loaded, events)
 
 
+class TestConditionalRequests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+        self.events = [{"type": "WatchEvent", "repo": {"name": "test/repo"},
+                        "created_at": "2024-06-27T12:00:00Z", "payload": {}}]
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def expire_cache(self, username):
+        entry = app.load_cache_entry(username)
+        # Past the stale window too, so the next fetch has to revalidate
+        entry["timestamp"] = time.time() - app.CACHE_EXPIRY - app.STALE_WHILE_REVALIDATE - 1
+        app.write_cache_entry(username, entry)
+
+    def test_validators_saved_with_cache(self):
+        headers = Message()
+        headers["ETag"] = 'W/"abc"'
+        headers["X-Poll-Interval"] = "60"
+        response = client.Response("", 200, "OK", headers, json.dumps(self.events).encode())
+        http_client = MagicMock()
+        http_client.request.return_value = response
+
+        with patch("gh_feed.app.get_http_client", return_value=http_client):
+            events = app.fetch_user_activity("testuser", log=lambda message: None)
+
+        self.assertEqual(events, self.events)
+        entry = app.load_cache_entry("testuser")
+        self.assertEqual(entry["etag"], 'W/"abc"')
+        self.assertEqual(entry["poll_interval"], 60)
+
+    def test_not_modified_reuses_cache(self):
+        app.save_cache("testuser", self.events, {"etag": 'W/"abc"', "poll_interval": 60})
+        self.expire_cache("testuser")
+        http_client = MagicMock()
+        http_client.request.side_effect = client.HTTPError(
+            app.API_URL.format("testuser"), 304, "Not Modified", Message())
+
+        with patch("gh_feed.app.get_http_client", return_value=http_client):
+            events = app.fetch_user_activity("testuser", log=lambda message: None)
+
+        url, headers = http_client.request.call_args.args
+        self.assertEqual(headers["If-None-Match"], 'W/"abc"')
+        self.assertEqual(events, self.events)
+        # The entry is fresh again and keeps its validators
+        self.assertEqual(app.load_cache("testuser"), self.events)
+        self.assertEqual(app.load_cache_entry("testuser")["etag"], 'W/"abc"')
+
+    def test_forbidden_fetch_serves_cache_until_retry(self):
+        app.save_cache("testuser", self.events)
+        self.expire_cache("testuser")
+        http_client = MagicMock()
+        # A 403 that is not a rate limit (no quota headers): access is denied
+        http_client.request.side_effect = client.HTTPError("", 403, "Forbidden", Message())
+        messages = []
+
+        with patch("gh_feed.app.get_http_client", return_value=http_client):
+            self.assertIsNone(app.fetch_user_activity("testuser", log=messages.append))
+            events = app.fetch_user_activity("testuser", log=messages.append)
+            with patch("gh_feed.app.FORBIDDEN_TTL", 0):
+                app.fetch_user_activity("testuser", log=messages.append)
+
+        self.assertEqual(events, self.events)
+        self.assertEqual(messages[0], "HTTP Error 403: Forbidden")
+        self.assertTrue(messages[1].startswith("(HTTP Error 403; showing cached activity for 'testuser'"))
+        self.assertEqual(http_client.request.call_count, 2)
+
+    def test_forbidden_fetch_without_cache_is_remembered(self):
+        http_client = MagicMock()
+        http_client.request.side_effect = client.HTTPError("", 403, "Forbidden", Message())
+        messages = []
+
+        with patch("gh_feed.app.get_http_client", return_value=http_client):
+            for _ in range(2):
+                self.assertIsNone(app.fetch_user_activity("org:private", log=messages.append))
+
+        self.assertEqual(messages[0], "HTTP Error 403: Forbidden")
+        self.assertTrue(messages[1].startswith("HTTP Error 403: Forbidden (Remembered; checking again in"))
+        self.assertEqual(http_client.request.call_count, 1)
+
+
+class TestPagination(unittest.TestCase):
+    def test_parse_next_link(self):
+        header = ('<https://api.github.com/user/1/events?page=2>; rel="next", '
+                  '<https://api.github.com/user/1/events?page=10>; rel="last"')
+        self.assertEqual(app.parse_next_link(header), "https://api.github.com/user/1/events?page=2")
+        self.assertIsNone(app.parse_next_link('<https://x/?page=1>; rel="prev"'))
+        self.assertIsNone(app.parse_next_link(None))
+
+    def test_pages_stop_at_limit(self):
+        page = [{"type": "WatchEvent"}] * 30
+        with patch("gh_feed.app.fetch_first_page", return_value=(page, "next-2")):
+            with patch("gh_feed.app.fetch_page", return_value=(page, "next-3")) as mock_page:
+                pages = app.iter_user_pages("testuser", limit=45)
+                events = list(app.prefetch_pages(pages))
+
+        self.assertEqual(len(events), 60)
+        mock_page.assert_called_once_with("next-2", None, print, "testuser")
+
+    def test_first_page_error_returns_none(self):
+        with patch("gh_feed.app.fetch_first_page", return_value=(None, None)):
+            self.assertIsNone(app.iter_user_pages("ghost"))
+
+    def test_display_consumes_stream_lazily(self):
+        pulled = []
+
+        def stream():
+            for i in range(100):
+                pulled.append(i)
+                yield {"type": "WatchEvent", "repo": {"name": "test/repo"}, "created_at": ""}
+
+        with patch("builtins.print"):
+            app.display_activity(stream(), limit=3)
+        self.assertEqual(len(pulled), 3)
+
+
+class TestFollow(unittest.TestCase):
+    def make_event(self, event_id, repo):
+        return {"id": str(event_id), "type": "WatchEvent", "repo": {"name": repo}, "created_at": ""}
+
+    def test_only_new_events_are_printed(self):
+        polls = [
+            ([self.make_event(2, "a/two"), self.make_event(1, "a/one")], None),
+            ([self.make_event(2, "a/two"), self.make_event(1, "a/one")], None),
+            ([self.make_event(3, "a/three"), self.make_event(2, "a/two")], None),
+        ]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 3:
+                raise KeyboardInterrupt
+
+        with patch("gh_feed.app.fetch_first_page", side_effect=polls) as mock_fetch, \
+                patch("gh_feed.app.load_cache_entry", return_value={"poll_interval": 60}), \
+                patch("time.sleep", side_effect=fake_sleep), \
+                patch("builtins.print") as mock_print:
+            app.follow_users(["alice"])
+
+        self.assertTrue(mock_fetch.call_args.kwargs["revalidate"])
+        printed = [str(call.args[0]) for call in mock_print.call_args_list if call.args]
+        starred = [line for line in printed if "Starred" in line]
+        self.assertEqual(len(starred), 3)
+        self.assertIn("a/one", starred[0])  # oldest first
+        self.assertIn("a/three", starred[2])
+        self.assertTrue(all(59 <= seconds <= 60 for seconds in sleeps))
+
+    def test_poll_delay_backs_off(self):
+        with patch.dict(app.rate_limit_status, {"remaining": None, "reset": None}):
+            self.assertEqual(app.next_poll_delay(60, 0, 1), 60)
+            self.assertEqual(app.next_poll_delay(60, 2, 1), 240)
+            self.assertEqual(app.next_poll_delay(60, 10, 1), app.MAX_POLL_INTERVAL)
+        with patch.dict(app.rate_limit_status, {"remaining": 10, "reset": 1000 + 1999}):
+            # 10 requests left for 2000s across 5 users
+            self.assertEqual(app.next_poll_delay(60, 0, 5, now=1000), 1000)
+        with patch.dict(app.rate_limit_status, {"remaining": 0, "reset": 1000 + 4999}):
+            self.assertEqual(app.next_poll_delay(60, 0, 1, now=1000), 5000)
+
+
+class TestUpdateCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+        self.http_client = MagicMock()
+        self.http_client.request.return_value = client.Response(
+            "", 200, "OK", Message(), json.dumps({"info": {"version": "9.9.9"}}).encode())
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_latest_version_is_cached(self):
+        with patch("gh_feed.app.get_http_client", return_value=self.http_client):
+            self.assertEqual(app.get_latest_version(), "9.9.9")
+            self.assertEqual(app.get_latest_version(), "9.9.9")
+        self.assertEqual(self.http_client.request.call_count, 1)
+
+    def test_background_check_prints_notice(self):
+        with patch("gh_feed.app.get_http_client", return_value=self.http_client):
+            finish = app.start_update_check()
+            with patch("builtins.print") as mock_print:
+                finish(timeout=5)
+        self.assertIn("New version available: 9.9.9", str(mock_print.call_args_list))
+
+    def test_opt_out(self):
+        with patch.dict(os.environ, {"GH_FEED_NO_UPDATE_CHECK": "1"}):
+            self.assertFalse(app.update_check_enabled([]))
+        with patch.dict(os.environ, {"GH_FEED_NO_UPDATE_CHECK": ""}):
+            self.assertFalse(app.update_check_enabled(["--no-update-check"]))
+
+
+class TestFormatterRegistry(unittest.TestCase):
+    def test_custom_event_type_plugs_in(self):
+        @app.register_formatter("GollumEvent", "wiki edit")
+        def format_gollum_event(event, repo, timestamp):
+            return f"- Edited the wiki of {repo} {timestamp}"
+
+        events = [{"type": "GollumEvent", "repo": {"name": "test/repo"}, "created_at": "", "payload": {}}]
+        try:
+            with patch("builtins.print") as mock_print:
+                app.display_activity(events)
+        finally:
+            del app.EVENT_FORMATTERS["GollumEvent"]
+
+        printed_output = str(mock_print.call_args_list)
+        self.assertIn("Edited the wiki of test/repo", printed_output)
+        self.assertIn("wiki edit: 1", printed_output)
+
+    def test_unknown_event_type_falls_back(self):
+        event = {"type": "MemberEvent", "repo": {"name": "test/repo"}, "created_at": ""}
+        self.assertEqual(app.format_event(event).strip(), "- MemberEvent in test/repo")
+        self.assertEqual(app.event_label("MemberEvent"), "MemberEvent")
+
+    def test_compiled_filter(self):
+        self.assertIsNone(app.compile_filter(None))
+        matches = app.compile_filter(["push", "Issues"])
+        self.assertTrue(matches("PushEvent"))
+        self.assertTrue(matches("IssuesEvent"))
+        self.assertFalse(matches("WatchEvent"))
+        self.assertTrue(app.compile_filter("PullRequest")("PullRequestReviewCommentEvent"))
+
+
+class TestRendering(unittest.TestCase):
+    def test_parse_timestamp_matches_calendar(self):
+        import calendar
+        for stamp in ["1970-01-01T00:00:00Z", "2000-02-29T23:59:59Z", "2024-06-27T12:00:00Z",
+                      "2100-03-01T00:00:01Z", "1999-12-31T08:30:00Z"]:
+            expected = calendar.timegm(time.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ"))
+            self.assertEqual(app.parse_timestamp(stamp), expected)
+        with self.assertRaises(ValueError):
+            app.parse_timestamp("2024-06-27 12:00:00")
+
+    def test_time_ago_uses_given_now(self):
+        now = app.parse_timestamp("2024-06-27T12:00:00Z")
+        self.assertEqual(app.time_ago("2024-06-27T09:00:00Z", now), "3h ago")
+        self.assertEqual(app.time_ago("2024-06-20T12:00:00Z", now), "7d ago")
+
+    def test_display_writes_once_without_color(self):
+        events = [{"type": "WatchEvent", "repo": {"name": f"test/repo{i}"},
+                   "created_at": "2024-06-27T12:00:00Z"} for i in range(5)]
+        with patch("builtins.print") as mock_print:
+            app.display_activity(events, limit=None)
+        self.assertEqual(mock_print.call_count, 1)
+        output = mock_print.call_args.args[0]
+        self.assertIn("Starred test/repo4", output)
+        self.assertNotIn("\033[", output)
+
+    def test_stream_is_flushed_before_waiting_on_next_page(self):
+        import threading
+        second_page = threading.Event()
+
+        def pages():
+            yield [{"type": "WatchEvent", "repo": {"name": "test/first"}, "created_at": ""}]
+            second_page.wait(5)
+            yield [{"type": "WatchEvent", "repo": {"name": "test/second"}, "created_at": ""}]
+
+        printed = []
+
+        def fake_print(text):
+            printed.append(text)
+            second_page.set()
+
+        with patch("builtins.print", side_effect=fake_print):
+            app.display_activity(app.prefetch_pages(pages()), limit=None)
+
+        self.assertIn("test/first", printed[0])
+        self.assertNotIn("test/second", printed[0])
+        self.assertTrue(any("test/second" in text for text in printed[1:]))
+
+
 class TestTimeAgo(unittest.TestCase):
     def test_time_ago_seconds(self):
         from datetime import datetime, timezone, timedelta
@@ -50,6 +329,98 @@ class TestTimeAgo(unittest.TestCase):
         self.assertIn("d ago", app.time_ago(iso_time))
 
 
+class TestBatchFetch(unittest.TestCase):
+    def test_fetch_many_users_collects_messages(self):
+        def fake_fetch(username, token=None, use_cache=True, log=print, full=False):
+            log(f"(Loaded cached activity for '{username}')")
+            return [] if username != "ghost" else None
+
+        with patch("gh_feed.app.fetch_user_activity", side_effect=fake_fetch):
+            results = list(app.fetch_many_users(["alice", "bob", "ghost"], max_workers=2))
+
+        by_user = {username: (events, messages) for username, events, messages in results}
+        self.assertEqual(set(by_user), {"alice", "bob", "ghost"})
+        self.assertIsNone(by_user["ghost"][0])
+        self.assertEqual(by_user["bob"][1], ["(Loaded cached activity for 'bob')"])
+
+    def test_read_users_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("alice\n\n# team leads\nbob  # on call\n")
+        try:
+            self.assertEqual(app.read_users_file(f.name), ["alice", "bob"])
+        finally:
+            os.remove(f.name)
+
+    def test_main_multiple_users(self):
+        with patch.object(sys, "argv", ["gh-feed", "alice", "--filter", "PushEvent", "bob", "alice"]):
+            with patch("gh_feed.app.start_update_check"):
+                with patch("gh_feed.app.fetch_user_activity", return_value=[]) as mock_fetch:
+                    with patch("builtins.print") as mock_print:
+                        app.main()
+
+        fetched = sorted(call.args[0] for call in mock_fetch.call_args_list)
+        self.assertEqual(fetched, ["alice", "bob"])
+        printed_output = str(mock_print.call_args_list)
+        self.assertIn("==> alice <==", printed_output)
+        self.assertIn("==> bob <==", printed_output)
+
+
+class TestFeedSources(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        app.get_event_store().close()
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_feed_urls_and_cache_paths(self):
+        self.assertEqual(app.feed_url("octocat"), "https://api.github.com/users/octocat/events")
+        self.assertEqual(app.feed_url("received:octocat"), "https://api.github.com/users/octocat/received_events")
+        self.assertEqual(app.feed_url("org:github"), "https://api.github.com/orgs/github/events")
+        self.assertEqual(app.feed_url("repo:python/cpython"), "https://api.github.com/repos/python/cpython/events")
+        self.assertEqual(os.path.basename(app.get_cache_path("repo:python/cpython")), "repo+python+cpython.cache")
+
+    def test_org_feed_is_fetched_once_and_shows_actors(self):
+        events = [{"id": "1", "type": "WatchEvent", "actor": {"login": "alice"}, "repo": {"name": "github/x"},
+                   "created_at": "2024-06-27T12:00:00Z", "payload": {}}]
+        http_client = MagicMock()
+        http_client.request.return_value = client.Response("", 200, "OK", Message(), json.dumps(events).encode())
+
+        with patch.object(sys, "argv", ["gh-feed", "--org", "github", "--no-update-check"]):
+            with patch("gh_feed.app.get_http_client", return_value=http_client):
+                with patch("builtins.print") as mock_print:
+                    app.main()
+
+        self.assertEqual(http_client.request.call_count, 1)
+        self.assertEqual(http_client.request.call_args.args[0], "https://api.github.com/orgs/github/events")
+        self.assertIn("[alice] - Starred github/x", str(mock_print.call_args_list))
+        # Org events are cached and recorded under their own key and actor
+        self.assertEqual(app.load_cache("org:github"), events)
+        self.assertEqual(len(app.get_event_store().query(["alice"])), 1)
+
+    def test_main_mixes_sources(self):
+        with patch.object(sys, "argv", ["gh-feed", "octocat", "--received", "--repo", "a/b", "--org", "gh"]):
+            with patch("gh_feed.app.start_update_check"):
+                with patch("gh_feed.app.fetch_user_activity", return_value=[]) as mock_fetch:
+                    with patch("builtins.print") as mock_print:
+                        app.main()
+
+        fetched = sorted(call.args[0] for call in mock_fetch.call_args_list)
+        self.assertEqual(fetched, ["org:gh", "received:octocat", "repo:a/b"])
+        self.assertIn("==> gh (org) <==", str(mock_print.call_args_list))
+
+    def test_not_found_names_the_source(self):
+        messages = []
+        http_client = MagicMock()
+        http_client.request.side_effect = client.HTTPError("", 404, "Not Found", Message())
+        with patch("gh_feed.app.get_http_client", return_value=http_client):
+            self.assertIsNone(app.fetch_user_activity("repo:a/missing", log=messages.append))
+        self.assertEqual(messages, ["Error: Repository 'a/missing' not found."])
+
+
 class TestIntegration(unittest.TestCase):
     def test_fetch_user_activity_online(self):
         # This test will hit the real GitHub API, so it may fail if rate-limited or offline
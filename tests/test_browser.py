@@ -0,0 +1,129 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.browser import HistoryBrowser, PageLoader, browse_history, history_pages
+
+from .mock_github import make_events
+from .test_mock_server import MockServerTestCase
+
+
+def old_events(count):
+    """Events from before the API's window, as only the local history has them"""
+    return [{"id": str(i + 1), "type": "WatchEvent", "actor": {"login": "alice"}, "repo": {"name": "old/repo"},
+             "created_at": f"2020-01-{i + 1:02d}T00:00:00Z", "payload": {}} for i in range(count)]
+
+
+class TestHistoryPages(MockServerTestCase):
+    server_options = {"events_per_feed": 300}
+
+    def test_api_window_then_local_history(self):
+        app.get_event_store().upsert(old_events(5) + make_events("/users/alice/events", 300)[-10:], user="alice")
+        pages = history_pages("alice", log=lambda message: None)
+        sizes = []
+        for page in pages:
+            sizes.append(len(page))
+            # Pages are only fetched as they are asked for
+            self.assertEqual(self.server.counters["ok"], min(len(sizes), 3))
+        self.assertEqual(sizes, [100, 100, 100, 5])
+
+    def test_offline_reads_local_history(self):
+        app.get_event_store().upsert(old_events(5), user="alice")
+        with patch("gh_feed.app.API_ROOT", "http://127.0.0.1:9"):
+            pages = list(history_pages("alice", log=lambda message: None))
+        self.assertEqual([[event.id for event in page] for page in pages], [["5", "4", "3", "2", "1"]])
+
+
+class TestPageLoader(unittest.TestCase):
+    def test_request_and_take(self):
+        loader = PageLoader(iter([[1], [2]]))
+        self.assertIsNone(loader.take())
+        loader.request()
+        self.assertEqual(loader.take(wait=True), [1])
+        loader.request()
+        self.assertEqual(loader.take(wait=True), [2])
+        loader.request()
+        self.assertIsNone(loader.take(wait=True))
+        self.assertTrue(loader.exhausted)
+
+
+class TestHistoryBrowser(MockServerTestCase):
+    server_options = {"events_per_feed": 300}
+
+    def setUp(self):
+        super().setUp()
+        # 20 event rows
+        size = patch("shutil.get_terminal_size", return_value=os.terminal_size((100, 20 + 4)))
+        size.start()
+        self.addCleanup(size.stop)
+
+    def run_browser(self, keys, selected=None):
+        browser = HistoryBrowser("alice", log=lambda message: None)
+        keys = iter(keys)
+
+        def get_key():
+            # A slow reader: background loads finish between keypresses
+            browser.loader.wait()
+            return next(keys)
+
+        with patch("gh_feed.app.get_key", get_key), patch("builtins.print"), \
+                patch("gh_feed.app.multi_select_event_types", return_value=selected):
+            browser.run()
+        # Count a page that was still loading when the browser quit
+        browser.loader.wait()
+        page = browser.loader.take()
+        if page is not None:
+            browser.add(page)
+        return browser
+
+    def test_pages_load_as_the_view_nears_the_end(self):
+        browser = self.run_browser(["j", "q"])
+        self.assertEqual((len(browser.events), browser.top), (100, 1))
+        self.assertEqual(self.server.counters["ok"], 1)
+
+        # Four screens down the view is within a screen of the end of page one
+        # (which now comes from the cache), so page two is loaded
+        browser = self.run_browser([" "] * 4 + ["q"])
+        self.assertEqual(browser.top, 80)
+        self.assertEqual(self.server.counters["ok"], 2)
+
+    def test_view_fills_the_terminal_without_scrolling_it(self):
+        browser = HistoryBrowser("alice", log=lambda message: None)
+        with patch("builtins.print"):
+            browser.fill()
+        browser.screen = app.Screen()
+        with patch("builtins.print") as mock_print:
+            browser.draw()
+            browser.top += 1
+            browser.draw()
+        clear, full, redraw = [call.args[0] for call in mock_print.call_args_list]
+        # 24 lines with no newline after the last: the header stays on screen
+        self.assertEqual(len(full.split("\n")), 24)
+        self.assertFalse(full.endswith("\n"))
+        # The header is 23 lines above the cursor, which sits on the status line
+        self.assertTrue(redraw.startswith("\033[23A\r\033[2Kalice: 2-21 of"))
+
+    def test_filter_changes_in_place(self):
+        browser = self.run_browser(["f", "q"], selected=["PushEvent"])
+        self.assertEqual({browser.events[i].type for i in browser.visible}, {"PushEvent"})
+        self.assertEqual(len(browser.visible), sum(event.type == "PushEvent" for event in browser.events))
+        # Pushes are rarer, so more pages were needed to fill the view, but
+        # none of the already loaded ones was fetched again
+        self.assertGreaterEqual(len(browser.visible), 20)
+        self.assertEqual(self.server.counters["ok"] * 100, len(browser.events))
+
+    def test_end_of_history(self):
+        browser = self.run_browser(["G"] * 5 + ["q"])
+        self.assertTrue(browser.loader.exhausted)
+        self.assertEqual((len(browser.events), browser.top), (300, 280))
+
+    def test_browse_history_reports_errors(self):
+        self.server.missing.add("ghost")
+        with patch("gh_feed.app.get_key", side_effect=["q"]), patch("builtins.print") as mock_print:
+            browse_history("ghost")
+        self.assertIn("Error: User 'ghost' not found.", str(mock_print.call_args_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
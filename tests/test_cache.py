@@ -0,0 +1,181 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.cache import (CACHE_SUFFIX, CacheManager, TTLSpec, decode_entry, encode_entry, full_events,
+                           parse_size, project_event)
+
+
+class TestCacheManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.manager = CacheManager(self.tmpdir.name, max_entries=10, max_bytes=0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_entry(self, name, age=0):
+        path = os.path.join(self.tmpdir.name, f"{name}{CACHE_SUFFIX}")
+        old_size = os.path.getsize(path) if os.path.exists(path) else None
+        with open(path, "w") as f:
+            f.write("{}")
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        self.manager.wrote(path, old_size)
+        return path
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i in range(10):
+            self.write_entry(f"user{i}", age=100 - i)
+        # user0 is the oldest, but a cache hit makes it the most recent
+        self.manager.touch(os.path.join(self.tmpdir.name, "user0" + CACHE_SUFFIX))
+        self.write_entry("newcomer")
+
+        names = sorted(os.path.basename(path) for path, _, _ in self.manager.scan())
+        # Evicted down to the 90% low-water mark
+        self.assertEqual(len(names), 9)
+        self.assertIn("user0" + CACHE_SUFFIX, names)
+        self.assertIn("newcomer" + CACHE_SUFFIX, names)
+        self.assertNotIn("user1" + CACHE_SUFFIX, names)
+
+    def test_writes_below_cap_do_not_scan(self):
+        self.write_entry("first")
+        with patch.object(self.manager, "scan", wraps=self.manager.scan) as mock_scan:
+            for i in range(5):
+                self.write_entry(f"user{i}")
+            self.write_entry("user0")
+        mock_scan.assert_not_called()
+
+    def test_counters_are_flushed(self):
+        self.write_entry("alice")
+        self.manager.record("hits")
+        self.manager.record("misses")
+        self.manager.flush()
+        stats = CacheManager(self.tmpdir.name).stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_prune_older_than_and_clear(self):
+        self.write_entry("stale", age=8 * 86400)
+        self.write_entry("recent")
+        self.assertEqual(self.manager.prune(older_than=7 * 86400)[0], 1)
+        self.assertEqual(self.manager.clear()[0], 1)
+        self.assertEqual(self.manager.stats()["entries"], 0)
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size("512"), 512)
+        self.assertEqual(parse_size("2K"), 2048)
+        self.assertEqual(parse_size("50MB"), 50 * 1024 * 1024)
+
+
+class TestCacheFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+        self.event = {
+            "id": "1", "type": "PushEvent", "public": True, "created_at": "2024-06-27T12:00:00Z",
+            "actor": {"login": "alice", "avatar_url": "https://avatars.example/alice", "url": "https://api/alice"},
+            "repo": {"name": "alice/x", "url": "https://api/repos/alice/x"},
+            "payload": {"ref": "refs/heads/main", "size": 1, "commits": [
+                {"sha": "abc", "message": "Fix flaky-test", "author": {"email": "a@example.com"}, "url": "u"},
+            ]},
+        }
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_projection_keeps_what_gh_feed_reads(self):
+        projected = project_event(self.event)
+        self.assertEqual(projected["actor"], {"login": "alice"})
+        self.assertEqual(projected["repo"], {"name": "alice/x"})
+        self.assertEqual(projected["payload"]["commits"], [{"sha": "abc", "message": "Fix flaky-test"}])
+        self.assertEqual(app.format_event(projected, now=0), app.format_event(self.event, now=0))
+        # Unknown event types keep their whole payload
+        unknown = dict(self.event, type="SponsorshipEvent")
+        self.assertEqual(project_event(unknown)["payload"], self.event["payload"])
+
+    def test_entry_roundtrip_and_version_check(self):
+        data = encode_entry({"timestamp": 1.5, "etag": 'W/"a"', "events": [self.event]})
+        entry = decode_entry(data)
+        self.assertEqual((entry["timestamp"], entry["etag"]), (1.5, 'W/"a"'))
+        self.assertEqual(entry["events"], [project_event(self.event)])
+        self.assertEqual(full_events(entry), [self.event])
+        # Re-encoding an entry read from the cache keeps its full events
+        self.assertEqual(full_events(decode_entry(encode_entry(entry))), [self.event])
+        self.assertIsNone(decode_entry(b"GHFC\x00" + data[5:]))
+        self.assertIsNone(decode_entry(data[:-3]))
+        self.assertIsNone(decode_entry(b'{"events": []}'))
+
+    def test_cache_is_smaller_than_json(self):
+        events = [dict(self.event, id=str(i)) for i in range(100)]
+        app.save_cache("alice", events)
+        self.assertLess(os.path.getsize(app.get_cache_path("alice")), len(json.dumps(events)) * 0.7)
+
+    def test_legacy_json_entry_is_converted(self):
+        legacy = os.path.join(self.tmpdir.name, "org+github.json")
+        with open(legacy, "w") as f:
+            json.dump({"timestamp": time.time(), "etag": 'W/"a"', "events": [self.event]}, f)
+        self.assertEqual(app.load_cache("org:github"), [self.event])
+        self.assertFalse(os.path.exists(legacy))
+        entry = app.load_cache_entry("org:github")
+        self.assertEqual((entry["etag"], entry["events"]), ('W/"a"', [project_event(self.event)]))
+        self.assertEqual(app.get_cache_manager().stats()["entries"], 1)
+
+
+class TestTTLSpec(unittest.TestCase):
+    def test_lookup_order(self):
+        spec = TTLSpec.parse("10m, org=1h, octocat=30s, repo:a/b=1d")
+        self.assertEqual(spec.lookup("alice", 300), 600)
+        self.assertEqual(spec.lookup("octocat", 300), 30)
+        self.assertEqual(spec.lookup("org:github", 300), 3600)
+        self.assertEqual(spec.lookup("repo:a/b", 300), 86400)
+        self.assertEqual(spec.lookup("repo:c/d", 300), 600)
+        self.assertEqual(TTLSpec.parse("user=1m").lookup("org:github", 300), 300)
+
+    def test_invalid_specs(self):
+        for value in ("ten", "org=", "=5m", "-5m", "org=1y"):
+            with self.assertRaises(ValueError):
+                TTLSpec.parse(value)
+
+    def test_cli_flags_and_environment(self):
+        with patch.dict(app.ttl_specs, clear=True), patch.dict(os.environ, {"GH_FEED_STALE_TTL": "org=2h"}):
+            self.assertEqual(app.get_ttl("org:acme", "stale"), 7200)
+            self.assertEqual(app.get_ttl("alice", "stale"), app.STALE_WHILE_REVALIDATE)
+            with patch.object(sys, "argv", ["gh-feed", "alice", "--cache-ttl", "soon"]), \
+                    patch("builtins.print") as mock_print, self.assertRaises(SystemExit):
+                app.main()
+            self.assertIn("--cache-ttl", mock_print.call_args_list[0][0][0])
+
+
+class TestCacheCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_cache_stats_and_clear(self):
+        app.save_cache("alice", [])
+        with patch.object(sys, "argv", ["gh-feed", "cache", "stats"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+        self.assertIn("Entries: 1", str(mock_print.call_args_list))
+
+        with patch.object(sys, "argv", ["gh-feed", "cache", "clear"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+        self.assertIn("Cleared 1 cache entries", str(mock_print.call_args_list))
+        self.assertFalse(os.path.exists(app.get_cache_path("alice")))
+
+
+if __name__ == "__main__":
+    unittest.main()
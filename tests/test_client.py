@@ -0,0 +1,87 @@
+import gzip
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gh_feed import client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/events")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"encoding": self.headers.get("Accept-Encoding")}).encode()
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.connections = set()
+        self.http = client.HTTPClient(user_agent="gh-feed/test")
+
+    def tearDown(self):
+        self.http.close()
+
+    def test_gzip_is_negotiated_and_decoded(self):
+        response = self.http.request(self.base_url + "/events")
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(json.loads(response.body), {"encoding": "gzip"})
+
+    def test_connection_is_reused(self):
+        for _ in range(5):
+            self.http.request(self.base_url + "/events")
+        self.assertEqual(len(Handler.connections), 1)
+
+    def test_redirect_is_followed(self):
+        response = self.http.request(self.base_url + "/moved")
+        self.assertEqual(response.url, self.base_url + "/events")
+
+    def test_error_status_raises(self):
+        with self.assertRaises(client.HTTPError) as cm:
+            self.http.request(self.base_url + "/missing")
+        self.assertEqual(cm.exception.code, 404)
+
+    def test_connection_failure_raises(self):
+        with self.assertRaises(client.RequestError):
+            self.http.request("http://127.0.0.1:1/events", timeout=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
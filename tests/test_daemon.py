@@ -0,0 +1,152 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.cache import TTLSpec
+from gh_feed.daemon import FeedDaemon, serve
+
+from .test_mock_server import MockServerTestCase
+
+
+class TestDaemon(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        # The daemon runs without a token, so queries must not pick one up either
+        environ = patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        for name in ("GITHUB_TOKEN", "GITHUB_TOKENS"):
+            os.environ.pop(name, None)
+        self.path = app.daemon_socket_path()
+        self.thread = threading.Thread(target=serve, args=(self.path,), kwargs={"log": lambda message: None})
+        self.thread.start()
+        deadline = time.time() + 5
+        while app.query_daemon({"command": "ping"}, self.path) is None:
+            self.assertLess(time.time(), deadline, "daemon did not start")
+            time.sleep(0.01)
+
+    def tearDown(self):
+        app.query_daemon({"command": "stop"}, self.path)
+        self.thread.join(5)
+        super().tearDown()
+
+    def run_main(self, *argv):
+        stdout = io.StringIO()
+        with patch.object(sys, "argv", ["gh-feed"] + list(argv) + ["--no-update-check", "--no-pager"]):
+            with patch.object(sys, "stdout", stdout):
+                app.main()
+        return stdout.getvalue()
+
+    def test_queries_are_answered_from_memory(self):
+        first = self.run_main("alice", "--filter", "PushEvent")
+        self.assertIn("- Pushed", first)
+        self.assertEqual(self.server.counters["requests"], 1)
+        # Later queries, whatever their filter and limit, need no request
+        self.assertEqual(self.run_main("alice", "--filter", "PushEvent"), first)
+        self.assertEqual(len(self.run_main("alice", "--limit", "3").split("\n\nSummary:")[0].splitlines()), 3)
+        self.assertEqual(self.server.counters["requests"], 1)
+
+        # The same output as an in-process run, less its cache-hit note
+        in_process = self.run_main("alice", "--filter", "PushEvent", "--no-daemon")
+        self.assertEqual(in_process, "(Loaded cached activity for 'alice')\n" + first)
+
+    def test_limit_zero_means_the_default(self):
+        self.assertEqual(self.run_main("alice", "--limit", "0"), self.run_main("alice"))
+        self.assertEqual(self.run_main("alice", "--limit", "0", "--no-daemon"),
+                         "(Loaded cached activity for 'alice')\n" + self.run_main("alice"))
+
+    def test_other_tokens_fetch_in_process(self):
+        self.run_main("alice")
+        self.assertEqual(self.server.counters["requests"], 1)
+        # The daemon runs without a token: a query with one must not get its answers
+        stdout = self.run_main("alice", "--token", "secret")
+        self.assertTrue(stdout.startswith("(Loaded cached activity for 'alice')\n"))
+        header, _ = app.query_daemon({"feed": "alice", "token": app.token_fingerprint("secret")}, self.path)
+        self.assertEqual(header["status"], "wrong_token")
+
+    def test_export_to_stdout(self):
+        stdout = self.run_main("org:acme", "--format", "ndjson", "--output", "-")
+        events = [json.loads(line) for line in stdout.splitlines()]
+        self.assertEqual(len(events), app.DEFAULT_PER_PAGE)
+        self.assertEqual(self.run_main("org:acme", "--output", "-", "--no-daemon"),
+                         "[\n" + ",\n".join(json.dumps(event, separators=(",", ":")) for event in events) + "\n]\n")
+        self.assertEqual(json.loads(self.run_main("org:acme", "--output", "-", "--limit", "2")), events)
+
+    def test_errors_are_passed_on(self):
+        self.server.missing.add("ghost")
+        self.assertEqual(self.run_main("ghost"), "Error: User 'ghost' not found.\n")
+        self.assertEqual(self.run_main("ghost"), "Error: User 'ghost' not found.\n")
+        self.assertEqual(self.server.counters["not_found"], 1)
+
+    def test_malformed_requests(self):
+        for request in ({"feed": ""}, {"feed": "alice", "format": "csv"}, {"feed": "alice", "limit": "3"},
+                        {"feed": "alice", "limit": -1},
+                        {"command": "reboot"}):
+            header, body = app.query_daemon(request, self.path)
+            self.assertEqual((header["status"], body), ("error", ""))
+
+    def test_second_daemon_refuses_to_start(self):
+        messages = []
+        self.assertFalse(serve(self.path, log=messages.append))
+        self.assertIn("already running", messages[0])
+
+    def test_latency(self):
+        app.query_daemon({"feed": "alice"}, self.path)
+        started = time.perf_counter()
+        for _ in range(100):
+            header, body = app.query_daemon({"feed": "alice"}, self.path)
+        self.assertEqual(header["status"], "ok")
+        # Well under a millisecond each in practice; generous for slow CI machines
+        self.assertLess((time.perf_counter() - started) / 100, 0.01)
+
+
+class TestFeedDaemon(MockServerTestCase):
+    def test_feeds_are_refreshed_and_dropped(self):
+        feeds = FeedDaemon()
+        first = feeds.answer({"feed": "alice", "format": "ndjson"})[1]
+        self.server.add_events("/users/alice/events", 2)
+
+        # Still fresh: nothing to do
+        feeds.refresh_due()
+        self.assertTrue(feeds.wait(5))
+        self.assertEqual(feeds.answer({"feed": "alice", "format": "ndjson"})[1], first)
+
+        app.ttl_specs["fresh"] = TTLSpec(0)
+        feeds.refresh_due()
+        self.assertTrue(feeds.wait(5))
+        refreshed = feeds.answer({"feed": "alice", "format": "ndjson"})[1].splitlines()
+        self.assertEqual(refreshed[2], first.splitlines()[0])
+        # Refreshed again unchanged: a free 304
+        feeds.refresh_due()
+        self.assertTrue(feeds.wait(5))
+        self.assertEqual(self.server.counters["not_modified"], 1)
+
+        with patch("gh_feed.daemon.IDLE_TIMEOUT", -1):
+            feeds.refresh_due()
+        self.assertEqual(feeds.feeds, [])
+
+    def test_no_daemon_falls_back(self):
+        self.assertFalse(os.path.exists(app.daemon_socket_path()))
+        self.assertFalse(app.show_from_daemon("alice"))
+        self.assertIsNone(app.query_daemon({"command": "ping"}, os.path.join(self.tmpdir.name, "nothing.sock")))
+
+
+class TestDaemonExport(MockServerTestCase):
+    server_options = {"payload_bytes": 64}
+
+    def test_exports_hold_full_events(self):
+        feeds = FeedDaemon()
+        answered = feeds.answer({"feed": "alice", "format": "ndjson"})[1]
+        # Loaded from the cache this time, as an in-process export would be
+        self.assertEqual(FeedDaemon().answer({"feed": "alice", "format": "ndjson"})[1], answered)
+        self.assertTrue(all(json.loads(line)["payload"]["body"] == "x" * 64 for line in answered.splitlines()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import json
+import marshal
+import sys
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.events import Event, as_event, format_timestamp, ingest, parse_timestamp
+
+from .mock_github import make_events
+
+
+def api_event(i=1):
+    """An event shaped like a real API response, URLs and all"""
+    return {
+        "id": str(40000000000 + i),
+        "type": "PushEvent",
+        "actor": {"id": 1, "login": "alice", "display_login": "alice", "gravatar_id": "",
+                  "url": "https://api.github.com/users/alice",
+                  "avatar_url": "https://avatars.githubusercontent.com/u/1?"},
+        "repo": {"id": 2, "name": "alice/x", "url": "https://api.github.com/repos/alice/x"},
+        "payload": {"repository_id": 2, "push_id": i, "size": 2, "distinct_size": 2, "ref": "refs/heads/main",
+                    "head": "b" * 40, "before": "a" * 40, "commits": [
+                        {"sha": "c" * 40, "author": {"email": "alice@example.com", "name": "Alice"},
+                         "message": "Fix flaky-test", "distinct": True,
+                         "url": "https://api.github.com/repos/alice/x/commits/" + "c" * 40}] * 2},
+        "public": True,
+        "created_at": "2024-06-27T12:00:00Z",
+    }
+
+
+class TestEvent(unittest.TestCase):
+    def test_ingest_keeps_only_used_fields(self):
+        event = ingest([api_event()])[0]
+        self.assertEqual((event.id, event.type, event.actor, event.repo),
+                         ("40000000001", "PushEvent", "alice", "alice/x"))
+        self.assertEqual(event.created_at, parse_timestamp("2024-06-27T12:00:00Z"))
+        self.assertIsNone(event.raw)
+        self.assertEqual(event.payload["commits"][0], {"sha": "c" * 40, "message": "Fix flaky-test", "distinct": True})
+        self.assertNotIn("push_id", event.payload)
+        self.assertEqual(event.to_dict()["created_at"], "2024-06-27T12:00:00Z")
+        self.assertEqual(event.to_dict()["actor"], {"login": "alice"})
+
+    def test_full_mode_keeps_the_api_dict(self):
+        data = api_event()
+        event = ingest([data], full=True)[0]
+        self.assertIs(event.to_dict(), data)
+        self.assertEqual(event.payload, data["payload"])
+        self.assertEqual(event["actor"]["login"], "alice")
+
+    def test_dict_style_access_for_formatters(self):
+        event = ingest([api_event()])[0]
+        self.assertEqual(event["repo"]["name"], "alice/x")
+        self.assertEqual(event["payload"]["size"], 2)
+        self.assertEqual(event.get("created_at"), "2024-06-27T12:00:00Z")
+        self.assertIsNone(event.get("public"))
+        with self.assertRaises(KeyError):
+            event["public"]
+
+    def test_missing_fields(self):
+        event = as_event({"type": "WatchEvent", "repo": {"name": "a/b"}, "created_at": ""})
+        self.assertEqual((event.id, event.created_at, event.actor), (None, None, ""))
+        self.assertEqual(app.format_event(event).strip(), "- Starred a/b")
+        self.assertEqual(format_timestamp(0), "1970-01-01T00:00:00Z")
+
+    def test_display_matches_for_events_and_dicts(self):
+        events = make_events("/orgs/acme/events", 30)
+
+        def render(events):
+            stdout = io.StringIO()
+            with patch.object(sys, "stdout", stdout), patch("time.time", return_value=1719792000):
+                app.display_activity(events, limit=None, pager=False, show_actor=True)
+            return stdout.getvalue()
+
+        self.assertEqual(render(ingest(events)), render(events))
+
+    def test_formatters_decode_the_payload_once(self):
+        events = ingest(make_events("/orgs/acme/events", len(app.EVENT_FORMATTERS)))
+        self.assertEqual({event.type for event in events}, set(app.EVENT_FORMATTERS))
+        for event in events:
+            with patch("gh_feed.events.marshal.loads", side_effect=marshal.loads) as loads:
+                app.format_event(event, now=0)
+            self.assertLessEqual(loads.call_count, 1, event.type)
+
+    def test_events_use_a_fraction_of_the_memory(self):
+        text = json.dumps([api_event(i) for i in range(2000)])
+        tracemalloc.start()
+        try:
+            dicts = json.loads(text)
+            dict_bytes = tracemalloc.get_traced_memory()[0]
+            events = ingest(dicts)
+            del dicts
+            event_bytes = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(events), 2000)
+        self.assertLess(event_bytes, dict_bytes * 0.3)
+
+    def test_bare_event_to_dict(self):
+        self.assertEqual(Event("1", "WatchEvent").to_dict(),
+                         {"id": "1", "type": "WatchEvent", "actor": {"login": ""}, "repo": {"name": ""},
+                          "created_at": "", "payload": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.export import Exporter, guess_format
+
+
+def make_events(count):
+    return [{"id": str(i), "type": "PushEvent" if i % 2 else "WatchEvent", "actor": {"login": "alice"},
+             "repo": {"name": f"alice/repo{i}"}, "created_at": f"2024-06-{i + 1:02d}T12:00:00Z",
+             "payload": {"commits": [{"sha": "abc"}] * i}} for i in range(count)]
+
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_json_is_untruncated(self):
+        events = make_events(20)
+        app.export_to_json(events, self.path("activity.json"))
+        with open(self.path("activity.json")) as f:
+            self.assertEqual(json.load(f), events)
+
+    def test_empty_json_export_is_valid(self):
+        with Exporter(self.path("empty.json")):
+            pass
+        with open(self.path("empty.json")) as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_gzipped_ndjson(self):
+        events = make_events(5)
+        with Exporter(self.path("events.ndjson.gz")) as exporter:
+            exporter.write_all(events)
+        with gzip.open(self.path("events.ndjson.gz"), "rt") as f:
+            self.assertEqual([json.loads(line) for line in f], events)
+
+    def test_csv_rows(self):
+        with Exporter(self.path("events.csv")) as exporter:
+            exporter.write_all(make_events(3))
+        with open(self.path("events.csv"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["id"] for row in rows], ["0", "1", "2"])
+        self.assertEqual((rows[2]["actor"], rows[2]["repo"], rows[2]["commits"]), ("alice", "alice/repo2", "2"))
+
+    def test_guess_format(self):
+        self.assertEqual(guess_format("out.jsonl.gz"), "ndjson")
+        self.assertEqual(guess_format("out.CSV"), "csv")
+        self.assertEqual(guess_format("out.txt"), "json")
+
+    def test_tee_exports_events_the_display_skipped(self):
+        with Exporter(self.path("events.ndjson")) as exporter:
+            stream = exporter.tee(make_events(10), app.compile_filter("PushEvent"))
+            with patch("builtins.print"):
+                app.display_activity(stream, "PushEvent", limit=2, pager=False)
+            self.assertEqual(exporter.count, 2)
+            stream.drain()
+        self.assertEqual(exporter.count, 5)
+
+
+class TestExportCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        app.get_event_store().close()
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def run_main(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with patch.object(sys, "argv", ["gh-feed"] + list(argv)):
+            with patch.object(sys, "stdout", stdout), patch.object(sys, "stderr", stderr):
+                app.main()
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_stdout_export_contains_only_events(self):
+        events = make_events(12)
+        app.save_cache("alice", events)
+        stdout, stderr = self.run_main("alice", "--format", "ndjson", "--output", "-", "--no-update-check")
+        # A cache hit exports each event as the API sent it
+        self.assertEqual([json.loads(line) for line in stdout.splitlines()], events)
+        self.assertIn("Loaded cached activity", stderr)
+
+    def test_history_export_streams_whole_history(self):
+        app.record_history("alice", make_events(30))
+        stdout, _ = self.run_main("history", "alice", "--type", "PushEvent", "--format", "csv", "--output", "-")
+        rows = list(csv.DictReader(io.StringIO(stdout)))
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows[0]["id"], "29")
+
+
+if __name__ == "__main__":
+    unittest.main()
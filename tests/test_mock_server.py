@@ -0,0 +1,275 @@
+"""End-to-end tests of the fetch pipeline against the local mock API"""
+
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.cache import TTLSpec
+from gh_feed.ratelimit import RateLimiter
+
+from .benchmark import run_benchmarks
+from .mock_github import MockGitHub
+
+
+class MockServerTestCase(unittest.TestCase):
+    server_options = {}
+
+    def setUp(self):
+        self.server = MockGitHub(**self.server_options)
+        self.server.start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.limiter = RateLimiter()
+        self.patchers = [
+            patch("gh_feed.app.CACHE_DIR", self.tmpdir.name),
+            patch("gh_feed.app.API_ROOT", self.server.url),
+            patch("gh_feed.app.get_rate_limiter", return_value=self.limiter),
+            patch.dict(app.ttl_specs, clear=True),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        # Close the store while CACHE_DIR still points at the temporary one
+        app.get_event_store().close()
+        for patcher in self.patchers:
+            patcher.stop()
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+
+class TestMockServer(MockServerTestCase):
+    server_options = {"events_per_feed": 300}
+
+    def test_revalidation_uses_etags(self):
+        quiet = []
+        first = app.fetch_user_activity("alice", log=quiet.append)
+        self.assertEqual(len(first), 30)
+        with patch("gh_feed.app.CACHE_EXPIRY", 0), patch("gh_feed.app.STALE_WHILE_REVALIDATE", 0):
+            again = app.fetch_user_activity("alice", log=quiet.append)
+        self.assertEqual(again, first)
+        self.assertEqual(self.server.counters["not_modified"], 1)
+
+        self.server.add_events("/users/alice/events", 2)
+        with patch("gh_feed.app.CACHE_EXPIRY", 0), patch("gh_feed.app.STALE_WHILE_REVALIDATE", 0):
+            changed = app.fetch_user_activity("alice", log=quiet.append)
+        self.assertEqual(changed[2], first[0])
+
+    def test_pagination_stops_at_the_limit(self):
+        pages = app.iter_user_pages("repo:a/b", limit=150, log=lambda message: None)
+        events = [event for page in pages for event in page]
+        self.assertEqual(len(events), 200)
+        self.assertEqual(self.server.counters["ok"], 2)
+        self.assertEqual(len({event["id"] for event in events}), 200)
+
+    def test_missing_feed(self):
+        self.server.missing.add("ghost")
+        messages = []
+        self.assertIsNone(app.fetch_user_activity("org:ghost", log=messages.append))
+        self.assertEqual(messages, ["Error: Organization 'ghost' not found."])
+
+    def test_main_renders_every_event_type(self):
+        stdout = io.StringIO()
+        with patch.object(sys, "argv", ["gh-feed", "alice", "--limit", "9", "--no-pager", "--no-update-check"]):
+            with patch.object(sys, "stdout", stdout):
+                app.main()
+        shown, summary = stdout.getvalue().split("Summary:")
+        self.assertEqual(shown.count("- "), 9)
+        # The mock cycles through every event type gh-feed can format
+        self.assertEqual(summary.count(": 1\n"), len(app.EVENT_FORMATTERS))
+
+
+class TestMockTimeline(MockServerTestCase):
+    server_options = {"events_per_feed": 300}
+
+    def test_merge_is_newest_first_and_pages_lazily(self):
+        quiet = []
+        events = app.open_timeline(["alice", "bob", "org:acme"], limit=150, log=quiet.append)
+        head = list(itertools.islice(events, 30))
+        self.assertEqual(self.server.counters["ok"], 3)
+        times = [event.created_at for event in head]
+        self.assertEqual(times, sorted(times, reverse=True))
+        # Ties keep the order the feeds were given in
+        self.assertEqual([event.actor for event in head[:2]], ["alice", "bob"])
+
+        rest = list(events)
+        # Each feed is paged up to the limit (two pages of 100) and no further
+        self.assertEqual(self.server.counters["ok"], 6)
+        self.assertEqual(len(head) + len(rest), 600)
+
+    def test_duplicates_are_dropped(self):
+        page = app.ingest(app.fetch_user_activity("alice", log=lambda message: None))
+        merged = list(app.merge_timelines([iter(page), iter(page[5:])]))
+        self.assertEqual([event.id for event in merged], [event.id for event in page])
+
+    def test_main_timeline(self):
+        stdout = io.StringIO()
+        argv = ["gh-feed", "alice", "bob", "ghost", "--timeline", "--limit", "4", "--no-update-check"]
+        self.server.missing.add("ghost")
+        with patch.object(sys, "argv", argv), patch.object(sys, "stdout", stdout):
+            app.main()
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0], "Error: User 'ghost' not found.")
+        self.assertEqual([line.split("]")[0] for line in lines[1:5]], ["[alice", "[bob", "[alice", "[bob"])
+        self.assertIn("Summary:", lines[6])
+
+
+class TestMockStaleAndNegativeCache(MockServerTestCase):
+    def age_entry(self, feed, seconds):
+        entry = app.load_cache_entry(feed)
+        entry["timestamp"] -= seconds
+        app.write_cache_entry(feed, entry)
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        quiet = []
+        first = app.fetch_user_activity("alice", log=quiet.append)
+        self.age_entry("alice", app.CACHE_EXPIRY + 60)
+        self.server.add_events("/users/alice/events", 1)
+
+        messages = []
+        stale = app.fetch_user_activity("alice", log=messages.append)
+        self.assertEqual(stale, first)
+        self.assertIn("refreshing it in the background", messages[0])
+        app.finish_refreshes(timeout=5)
+        self.assertEqual(self.server.counters["ok"], 2)
+        refreshed = app.load_cache("alice")
+        self.assertEqual(refreshed[1], first[0])
+
+        # Past the stale window the fetch blocks on the network again
+        self.age_entry("alice", app.CACHE_EXPIRY + app.STALE_WHILE_REVALIDATE + 1)
+        app.fetch_user_activity("alice", log=quiet.append)
+        self.assertEqual(self.server.counters["not_modified"], 1)
+
+    def test_stale_first_page_and_live_pages_do_not_overlap(self):
+        quiet = []
+        app.fetch_user_activity("alice", log=quiet.append)
+        self.server.add_events("/users/alice/events", 5)
+        self.age_entry("alice", app.CACHE_EXPIRY + 60)
+
+        pages = app.iter_user_pages("alice", limit=60, log=quiet.append)
+        ids = [event["id"] for page in pages for event in page]
+        app.finish_refreshes(timeout=5)
+        # The stale page's last 5 events come round again on the live page 2
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertGreaterEqual(len(ids), 60)
+
+    def test_not_found_is_remembered(self):
+        self.server.missing.add("ghost")
+        messages = []
+        for _ in range(3):
+            self.assertIsNone(app.fetch_user_activity("ghost", log=messages.append))
+        self.assertEqual(self.server.counters["not_found"], 1)
+        self.assertTrue(messages[1].startswith("Error: User 'ghost' not found. (Remembered; checking again in"))
+
+        with patch("gh_feed.app.NOT_FOUND_TTL", 0):
+            app.fetch_user_activity("ghost", log=messages.append)
+        self.assertEqual(self.server.counters["not_found"], 2)
+
+    def test_ttls_per_feed_and_source(self):
+        quiet = []
+        for feed in ("alice", "bob", "org:acme"):
+            app.fetch_user_activity(feed, log=quiet.append)
+            self.age_entry(feed, 600)
+        app.ttl_specs["fresh"] = TTLSpec.parse("bob=1h,org=1h")
+        app.ttl_specs["stale"] = TTLSpec.parse("0")
+        for feed in ("alice", "bob", "org:acme"):
+            app.fetch_user_activity(feed, log=quiet.append)
+        # Only alice's 10-minute-old entry had expired
+        self.assertEqual(self.server.counters["not_modified"], 1)
+
+
+class TestMockFullExport(MockServerTestCase):
+    server_options = {"payload_bytes": 64}
+
+    def export(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        argv = ["gh-feed", "alice", "--format", "ndjson", "--output", "-", "--no-update-check"] + list(args)
+        with patch.object(sys, "argv", argv), patch.object(sys, "stdout", stdout), patch.object(sys, "stderr", stderr):
+            app.main()
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_export_keeps_full_payloads(self):
+        exported = self.export()
+        self.assertEqual(len(exported), 30)
+        # The display works on slim events, but the export gets the API's data untouched
+        self.assertTrue(all(event["payload"]["body"] == "x" * 64 for event in exported))
+
+        # A cache hit, a revalidated entry and a multi-page export hold the same records
+        self.assertEqual(self.export(), exported)
+        with patch("gh_feed.app.CACHE_EXPIRY", 0), patch("gh_feed.app.STALE_WHILE_REVALIDATE", 0):
+            self.assertEqual(self.export(), exported)
+        self.assertEqual(self.server.counters["not_modified"], 1)
+        self.assertEqual(self.export("--limit", "40")[:30], exported)
+
+
+class TestMockInteractiveExport(MockServerTestCase):
+    server_options = {"payload_bytes": 64}
+
+    def test_export_of_a_cached_feed_keeps_full_events(self):
+        first = app.fetch_user_activity("alice", log=lambda message: None)
+        cwd = os.getcwd()
+        os.chdir(self.tmpdir.name)
+        self.addCleanup(os.chdir, cwd)
+        # No token, all events, no history browser, export
+        with patch("builtins.input", side_effect=["n", "1", "n", "y"]), patch.object(sys, "stdout", io.StringIO()):
+            app.interactive_mode("alice")
+        with open("activity.json") as f:
+            exported = json.load(f)
+        self.assertEqual(self.server.counters["requests"], 1)
+        self.assertEqual(exported, first)
+        self.assertTrue(all(event["payload"]["body"] == "x" * 64 for event in exported))
+
+
+class TestMockClosedPipe(MockServerTestCase):
+    server_options = {"events_per_feed": 300, "payload_bytes": 1024}
+
+    def test_export_stops_quietly_when_the_reader_goes_away(self):
+        # `gh-feed org:acme --all --format ndjson --output - | head -1`, with far more output than a pipe holds
+        env = dict(os.environ, HOME=self.tmpdir.name, GH_FEED_API_URL=self.server.url, GH_FEED_NO_UPDATE_CHECK="1")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        command = [sys.executable, "-c", "from gh_feed.app import main; main()",
+                   "org:acme", "--all", "--format", "ndjson", "--output", "-"]
+        process = subprocess.Popen(command, cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        first = process.stdout.readline()
+        process.stdout.close()
+        stderr = process.stderr.read().decode()
+        process.stderr.close()
+        process.wait(timeout=30)
+        self.assertIn("type", json.loads(first))
+        self.assertNotIn("Traceback", stderr)
+        self.assertNotIn("BrokenPipeError", stderr)
+
+
+class TestMockRateLimit(MockServerTestCase):
+    server_options = {"rate_limit": 2, "rate_window": 1}
+
+    def test_exhausted_quota_waits_for_reset(self):
+        started = time.time()
+        for username in ("a", "b", "c"):
+            self.assertIsNotNone(app.fetch_user_activity(username, log=lambda message: None))
+        self.assertLess(time.time() - started, 5)
+        # The pacing keeps the third request from ever being rejected
+        self.assertEqual(self.server.counters["ok"], 3)
+
+
+class TestBenchmarkSmoke(unittest.TestCase):
+    def test_benchmark_writes_results(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, "bench.json")
+            run_benchmarks(user_counts=[2], large_payload_bytes=512, repeat=1, output=output, log=lambda line: None)
+            with open(output) as f:
+                results = json.load(f)
+        names = {result["name"] for result in results["results"]}
+        self.assertTrue({"fetch", "revalidate", "cache_save", "cache_load", "search", "parse", "ingest", "render"} <= names)
+        self.assertTrue(all(result["seconds"] >= 0 for result in results["results"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 import unittest
 import sys
 from unittest.mock import patch, MagicMock
@@ -107,6 +108,38 @@ class TestMultiSelect(unittest.TestCase):
             result = app.multi_select_event_types()
             self.assertIsNone(result)
 
+    @patch('gh_feed.app.get_key')
+    @patch('gh_feed.app.UNIX_LIKE', True)
+    def test_multi_select_redraws_only_changed_lines(self, mock_get_key):
+        """Test that a keypress rewrites just the lines it changed, without a subprocess"""
+        mock_get_key.side_effect = ['j', ' ', '\r']
+
+        with patch('builtins.print') as mock_print, patch('os.system') as mock_system:
+            result = app.multi_select_event_types()
+        self.assertEqual(result, ["IssuesEvent"])
+        mock_system.assert_not_called()
+
+        clear, full, move, toggle = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(clear, "\033[H\033[2J")
+        self.assertIn("Available Event Types:", full)
+        # Old and new cursor rows
+        self.assertEqual(move.count("\033[2K"), 2)
+        self.assertIn("  > [ ] IssuesEvent", move)
+        # The toggled checkbox and the "Selected:" line
+        self.assertEqual(toggle.count("\033[2K"), 2)
+        self.assertIn("Selected: IssuesEvent", toggle)
+
+    def test_session_keys_are_read_whole(self):
+        """Test that escape sequences and a lone ESC are each read as one key"""
+        read_fd, write_fd = os.pipe()
+        try:
+            os.write(write_fd, b"\x1b[Bj\x1b")
+            keys = [app.read_session_key(read_fd) for _ in range(3)]
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        self.assertEqual(keys, ['\x1b[B', 'j', '\x1b'])
+
     def test_interactive_mode_with_username(self):
         """Test interactive mode with pre-provided username"""
         with patch('builtins.input', side_effect=['n', '', '1', 'n']):  # no token, empty token, option 1, no export
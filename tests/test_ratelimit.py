@@ -0,0 +1,113 @@
+import io
+import json
+import sys
+import unittest
+from email.message import Message
+from unittest.mock import MagicMock, patch
+
+from gh_feed import app, client
+from gh_feed.ratelimit import RateLimiter, is_rate_limited, split_tokens
+
+
+def rate_headers(remaining, reset, **extra):
+    headers = Message()
+    headers["X-RateLimit-Remaining"] = str(remaining)
+    headers["X-RateLimit-Reset"] = str(reset)
+    for name, value in extra.items():
+        headers[name.replace("_", "-")] = str(value)
+    return headers
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, tokens):
+        return RateLimiter(tokens, clock=self.clock.time, sleep=self.clock.sleep)
+
+    def test_split_tokens(self):
+        self.assertEqual(split_tokens(None), (None,))
+        self.assertEqual(split_tokens("a, b,,a"), ("a", "b"))
+        self.assertEqual(split_tokens(["x"]), ("x",))
+
+    def test_rotates_to_the_token_with_most_quota(self):
+        limiter = self.limiter("a,b")
+        limiter.update("a", rate_headers(3, 4600))
+        limiter.update("b", rate_headers(4000, 4600))
+        self.assertEqual([limiter.acquire() for _ in range(3)], ["b", "b", "b"])
+        limiter.exhausted("b", rate_headers(0, 4600))
+        self.assertEqual(limiter.acquire(), "a")
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_paces_once_the_burst_is_spent(self):
+        limiter = self.limiter("a")
+        # 100 requests left for 100 seconds: a burst of 50, then one per second
+        limiter.update("a", rate_headers(100, 1100))
+        for _ in range(50):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        limiter.acquire()
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertAlmostEqual(self.clock.sleeps[0], 2.0, delta=0.1)
+
+    def test_waits_for_reset_when_exhausted(self):
+        limiter = self.limiter("a")
+        limiter.exhausted("a", rate_headers(0, 1300))
+        messages = []
+        self.assertEqual(limiter.acquire(log=messages.append), "a")
+        self.assertEqual(self.clock.sleeps, [300])
+        self.assertEqual(messages, ["(Rate limit reached; waiting 5m for it to reset)"])
+
+    def test_not_modified_costs_nothing(self):
+        limiter = self.limiter("a")
+        limiter.update("a", rate_headers(10, 4600))
+        token = limiter.acquire()
+        limiter.update(token, rate_headers(10, 4600), counted=False)
+        self.assertEqual(limiter._states["a"].remaining, 10)
+
+    def test_is_rate_limited(self):
+        self.assertTrue(is_rate_limited(403, rate_headers(0, 1300)))
+        self.assertTrue(is_rate_limited(429, rate_headers(10, 1300, Retry_After=30)))
+        self.assertFalse(is_rate_limited(403, rate_headers(10, 1300)))
+        self.assertFalse(is_rate_limited(404, rate_headers(0, 1300)))
+
+
+class TestApiRequest(unittest.TestCase):
+    def test_rate_limited_request_is_retried_after_reset(self):
+        clock = FakeClock()
+        limiter = RateLimiter("a,b", clock=clock.time, sleep=clock.sleep)
+        http_client = MagicMock()
+        http_client.request.side_effect = [
+            client.HTTPError("", 403, "Forbidden", rate_headers(0, 1600)),
+            client.HTTPError("", 403, "Forbidden", rate_headers(0, 1300)),
+            client.Response("", 200, "OK", rate_headers(4999, 4600), json.dumps([]).encode()),
+        ]
+        stderr = io.StringIO()
+        with patch("gh_feed.app.get_rate_limiter", return_value=limiter):
+            with patch("gh_feed.app.get_http_client", return_value=http_client), patch.object(sys, "stderr", stderr):
+                response = app.api_request("https://api.github.com/users/x/events", "a,b")
+
+        self.assertEqual(response.status, 200)
+        used = [call.args[1]["Authorization"] for call in http_client.request.call_args_list]
+        self.assertEqual(used, ["token a", "token b", "token b"])
+        # Token b resets first, so only its wait is slept
+        self.assertEqual(clock.sleeps, [300])
+        # Announced at once on stderr, whatever the caller does with its log
+        self.assertEqual(stderr.getvalue(), "(Rate limit reached; waiting 5m for it to reset)\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Cold-start benchmark for the paths shell integrations hit on every prompt.
+
+Each scenario runs gh-feed in a fresh interpreter under ``python -X importtime``
+and checks two things: that the heavy modules (HTTP/TLS stack, sqlite3,
+concurrent.futures...) are not imported at all, and that the import time
+spent on gh-feed's behalf stays within a budget. Set
+GH_FEED_STARTUP_BUDGET_SCALE (e.g. to 3) on slow machines.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from gh_feed.cache import CACHE_SUFFIX, encode_entry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_SCALE = float(os.getenv("GH_FEED_STARTUP_BUDGET_SCALE", "1"))
+RUNS = 3
+
+NETWORK_MODULES = {"gh_feed.client", "http.client", "ssl", "email.parser", "urllib.request"}
+BACKGROUND_MODULES = {"gh_feed.store", "sqlite3", "concurrent.futures", "queue"}
+
+
+def run_importtime(argv, home, pycache):
+    """Run gh-feed with ``argv`` and return (stdout, {module: cumulative_us}, total_us)"""
+    env = dict(os.environ, HOME=home, GH_FEED_NO_UPDATE_CHECK="1", PYTHONPYCACHEPREFIX=pycache)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    script = f"import sys; sys.argv = {['gh-feed'] + argv!r}; from gh_feed.app import main; main()"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    modules = {}
+    total = 0
+    after_startup = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = int(cumulative)
+        top_level = not name[1:].startswith(" ")
+        if top_level and after_startup:
+            total += int(cumulative)
+        if top_level and name.strip() == "site":
+            after_startup = True
+    return result.stdout, modules, total
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.home = os.path.join(cls.tmpdir.name, "home")
+        cls.pycache = os.path.join(cls.tmpdir.name, "pycache")
+        cache_dir = os.path.join(cls.home, ".cache", "gh-feed")
+        os.makedirs(cache_dir)
+        with open(os.path.join(cache_dir, "octocat" + CACHE_SUFFIX), "wb") as f:
+            f.write(encode_entry({"timestamp": time.time() + 3600, "events": [
+                {"id": "1", "type": "WatchEvent", "repo": {"name": "octocat/Hello-World"},
+                 "created_at": "2024-06-27T12:00:00Z", "payload": {}},
+            ]}))
+        # Warm the bytecode cache so compilation is not measured
+        run_importtime(["--version"], cls.home, cls.pycache)
+        run_importtime(["octocat"], cls.home, cls.pycache)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def measure(self, argv):
+        runs = [run_importtime(argv, self.home, self.pycache) for _ in range(RUNS)]
+        return min(runs, key=lambda run: run[2])
+
+    def test_version_startup(self):
+        stdout, modules, total = self.measure(["--version"])
+        self.assertIn("gh-feed version", stdout)
+        heavy = (NETWORK_MODULES | BACKGROUND_MODULES | {"json", "datetime"}) & set(modules)
+        self.assertFalse(heavy, f"--version imported {sorted(heavy)}")
+        self.assertLess(total / 1000, 15 * BUDGET_SCALE, f"--version imports took {total / 1000:.1f}ms")
+
+    def test_cache_hit_startup(self):
+        stdout, modules, total = self.measure(["octocat"])
+        self.assertIn("Loaded cached activity", stdout)
+        # The binary cache format needs no JSON decoding on a hit
+        heavy = (NETWORK_MODULES | BACKGROUND_MODULES | {"_strptime", "shutil", "gh_feed.codec"}) & set(modules)
+        self.assertFalse(heavy, f"a cache hit imported {sorted(heavy)}")
+        self.assertLess(total / 1000, 40 * BUDGET_SCALE, f"cache-hit imports took {total / 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
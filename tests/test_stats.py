@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.stats import ActivityColumns, find_streaks, format_stats, summarize
+from gh_feed.store import EventStore
+
+
+def make_event(event_id, event_type, repo, created_at, login="alice", commits=0):
+    return {"id": str(event_id), "type": event_type, "actor": {"login": login}, "repo": {"name": repo},
+            "created_at": created_at, "payload": {"commits": [{}] * commits} if commits else {}}
+
+
+EVENTS = [
+    make_event(1, "PushEvent", "a/x", "2024-06-03T09:15:00Z", commits=3),  # Monday
+    make_event(2, "PushEvent", "a/x", "2024-06-04T09:45:00Z", commits=2),
+    make_event(3, "WatchEvent", "a/y", "2024-06-04T22:00:00Z"),
+    make_event(4, "IssuesEvent", "a/y", "2024-06-05T10:00:00Z", login="bob"),
+    make_event(5, "PushEvent", "a/z", "2024-06-10T09:00:00Z", commits=1),  # Monday
+]
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = EventStore(os.path.join(self.tmpdir.name, "events.db"))
+        self.store.upsert(EVENTS)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def summarize(self, **filters):
+        columns = ActivityColumns.from_batches(self.store.iter_activity(batch_size=2, **filters))
+        return summarize(columns, today=date(2024, 6, 11))
+
+    def test_histograms(self):
+        stats = self.summarize()
+        self.assertEqual(stats["events"], 5)
+        self.assertEqual(stats["by_type"], {"PushEvent": 3, "WatchEvent": 1, "IssuesEvent": 1})
+        self.assertEqual(stats["by_repo"], {"a/x": 2, "a/y": 2, "a/z": 1})
+        self.assertEqual(stats["by_user"], {"alice": 4, "bob": 1})
+        self.assertEqual((stats["by_weekday"]["Mon"], stats["by_weekday"]["Tue"]), (2, 2))
+        self.assertEqual(stats["by_hour"][9], 3)
+        self.assertEqual(stats["by_day"]["2024-06-04"], 2)
+        self.assertEqual((stats["first_day"], stats["last_day"]), ("2024-06-03", "2024-06-10"))
+
+    def test_commit_volume_and_streaks(self):
+        stats = self.summarize()
+        self.assertEqual(stats["commits"]["total"], 6)
+        self.assertEqual(stats["commits"]["pushes"], 3)
+        self.assertEqual(stats["commits"]["by_repo"], {"a/x": 5, "a/z": 1})
+        self.assertEqual(stats["streaks"], {"current": 1, "longest": 3,
+                                            "longest_start": "2024-06-03", "longest_end": "2024-06-05"})
+
+    def test_filters(self):
+        stats = self.summarize(users=["bob"])
+        self.assertEqual(stats["events"], 1)
+        self.assertEqual(stats["streaks"]["current"], 0)
+
+    def test_find_streaks(self):
+        self.assertEqual(find_streaks([], 100), (0, 0, None, None))
+        self.assertEqual(find_streaks([97, 98, 99], 100)[:2], (3, 3))
+
+    def test_format_stats(self):
+        lines = format_stats(self.summarize(), top=1)
+        self.assertIn("Commits: 6 in 3 pushes", lines)
+        self.assertIn("- a/x: 2 (5 commits)", lines)
+        self.assertNotIn("- a/y: 2", lines)
+        self.assertEqual(format_stats(summarize(ActivityColumns()))[0][:9], "No stored")
+
+
+class TestStatsCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        app.get_event_store().close()
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_stats_json(self):
+        app.record_history("alice", EVENTS)
+        with patch.object(sys, "argv", ["gh-feed", "stats", "alice", "--repo", "a/x", "--json"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+        stats = json.loads(mock_print.call_args.args[0])
+        self.assertEqual((stats["events"], stats["commits"]["total"]), (2, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app
+from gh_feed.store import EventStore, parse_date_bound
+
+
+def make_event(event_id, event_type, repo, created_at, login="alice"):
+    return {"id": str(event_id), "type": event_type, "actor": {"login": login},
+            "repo": {"name": repo}, "created_at": created_at, "payload": {"commits": [1]}}
+
+
+class TestEventStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = EventStore(os.path.join(self.tmpdir.name, "events.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_upsert_merges_by_id(self):
+        first = [make_event(1, "PushEvent", "a/x", "2024-05-01T10:00:00Z"),
+                 make_event(2, "WatchEvent", "a/y", "2024-05-02T10:00:00Z")]
+        second = [make_event(2, "WatchEvent", "a/y", "2024-05-02T10:00:00Z"),
+                  make_event(3, "PushEvent", "a/x", "2024-06-03T10:00:00Z")]
+        self.store.upsert(first)
+        self.store.upsert(second)
+        self.assertEqual(self.store.count(), 3)
+        # Newest first
+        self.assertEqual([e["id"] for e in self.store.query()], ["3", "2", "1"])
+
+    def test_events_without_id_are_skipped(self):
+        self.assertEqual(self.store.upsert([{"type": "PushEvent", "repo": {"name": "a/x"}}]), 0)
+
+    def test_query_filters(self):
+        self.store.upsert([
+            make_event(1, "PushEvent", "a/x", "2024-05-01T10:00:00Z"),
+            make_event(2, "PushEvent", "a/y", "2024-05-20T10:00:00Z"),
+            make_event(3, "PushEvent", "a/x", "2024-05-31T10:00:00Z", login="bob"),
+            make_event(4, "IssuesEvent", "a/x", "2024-05-15T10:00:00Z"),
+        ])
+        since = parse_date_bound("2024-05-10")
+        until = parse_date_bound("2024-05-31", end_of_day=True)
+        hits = self.store.query(event_type="PushEvent", repo="a/x", since=since, until=until)
+        self.assertEqual([e["id"] for e in hits], ["3"])
+        self.assertEqual([e["id"] for e in self.store.query(users=["alice"], limit=2)], ["2", "4"])
+
+    def test_old_database_gains_commit_counts(self):
+        self.store.close()
+        path = os.path.join(self.tmpdir.name, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE events (id TEXT PRIMARY KEY, user TEXT NOT NULL, type TEXT NOT NULL, "
+                     "repo TEXT, created_at TEXT NOT NULL, data TEXT NOT NULL)")
+        event = make_event(1, "PushEvent", "a/x", "2024-05-01T10:00:00Z")
+        conn.execute("INSERT INTO events VALUES ('1', 'alice', 'PushEvent', 'a/x', ?, ?)",
+                     (event["created_at"], json.dumps(event)))
+        conn.commit()
+        conn.close()
+
+        self.store = EventStore(path)
+        rows = [row for batch in self.store.iter_activity() for row in batch]
+        self.assertEqual(rows, [("alice", "PushEvent", "a/x", "2024-05-01T10", 1)])
+
+    def test_parse_date_bound(self):
+        self.assertEqual(parse_date_bound("2024-05-10"), "2024-05-10T00:00:00Z")
+        self.assertEqual(parse_date_bound("2024-05-10", end_of_day=True), "2024-05-10T23:59:59Z")
+        self.assertEqual(len(parse_date_bound("30d")), 20)
+        with self.assertRaises(ValueError):
+            parse_date_bound("last month")
+
+
+def push(event_id, messages, created_at="2024-05-01T10:00:00Z", login="alice", repo="a/x"):
+    event = make_event(event_id, "PushEvent", repo, created_at, login)
+    event["payload"] = {"commits": [{"sha": "abc", "message": message} for message in messages]}
+    return event
+
+
+class TestSearch(unittest.TestCase):
+    fts = True
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "events.db")
+        self.patcher = patch("gh_feed.store.fts5_available", return_value=self.fts)
+        self.patcher.start()
+        self.store = EventStore(self.path)
+        pr = make_event(4, "PullRequestEvent", "b/y", "2024-05-03T10:00:00Z", login="bob")
+        pr["payload"] = {"action": "opened", "pull_request": {"number": 7, "title": "Quarantine the flaky-test suite"}}
+        release = make_event(5, "ReleaseEvent", "b/y", "2024-05-04T10:00:00Z", login="bob")
+        release["payload"] = {"action": "published", "release": {"name": "Spring release", "tag_name": "v2"}}
+        self.store.upsert([
+            push(1, ["Fix flaky-test in CI"]),
+            push(2, ["Refactor parser", "Mention flaky-test, then fix another flaky-test and flaky-test"],
+                 created_at="2024-05-02T10:00:00Z"),
+            push(3, ["Unrelated change"], created_at="2024-06-01T10:00:00Z"),
+            pr, release,
+        ])
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def ids(self, *args, **kwargs):
+        return [event["id"] for event in self.store.search(*args, **kwargs)]
+
+    def test_search_finds_every_text_field(self):
+        self.assertEqual(self.store.fts, self.fts)
+        self.assertEqual(sorted(self.ids("flaky-test")), ["1", "2", "4"])
+        self.assertEqual(self.ids("spring"), ["5"])
+        self.assertEqual(self.ids("b/y RELEASE"), ["5"])
+        self.assertEqual(self.ids("parser flaky"), ["2"])
+        self.assertEqual(self.ids("nothing-like-this"), [])
+        self.assertEqual(self.ids("  "), [])
+
+    def test_filters(self):
+        self.assertEqual(self.ids("flaky-test", users=["bob"]), ["4"])
+        self.assertEqual(sorted(self.ids("flaky-test", event_type="PushEvent")), ["1", "2"])
+        self.assertEqual(self.ids("flaky-test", since="2024-05-02T00:00:00Z", repo="a/x"), ["2"])
+        self.assertEqual(len(self.ids("flaky-test", limit=2)), 2)
+
+    def test_ranking(self):
+        # BM25 favours the event that mentions the phrase three times;
+        # the word index orders newest first
+        self.assertEqual(self.ids("flaky-test"), ["2", "4", "1"] if self.fts else ["4", "2", "1"])
+
+    def test_updates_replace_index_entries(self):
+        self.store.upsert([push(1, ["Now about something else"])])
+        self.assertEqual(sorted(self.ids("flaky-test")), ["2", "4"])
+        self.assertEqual(self.ids("something"), ["1"])
+
+    def test_existing_history_is_indexed_on_open(self):
+        self.store.close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TABLE " + ("events_fts" if self.fts else "search_terms"))
+        conn.close()
+        self.store = EventStore(self.path)
+        self.assertEqual(sorted(self.ids("flaky-test")), ["1", "2", "4"])
+
+
+class TestSearchWithoutFTS5(TestSearch):
+    fts = False
+
+
+class TestHistoryCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.patcher = patch("gh_feed.app.CACHE_DIR", self.tmpdir.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        app.get_event_store().close()
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_history_is_recorded_and_queried(self):
+        app.record_history("alice", [make_event(1, "PushEvent", "a/x", "2024-05-01T10:00:00Z"),
+                                     make_event(2, "WatchEvent", "a/y", "2024-05-02T10:00:00Z")])
+        with patch.object(sys, "argv", ["gh-feed", "history", "alice", "--type", "PushEvent"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+
+        printed_output = str(mock_print.call_args_list)
+        self.assertIn("Pushed 1 commit to a/x", printed_output)
+        self.assertNotIn("Starred", printed_output)
+
+    def test_search_command(self):
+        app.record_history("alice", [push(1, ["Fix flaky-test"]), push(2, ["Other"])])
+        app.record_history("bob", [push(3, ["Skip flaky-test"], login="bob")])
+        with patch.object(sys, "argv", ["gh-feed", "search", "flaky-test", "--user", "bob"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+        printed_output = str(mock_print.call_args_list)
+        self.assertIn("[bob] - Pushed 1 commit to a/x", printed_output)
+        self.assertNotIn("[alice]", printed_output)
+
+        with patch.object(sys, "argv", ["gh-feed", "search", "nowhere"]):
+            with patch("builtins.print") as mock_print:
+                app.main()
+        mock_print.assert_called_once_with("No events in the local history match 'nowhere'.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for the --timings / GH_FEED_TRACE / --profile instrumentation"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from gh_feed import app, trace
+
+from .test_mock_server import MockServerTestCase
+
+
+class TestTracer(unittest.TestCase):
+    def tearDown(self):
+        trace.disable()
+
+    def test_spans_are_noops_until_enabled(self):
+        self.assertFalse(trace.enabled())
+        self.assertIs(trace.span("render"), trace.NOOP_SPAN)
+        trace.record("render", trace.now())  # Must not fail either
+
+    def test_summary_totals_each_phase(self):
+        tracer = trace.enable()
+        tracer.record("fetch", 1.0, 1.5)
+        tracer.record("render", 2.0, 2.25)
+        tracer.record("fetch", 3.0, 3.5)
+        self.assertEqual(tracer.summary(), [("fetch", 2, 1.0), ("render", 1, 0.25)])
+        self.assertIn("fetch", "\n".join(tracer.format_summary()))
+
+    def test_chrome_trace_format(self):
+        tracer = trace.enable()
+        with trace.span("outer", feed="alice"):
+            with trace.span("inner"):
+                pass
+        self.assertIs(trace.disable(), tracer)
+        document = json.loads(json.dumps(tracer.chrome_trace()))
+        spans = {event["name"]: event for event in document["traceEvents"] if event["ph"] == "X"}
+        self.assertEqual(set(spans), {"outer", "inner"})
+        self.assertEqual(spans["outer"]["args"], {"feed": "alice"})
+        outer, inner = spans["outer"], spans["inner"]
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        metadata = [event for event in document["traceEvents"] if event["ph"] == "M"]
+        self.assertEqual(metadata[0]["args"], {"name": "main"})
+
+
+class TestTracedRun(MockServerTestCase):
+    def run_main(self, *args, env=None):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        argv = ["gh-feed", "alice", "--no-pager", "--no-update-check"] + list(args)
+        with patch.object(sys, "argv", argv), patch.dict(os.environ, env or {}):
+            with patch.object(sys, "stdout", stdout), patch.object(sys, "stderr", stderr):
+                app.main()
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_timings_summary_goes_to_stderr(self):
+        stdout, stderr = self.run_main("--timings")
+        self.assertIn("Summary:", stdout)
+        self.assertNotIn("Timings", stdout)
+        for phase in ("main", "fetch_user_activity", "tcp connect", "http wait", "json parse", "render", "output"):
+            self.assertIn(f"  {phase} ", stderr)
+        self.assertFalse(trace.enabled())
+
+    def test_trace_file(self):
+        path = os.path.join(self.tmpdir.name, "trace.json")
+        _, stderr = self.run_main(env={"GH_FEED_TRACE": path})
+        self.assertIn(f"Trace written to {path}", stderr)
+        with open(path) as f:
+            document = json.load(f)
+        names = {event["name"] for event in document["traceEvents"] if event["ph"] == "X"}
+        self.assertTrue({"main", "fetch_user_activity", "cache save", "history write", "render"} <= names)
+
+        # A second run is served from the cache
+        self.run_main(env={"GH_FEED_TRACE": path})
+        with open(path) as f:
+            names = {event["name"] for event in json.load(f)["traceEvents"]}
+        self.assertIn("cache load", names)
+        self.assertNotIn("http wait", names)
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "run.prof")
+            with patch("gh_feed.app.PROFILE_FILE", path):
+                stdout, stderr = self.run_main("--profile")
+            self.assertTrue(os.path.exists(path))
+        self.assertIn("Summary:", stdout)
+        self.assertIn("cumulative", stderr)
+        self.assertIn(f"Profile written to {path}", stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()